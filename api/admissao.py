@@ -0,0 +1,121 @@
+import asyncio
+import os
+import time
+from typing import Optional
+
+from starlette.responses import JSONResponse
+
+from .database import configuracao_pool
+from .metrics import ADMISSAO_EM_EXECUCAO, ADMISSAO_ESPERA, ADMISSAO_FILA, ADMISSAO_REJEITADAS
+from .replica import METODOS_LEITURA
+
+# Com ADMISSION_CONTROL=0 o middleware só repassa as requisições.
+CONTROLE_ADMISSAO = os.getenv("ADMISSION_CONTROL", "1").lower() in ("1", "true", "yes")
+
+# Rotas de monitoramento e documentação nunca entram na fila: precisam responder sob carga.
+ROTAS_ISENTAS = frozenset({"/metrics", "/docs", "/redoc", "/openapi.json"})
+
+def configuracao_admissao() -> dict:
+    """
+    Limites por classe de rota, lidos do ambiente. Os padrões seguem o pool do banco
+    de cada worker (DB_POOL_SIZE + DB_MAX_OVERFLOW):
+
+    - ADMISSION_READ_CONCURRENCY / ADMISSION_WRITE_CONCURRENCY: requisições em execução
+      ao mesmo tempo (padrão: o pool inteiro para leituras, metade dele para escritas);
+    - ADMISSION_READ_QUEUE / ADMISSION_WRITE_QUEUE: requisições aguardando vaga além
+      dessas (padrão: o dobro do limite); acima disso, 503 imediato;
+    - ADMISSION_QUEUE_TIMEOUT: segundos máximos na fila antes do 503; menor que o
+      DB_POOL_TIMEOUT, para o cliente receber a recusa antes do timeout do pool;
+    - ADMISSION_RETRY_AFTER: segundos informados no cabeçalho Retry-After.
+    """
+    pool = configuracao_pool()
+    capacidade = max(1, pool["pool_size"] + pool["max_overflow"])
+    leitura = int(os.getenv("ADMISSION_READ_CONCURRENCY", str(capacidade)))
+    escrita = int(os.getenv("ADMISSION_WRITE_CONCURRENCY", str(max(1, capacidade // 2))))
+    return {
+        "leitura": (leitura, int(os.getenv("ADMISSION_READ_QUEUE", str(2 * leitura)))),
+        "escrita": (escrita, int(os.getenv("ADMISSION_WRITE_QUEUE", str(2 * escrita)))),
+        "espera_maxima": float(os.getenv("ADMISSION_QUEUE_TIMEOUT", "5")),
+        "retry_after": int(os.getenv("ADMISSION_RETRY_AFTER", "1")),
+    }
+
+class Limitador:
+    """Limite de requisições simultâneas de uma classe de rota, com uma fila de espera limitada."""
+
+    def __init__(self, classe: str, limite: int, tamanho_fila: int):
+        self.classe = classe
+        self.tamanho_fila = tamanho_fila
+        self.aguardando = 0
+        self._semaforo = asyncio.Semaphore(limite)
+
+    async def entrar(self, espera_maxima: float) -> Optional[str]:
+        """
+        Ocupa uma vaga, esperando na fila se preciso.
+
+        Returns:
+            `None` quando a vaga foi obtida, ou o motivo da recusa: `fila_cheia` ou `tempo_esgotado`.
+        """
+        if not self._semaforo.locked():
+            await self._semaforo.acquire()
+            ADMISSAO_EM_EXECUCAO.labels(self.classe).inc()
+            return None
+        if self.aguardando >= self.tamanho_fila:
+            return "fila_cheia"
+
+        self.aguardando += 1
+        ADMISSAO_FILA.labels(self.classe).inc()
+        inicio = time.perf_counter()
+        try:
+            await asyncio.wait_for(self._semaforo.acquire(), espera_maxima)
+        except asyncio.TimeoutError:
+            return "tempo_esgotado"
+        finally:
+            self.aguardando -= 1
+            ADMISSAO_FILA.labels(self.classe).dec()
+            ADMISSAO_ESPERA.labels(self.classe).observe(time.perf_counter() - inicio)
+        ADMISSAO_EM_EXECUCAO.labels(self.classe).inc()
+        return None
+
+    def sair(self) -> None:
+        ADMISSAO_EM_EXECUCAO.labels(self.classe).dec()
+        self._semaforo.release()
+
+class AdmissaoMiddleware:
+    """
+    Middleware ASGI de controle de admissão: limita as leituras (GET/HEAD) e as
+    escritas em execução em cada worker e mantém uma fila de espera limitada.
+
+    Quando a fila está cheia, ou a espera passa de `espera_maxima`, responde 503
+    com `Retry-After` na hora, em vez de deixar a requisição presa no threadpool e
+    no pool de conexões até o timeout. A vaga só é liberada depois do último pedaço
+    da resposta, já que as exportações em streaming seguram a conexão do banco.
+    """
+
+    def __init__(self, app, configuracao: Optional[dict] = None):
+        self.app = app
+        configuracao = configuracao or configuracao_admissao()
+        self.limitadores = {classe: Limitador(classe, *configuracao[classe]) for classe in ("leitura", "escrita")}
+        self.espera_maxima = configuracao["espera_maxima"]
+        self.retry_after = configuracao["retry_after"]
+
+    async def __call__(self, scope, receive, send):
+        if not CONTROLE_ADMISSAO or scope["type"] != "http" or scope["path"] in ROTAS_ISENTAS:
+            await self.app(scope, receive, send)
+            return
+
+        classe = "leitura" if scope["method"] in METODOS_LEITURA else "escrita"
+        limitador = self.limitadores[classe]
+        motivo = await limitador.entrar(self.espera_maxima)
+        if motivo is not None:
+            ADMISSAO_REJEITADAS.labels(classe, motivo).inc()
+            resposta = JSONResponse(
+                {"detail": "Servidor sobrecarregado, tente novamente em instantes"},
+                status_code=503,
+                headers={"Retry-After": str(self.retry_after)},
+            )
+            await resposta(scope, receive, send)
+            return
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            limitador.sair()
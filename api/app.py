@@ -1,16 +1,17 @@
-import newrelic.agent
-newrelic.agent.initialize()
-
 from fastapi import FastAPI
-from .database import engine, Base, get_db
+from fastapi.responses import ORJSONResponse
+from .inicializacao import lifespan
 from fastapi.middleware.cors import CORSMiddleware
 from .routers.alunos import alunos_router
 from .routers.cursos import cursos_router
 from .routers.matriculas import matriculas_router
 from prometheus_fastapi_instrumentator import Instrumentator
+from .instrumentation import InstrumentacaoSQLMiddleware
+from .compressao import CompressaoMiddleware
+from .idempotencia import IdempotenciaMiddleware
+from .admissao import AdmissaoMiddleware
 
-Base.metadata.create_all(bind=engine)
-
+# APM, engines e schema são inicializados no lifespan (ver api/inicializacao.py).
 app = FastAPI(
     title="API de Gestão Escolar", 
     description="""
@@ -19,11 +20,28 @@ app = FastAPI(
         Permite realizar diferentes operações em cada uma dessas entidades.
     """, 
     version="1.0.0",
+    # orjson gera o JSON de todas as respostas bem mais rápido que o json da biblioteca padrão.
+    default_response_class=ORJSONResponse,
+    lifespan=lifespan,
 )
 
 # Adiciona o instrumentador do Prometheus para expor o endpoint /metrics
 Instrumentator().instrument(app).expose(app)
 
+# Repete a primeira resposta dos POST de criação com o mesmo Idempotency-Key. Fica por
+# dentro da instrumentação: as repetições aparecem no Server-Timing com zero consultas.
+app.add_middleware(IdempotenciaMiddleware)
+
+# Conta comandos SQL e tempo de banco por requisição (métricas e cabeçalho Server-Timing)
+app.add_middleware(InstrumentacaoSQLMiddleware)
+
+# Comprime as respostas com gzip ou brotli, conforme o Accept-Encoding do cliente
+app.add_middleware(CompressaoMiddleware)
+
+# Limita as requisições simultâneas por worker e recusa com 503 + Retry-After quando a
+# fila de espera enche, antes que elas ocupem o threadpool e o pool do banco
+app.add_middleware(AdmissaoMiddleware)
+
 origins = [
     # Acesso de um frontend rodando localmente (fora do Docker)
     "http://localhost",
@@ -45,6 +63,7 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],  # Permite todos os métodos (GET, POST, etc.)
     allow_headers=["*"],  # Permite todos os cabeçalhos
+    expose_headers=["ETag", "Server-Timing"],  # Cabeçalhos legíveis pelo frontend
 )
 
 app.include_router(alunos_router, tags=["alunos"])
@@ -0,0 +1,126 @@
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, List, Optional, Sequence
+
+from sqlalchemy.orm import Session
+
+from . import consultas, models
+from .metrics import CACHE_HITS, CACHE_MISSES
+from .schemas import Curso
+
+_AUSENTE = object()
+
+class CacheLRU:
+    """
+    Cache em memória, limitado em tamanho (despejo LRU) e com expiração por TTL.
+
+    Pensado para dados pequenos e quase imutáveis. Cada processo tem o seu; a
+    invalidação vale para o processo que fez a escrita e os demais enxergam a
+    mudança quando o TTL expira.
+
+    Cada entrada pode guardar também a versão da tabela de origem (`versoes_tabelas`)
+    na leitura que a gerou. Uma busca que informa a versão atual só aceita entradas
+    da mesma versão: é o que mantém o corpo coerente com a ETag calculada sobre ela,
+    mesmo antes da invalidação ou em outros workers.
+    """
+
+    def __init__(self, nome: str, tamanho_maximo: int, ttl: float):
+        self.nome = nome
+        self.tamanho_maximo = tamanho_maximo
+        self.ttl = ttl
+        self._itens = OrderedDict()
+        self._lock = threading.Lock()
+        # Incrementada a cada invalidação; impede que uma leitura iniciada antes
+        # de uma escrita grave no cache um valor já desatualizado.
+        self.geracao = 0
+
+    def get(self, chave: Hashable, versao: Optional[int] = None) -> Any:
+        """Retorna o valor em cache ou `None` se ausente/expirado (ou de outra versão, se `versao` for informada)."""
+        with self._lock:
+            item = self._itens.get(chave, _AUSENTE)
+            if item is not _AUSENTE and item[0] > time.monotonic() and (versao is None or item[2] == versao):
+                self._itens.move_to_end(chave)
+                CACHE_HITS.labels(self.nome).inc()
+                return item[1]
+            if item is not _AUSENTE:
+                del self._itens[chave]
+        CACHE_MISSES.labels(self.nome).inc()
+        return None
+
+    def set(self, chave: Hashable, valor: Any, geracao: int, versao: Optional[int] = None) -> None:
+        """Armazena o valor lido do banco na `geracao` (e `versao`) informada, se ela ainda for a atual."""
+        if self.ttl <= 0 or self.tamanho_maximo <= 0:
+            return
+        with self._lock:
+            if geracao != self.geracao:
+                return
+            self._itens[chave] = (time.monotonic() + self.ttl, valor, versao)
+            self._itens.move_to_end(chave)
+            while len(self._itens) > self.tamanho_maximo:
+                self._itens.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._itens.clear()
+            self.geracao += 1
+
+
+# --- Catálogo de cursos ---
+# O catálogo é pequeno e raramente muda, então buscas por id, por código e a
+# lista completa são servidas da memória. Qualquer escrita limpa o cache inteiro,
+# já que uma alteração de código afeta mais de uma chave.
+curso_cache = CacheLRU(
+    "cursos",
+    tamanho_maximo=int(os.getenv("CURSO_CACHE_MAXSIZE", "1024")),
+    ttl=float(os.getenv("CURSO_CACHE_TTL", "60")),
+)
+
+def _versao_cursos(db: Session) -> Optional[int]:
+    """Versão de `cursos` lida por `responder_com_etag` nesta sessão, ou `None` fora das leituras com ETag."""
+    return db.info.get("versoes_tabelas", {}).get("cursos")
+
+def listar_cursos(db: Session) -> List[Curso]:
+    versao = _versao_cursos(db)
+    cursos = curso_cache.get("lista", versao)
+    if cursos is None:
+        geracao = curso_cache.geracao
+        cursos = [Curso.model_validate(curso) for curso in db.query(models.Curso).all()]
+        curso_cache.set("lista", cursos, geracao, versao)
+    return cursos
+
+def curso_por_codigo(db: Session, codigo: str) -> Optional[Curso]:
+    versao = _versao_cursos(db)
+    curso = curso_cache.get(("codigo", codigo), versao)
+    if curso is None:
+        geracao = curso_cache.geracao
+        db_curso = consultas.curso_por_codigo(db, codigo)
+        if db_curso is None:
+            return None
+        curso = Curso.model_validate(db_curso)
+        curso_cache.set(("codigo", codigo), curso, geracao, versao)
+    return curso
+
+def cursos_por_codigos(db: Session, codigos: Sequence[str]) -> Dict[str, Curso]:
+    """Cursos encontrados, por código; os ausentes do cache são lidos com um único IN."""
+    versao = _versao_cursos(db)
+    encontrados = {}
+    faltantes = []
+    for codigo in codigos:
+        curso = curso_cache.get(("codigo", codigo), versao)
+        if curso is None:
+            faltantes.append(codigo)
+        else:
+            encontrados[codigo] = curso
+    if faltantes:
+        geracao = curso_cache.geracao
+        for db_curso in db.query(models.Curso).filter(models.Curso.codigo.in_(faltantes)):
+            curso = Curso.model_validate(db_curso)
+            curso_cache.set(("codigo", curso.codigo), curso, geracao, versao)
+            encontrados[curso.codigo] = curso
+    return encontrados
+
+def invalidar_cursos() -> None:
+    """Chamada após o commit de qualquer escrita em `cursos`."""
+    curso_cache.clear()
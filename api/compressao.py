@@ -0,0 +1,192 @@
+import os
+import time
+import zlib
+from typing import Optional
+
+from .metrics import COMPRESSAO_BYTES, COMPRESSAO_RAZAO, COMPRESSAO_TEMPO_CPU
+
+# brotli é opcional: sem o pacote, apenas gzip é oferecido.
+try:
+    import brotli
+except ImportError:  # pragma: no cover
+    brotli = None
+
+# Respostas menores que isto (em bytes) saem sem compressão: o ganho não paga o custo.
+TAMANHO_MINIMO = int(os.getenv("COMPRESSION_MIN_SIZE", "1024"))
+# Nível do gzip (1 a 9) e qualidade do brotli (0 a 11). Os padrões privilegiam CPU baixa.
+NIVEL_GZIP = int(os.getenv("COMPRESSION_GZIP_LEVEL", "6"))
+QUALIDADE_BROTLI = int(os.getenv("COMPRESSION_BROTLI_QUALITY", "4"))
+
+# Tipos de conteúdo que compensam comprimir (JSON, NDJSON, CSV, texto).
+TIPOS_COMPRESSIVEIS = ("application/json", "application/x-ndjson", "text/")
+
+class _Compressor:
+    """Comprime um corpo em pedaços, medindo o tempo de CPU e os bytes de entrada e saída."""
+
+    def __init__(self, codificacao: str):
+        self.codificacao = codificacao
+        self.bytes_entrada = 0
+        self.bytes_saida = 0
+        self.tempo_cpu = 0.0
+        if codificacao == "br":
+            self._compressor = brotli.Compressor(quality=QUALIDADE_BROTLI)
+        else:
+            # wbits 16 + MAX_WBITS: formato gzip (cabeçalho e CRC), não zlib puro.
+            self._compressor = zlib.compressobj(NIVEL_GZIP, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+
+    def comprimir(self, dados: bytes, final: bool) -> bytes:
+        """
+        Comprime `dados`. Pedaços intermediários são descarregados (flush) para que o
+        cliente receba cada pedaço de uma resposta em streaming assim que ele é gerado.
+        """
+        # thread_time mede só esta thread (o event loop), sem somar as requisições do threadpool.
+        inicio = time.thread_time()
+        if self.codificacao == "br":
+            saida = self._compressor.process(dados) + (self._compressor.finish() if final else self._compressor.flush())
+        else:
+            saida = self._compressor.compress(dados) + self._compressor.flush(zlib.Z_FINISH if final else zlib.Z_SYNC_FLUSH)
+        self.tempo_cpu += time.thread_time() - inicio
+        self.bytes_entrada += len(dados)
+        self.bytes_saida += len(saida)
+        return saida
+
+    def registrar(self) -> None:
+        COMPRESSAO_TEMPO_CPU.labels(self.codificacao).observe(self.tempo_cpu)
+        COMPRESSAO_BYTES.labels(self.codificacao, "entrada").inc(self.bytes_entrada)
+        COMPRESSAO_BYTES.labels(self.codificacao, "saida").inc(self.bytes_saida)
+        if self.bytes_entrada:
+            COMPRESSAO_RAZAO.labels(self.codificacao).observe(self.bytes_saida / self.bytes_entrada)
+
+def escolher_codificacao(accept_encoding: str) -> Optional[str]:
+    """
+    Codificação preferida entre as aceitas pelo cliente: brotli, depois gzip.
+
+    Respeita `q=0` (codificação recusada) e o curinga `*`; o peso das demais não
+    altera a preferência do servidor.
+    """
+    aceitas = {}
+    for item in accept_encoding.split(","):
+        nome, _, parametros = item.partition(";")
+        nome, q = nome.strip().lower(), 1.0
+        parametros = parametros.strip()
+        if parametros.startswith("q="):
+            try:
+                q = float(parametros[2:])
+            except ValueError:
+                continue
+        if nome:
+            aceitas[nome] = q
+
+    for codificacao in ("br", "gzip"):
+        if codificacao == "br" and brotli is None:
+            continue
+        if aceitas.get(codificacao, aceitas.get("*", 0)) > 0:
+            return codificacao
+    return None
+
+def _compressivel(headers) -> bool:
+    tipo = headers.get(b"content-type", b"").decode("latin-1")
+    return b"content-encoding" not in headers and tipo.startswith(TIPOS_COMPRESSIVEIS)
+
+def _com_vary(headers) -> list:
+    """Cabeçalhos com `Accept-Encoding` acrescentado ao `Vary` (ou um `Vary` novo)."""
+    vary = next((valor for nome, valor in headers if nome.lower() == b"vary"), None)
+    headers = [(nome, valor) for nome, valor in headers if nome.lower() != b"vary"]
+    if vary and b"accept-encoding" in vary.lower():
+        headers.append((b"vary", vary))
+    else:
+        headers.append((b"vary", vary + b", Accept-Encoding" if vary else b"Accept-Encoding"))
+    return headers
+
+class CompressaoMiddleware:
+    """
+    Middleware ASGI que comprime as respostas com gzip ou brotli, conforme o Accept-Encoding.
+
+    Respostas com corpo único menor que `TAMANHO_MINIMO` passam sem compressão.
+    Toda resposta de tipo comprimível leva `Vary: Accept-Encoding`, comprimida ou não.
+    Respostas em streaming (exportações) são comprimidas pedaço a pedaço, sem juntar o
+    corpo inteiro em memória; nelas o tamanho mínimo vale só quando há Content-Length.
+    """
+
+    def __init__(self, app, tamanho_minimo: Optional[int] = None):
+        self.app = app
+        self.tamanho_minimo = TAMANHO_MINIMO if tamanho_minimo is None else tamanho_minimo
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        cabecalhos = dict(scope["headers"])
+        codificacao = escolher_codificacao(cabecalhos.get(b"accept-encoding", b"").decode("latin-1"))
+        if codificacao is None:
+            async def send_sem_compressao(message):
+                if message["type"] == "http.response.start":
+                    message = self._inicio_sem_compressao(message)
+                await send(message)
+
+            await self.app(scope, receive, send_sem_compressao)
+            return
+
+        inicio_resposta = None
+        compressor: Optional[_Compressor] = None
+        repassar = False
+
+        async def send_comprimido(message):
+            nonlocal inicio_resposta, compressor, repassar
+            if message["type"] == "http.response.start":
+                # Retido até o primeiro pedaço do corpo, que decide se haverá compressão.
+                inicio_resposta = message
+                return
+            if message["type"] != "http.response.body" or repassar:
+                await send(message)
+                return
+
+            corpo, final = message.get("body", b""), not message.get("more_body", False)
+            if compressor is None:
+                headers = dict(inicio_resposta.get("headers", []))
+                tamanho = headers.get(b"content-length")
+                pequena = len(corpo) < self.tamanho_minimo if final else (
+                    tamanho is not None and int(tamanho) < self.tamanho_minimo
+                )
+                if pequena or not _compressivel(headers):
+                    repassar = True
+                    await send(self._inicio_sem_compressao(inicio_resposta))
+                    await send(message)
+                    return
+                compressor = _Compressor(codificacao)
+                if final:
+                    # Corpo único: comprimido de uma vez, com o novo Content-Length.
+                    comprimido = compressor.comprimir(corpo, final=True)
+                    await send(self._inicio_comprimido(inicio_resposta, codificacao, len(comprimido)))
+                    await send({"type": "http.response.body", "body": comprimido})
+                    compressor.registrar()
+                    return
+                await send(self._inicio_comprimido(inicio_resposta, codificacao))
+
+            await send({"type": "http.response.body", "body": compressor.comprimir(corpo, final), "more_body": not final})
+            if final:
+                compressor.registrar()
+
+        await self.app(scope, receive, send_comprimido)
+
+    @staticmethod
+    def _inicio_sem_compressao(message) -> dict:
+        """
+        Início de uma resposta que sai sem compressão. Se o tipo é comprimível, ela
+        também depende do Accept-Encoding (a mesma rota sai comprimida para outros
+        clientes ou com corpo maior), e leva `Vary` para caches compartilhados.
+        """
+        headers = message.get("headers", [])
+        if not _compressivel(dict(headers)):
+            return message
+        return {**message, "headers": _com_vary(headers)}
+
+    @staticmethod
+    def _inicio_comprimido(message, codificacao: str, tamanho: Optional[int] = None) -> dict:
+        # Em streaming o tamanho final não é conhecido: sem Content-Length o servidor usa chunked.
+        headers = _com_vary([(nome, valor) for nome, valor in message.get("headers", []) if nome.lower() != b"content-length"])
+        headers.append((b"content-encoding", codificacao.encode()))
+        if tamanho is not None:
+            headers.append((b"content-length", str(tamanho).encode()))
+        return {**message, "headers": headers}
@@ -0,0 +1,50 @@
+from typing import Optional
+
+from sqlalchemy import bindparam, select
+from sqlalchemy.orm import Session
+
+from . import models
+
+# Buscas de uma linha nos caminhos mais quentes da API.
+#
+# Os comandos são montados uma única vez, na importação, com `bindparam` no lugar
+# dos valores. `db.query(...).filter(...).first()` recria a Query, o filtro e o LIMIT
+# e recalcula a chave do cache de compilação a cada chamada; um comando pronto tem a
+# chave memorizada e cai direto no SQL já compilado do cache do SQLAlchemy.
+#
+# O SQL gerado é sempre o mesmo texto, então o asyncpg (DATABASE_ASYNC=1) o prepara
+# uma vez por conexão no seu cache de prepared statements e reaproveita nas
+# execuções seguintes; o psycopg2 não tem prepared statements no servidor.
+
+ALUNO_POR_ID = select(models.Aluno).where(models.Aluno.id == bindparam("aluno_id"))
+ALUNO_EXISTE = select(models.Aluno.id).where(models.Aluno.id == bindparam("aluno_id"))
+CURSO_EXISTE = select(models.Curso.id).where(models.Curso.id == bindparam("curso_id"))
+CURSO_POR_CODIGO = select(models.Curso).where(models.Curso.codigo == bindparam("codigo"))
+MATRICULA_POR_ID = select(models.Matricula).where(models.Matricula.id == bindparam("matricula_id"))
+# Trava a matrícula até o commit: a atualização desconta o curso antigo do resumo.
+MATRICULA_POR_ID_TRAVADA = MATRICULA_POR_ID.with_for_update()
+# Outra matrícula com o mesmo par (aluno, curso): usada na atualização.
+MATRICULA_DUPLICADA = select(models.Matricula.id).where(
+    models.Matricula.aluno_id == bindparam("aluno_id"),
+    models.Matricula.curso_id == bindparam("curso_id"),
+    models.Matricula.id != bindparam("matricula_id"),
+).limit(1)
+
+def aluno_por_id(db: Session, aluno_id: int) -> Optional[models.Aluno]:
+    return db.scalars(ALUNO_POR_ID, {"aluno_id": aluno_id}).one_or_none()
+
+def aluno_existe(db: Session, aluno_id: int) -> bool:
+    return db.scalar(ALUNO_EXISTE, {"aluno_id": aluno_id}) is not None
+
+def curso_existe(db: Session, curso_id: int) -> bool:
+    return db.scalar(CURSO_EXISTE, {"curso_id": curso_id}) is not None
+
+def curso_por_codigo(db: Session, codigo: str) -> Optional[models.Curso]:
+    return db.scalars(CURSO_POR_CODIGO, {"codigo": codigo}).one_or_none()
+
+def matricula_por_id_travada(db: Session, matricula_id: int) -> Optional[models.Matricula]:
+    return db.scalars(MATRICULA_POR_ID_TRAVADA, {"matricula_id": matricula_id}).one_or_none()
+
+def matricula_duplicada(db: Session, matricula_id: int, aluno_id: int, curso_id: int) -> bool:
+    parametros = {"matricula_id": matricula_id, "aluno_id": aluno_id, "curso_id": curso_id}
+    return db.scalar(MATRICULA_DUPLICADA, parametros) is not None
@@ -1,7 +1,16 @@
-from sqlalchemy import create_engine
-from sqlalchemy.orm import declarative_base, sessionmaker
+from sqlalchemy import create_engine, event
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.orm import Session, declarative_base, sessionmaker
+from fastapi import Request
+from starlette.concurrency import run_in_threadpool
+from typing import Union
 import os
 
+from .pool import pool_instrumentado
+from .replica import METODOS_LEITURA, SessaoRoteada, configurar_replica
+
 # A URL do banco de dados é lida da variável de ambiente 'DATABASE_URL'.
 # Para garantir a paridade entre ambientes, a aplicação agora espera que esta variável seja sempre definida.
 DATABASE_URL = os.getenv("DATABASE_URL")
@@ -11,15 +20,171 @@ if not DATABASE_URL:
         "Para desenvolvimento, use o docker-compose ou defina a URL do seu banco de dados PostgreSQL."
     )
 
-# Como agora sempre usamos PostgreSQL, a lógica condicional para SQLite foi removida.
-engine = create_engine(DATABASE_URL)
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+# Réplica de leitura opcional: quando definida, as requisições GET/HEAD leem dela (ver api/replica.py).
+DATABASE_REPLICA_URL = os.getenv("DATABASE_REPLICA_URL") or None
+
+def _env_bool(nome: str, padrao: str = "0") -> bool:
+    return os.getenv(nome, padrao).lower() in ("1", "true", "yes")
+
+# Com DATABASE_ASYNC=1 as rotas usam uma AsyncSession (driver asyncpg) em vez da
+# Session síncrona executada no threadpool do Starlette.
+DATABASE_ASYNC = _env_bool("DATABASE_ASYNC")
+
+# Drivers assíncronos equivalentes aos drivers síncronos usados na DATABASE_URL.
+DRIVERS_ASYNC = {
+    "postgresql": "postgresql+asyncpg",
+    "postgresql+psycopg2": "postgresql+asyncpg",
+    "sqlite": "sqlite+aiosqlite",
+}
+
+def async_database_url(url: str) -> str:
+    """Converte a DATABASE_URL síncrona para o driver assíncrono equivalente."""
+    url = make_url(url)
+    return url.set(drivername=DRIVERS_ASYNC.get(url.drivername, url.drivername)).render_as_string(hide_password=False)
+
+def configuracao_pool() -> dict:
+    """
+    Parâmetros do pool de conexões, lidos do ambiente (padrões iguais aos do SQLAlchemy).
+
+    - DB_POOL_SIZE: conexões mantidas abertas no pool;
+    - DB_MAX_OVERFLOW: conexões extras permitidas em picos;
+    - DB_POOL_TIMEOUT: segundos de espera por uma conexão livre antes do erro;
+    - DB_POOL_RECYCLE: idade máxima, em segundos, de uma conexão (-1 desliga);
+    - DB_POOL_PRE_PING: testa a conexão antes de cada uso.
+    """
+    return {
+        "pool_size": int(os.getenv("DB_POOL_SIZE", "5")),
+        "max_overflow": int(os.getenv("DB_MAX_OVERFLOW", "10")),
+        "pool_timeout": float(os.getenv("DB_POOL_TIMEOUT", "30")),
+        "pool_recycle": int(os.getenv("DB_POOL_RECYCLE", "-1")),
+        "pool_pre_ping": _env_bool("DB_POOL_PRE_PING"),
+    }
+
+def habilitar_chaves_estrangeiras_sqlite(engine) -> None:
+    """
+    Liga a verificação de chaves estrangeiras (e o ON DELETE CASCADE) em cada conexão SQLite.
+
+    O SQLite vem com ela desligada; as exclusões dependem do cascade, como no PostgreSQL.
+    """
+    @event.listens_for(engine, "connect")
+    def _foreign_keys(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        cursor.execute("PRAGMA foreign_keys=ON")
+        cursor.close()
+
+def criar_engine(url: str, nome: str = "primary"):
+    """Cria o engine síncrono com o pool configurado e instrumentado."""
+    # O SQLite (testes e benchmarks locais) não usa pool com fila.
+    if make_url(url).get_backend_name() == "sqlite":
+        engine = create_engine(url)
+        habilitar_chaves_estrangeiras_sqlite(engine)
+        return engine
+    return create_engine(url, poolclass=pool_instrumentado(nome), **configuracao_pool())
+
+def criar_async_engine(url: str, nome: str = "primary"):
+    """Equivalente de `criar_engine` para o modo assíncrono; recebe a URL síncrona."""
+    url = async_database_url(url)
+    if make_url(url).get_backend_name() == "sqlite":
+        engine = create_async_engine(url)
+        habilitar_chaves_estrangeiras_sqlite(engine.sync_engine)
+        return engine
+    return create_async_engine(url, poolclass=pool_instrumentado(nome, assincrono=True), **configuracao_pool())
+
+# Os engines são criados por `iniciar_engines` (no lifespan da aplicação ou pelos
+# comandos de linha), não na importação: importar a API não toca no banco.
+engine = None
+async_engine = None
+replica_engine = None
+SessionLocal = sessionmaker(class_=SessaoRoteada, autocommit=False, autoflush=False)
+AsyncSessionLocal = (
+    async_sessionmaker(sync_session_class=SessaoRoteada, autocommit=False, autoflush=False) if DATABASE_ASYNC else None
+)
+
+def iniciar_engines():
+    """
+    Cria os engines e os associa às fábricas de sessão; chamadas repetidas não recriam nada.
+
+    Nenhuma conexão é aberta aqui: o pool conecta na primeira sessão usada. O engine
+    síncrono também existe no modo assíncrono (criação do schema, scripts). Com
+    DATABASE_REPLICA_URL, cria também o engine da réplica, no mesmo modo das rotas.
+
+    Returns:
+        O engine síncrono.
+    """
+    global engine, async_engine, replica_engine
+    if engine is None:
+        engine = criar_engine(DATABASE_URL)
+        SessionLocal.configure(bind=engine)
+    if DATABASE_ASYNC and async_engine is None:
+        async_engine = criar_async_engine(DATABASE_URL)
+        AsyncSessionLocal.configure(bind=async_engine)
+    if DATABASE_REPLICA_URL and replica_engine is None:
+        if DATABASE_ASYNC:
+            replica_engine = criar_async_engine(DATABASE_REPLICA_URL, "replica")
+            # A SessaoRoteada é a sessão síncrona por trás da AsyncSession e recebe o engine síncrono.
+            configurar_replica(replica_engine.sync_engine)
+        else:
+            replica_engine = criar_engine(DATABASE_REPLICA_URL, "replica")
+            configurar_replica(replica_engine)
+    return engine
+
+async def encerrar_engines() -> None:
+    """Fecha as conexões dos pools (fim do lifespan)."""
+    global engine, async_engine, replica_engine
+    if replica_engine is not None:
+        configurar_replica(None)
+        if isinstance(replica_engine, AsyncEngine):
+            await replica_engine.dispose()
+        else:
+            replica_engine.dispose()
+        replica_engine = None
+    if async_engine is not None:
+        await async_engine.dispose()
+        async_engine = None
+    if engine is not None:
+        engine.dispose()
+        engine = None
 
 Base = declarative_base()
 
-def get_db(): # pragma: no cover
+# Tipo da sessão recebida pelas rotas: depende do modo configurado.
+DbSession = Union[Session, AsyncSession]
+
+def dialect_insert(db, modelo):
+    """
+    Retorna um INSERT do dialeto da sessão, que expõe `on_conflict_do_nothing`/`on_conflict_do_update`.
+
+    Em produção o banco é PostgreSQL; o SQLite aparece apenas nos testes.
+    """
+    dialeto = postgresql if db.get_bind().dialect.name == "postgresql" else sqlite
+    return dialeto.insert(modelo.__table__)
+
+async def run_db(db: DbSession, fn, *args, **kwargs):
+    """
+    Executa `fn(sessao, *args, **kwargs)` com uma Session síncrona sem bloquear o event loop.
+
+    As rotas escrevem o acesso ao banco uma única vez, com a API síncrona do ORM:
+    - AsyncSession: `run_sync` executa a função no greenlet do driver assíncrono,
+      sem ocupar threads enquanto espera o banco;
+    - Session: a função roda no threadpool, como acontecia com as rotas `def`.
+    """
+    if isinstance(db, AsyncSession):
+        return await db.run_sync(fn, *args, **kwargs)
+    return await run_in_threadpool(fn, db, *args, **kwargs)
+
+async def get_db(request: Request): # pragma: no cover
+    # Só as sessões das requisições de leitura podem usar a réplica.
+    somente_leitura = request.method in METODOS_LEITURA
+    if AsyncSessionLocal is not None:
+        async with AsyncSessionLocal() as db:
+            db.sync_session.somente_leitura = somente_leitura
+            yield db
+        return
+
     db = SessionLocal()
+    db.somente_leitura = somente_leitura
     try:
         yield db
     finally:
-        db.close()
+        # O close devolve a conexão ao pool (com rollback), então também sai do event loop.
+        await run_in_threadpool(db.close)
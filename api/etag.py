@@ -0,0 +1,70 @@
+import hashlib
+from typing import Dict, Sequence
+
+from fastapi import Request, Response
+from sqlalchemy.orm import Session
+
+from . import models
+from .database import DbSession, dialect_insert, run_db
+
+# Cabeçalhos das respostas com ETag: o navegador guarda a resposta, mas revalida
+# (If-None-Match) a cada uso, recebendo 304 enquanto nada mudou.
+CACHE_CONTROL = "no-cache"
+
+_NAO_MODIFICADO = object()
+
+def incrementar_versoes(db: Session, *tabelas: str) -> None:
+    """
+    Marca as tabelas como alteradas na transação corrente.
+
+    Deve ser chamada logo antes do commit: o UPDATE trava a linha da versão até o
+    fim da transação, então quanto mais tarde, menor a espera de escritas concorrentes.
+    """
+    stmt = dialect_insert(db, models.VersaoTabela).values([{"tabela": tabela, "versao": 1} for tabela in tabelas])
+    stmt = stmt.on_conflict_do_update(index_elements=["tabela"], set_={"versao": models.VersaoTabela.versao + 1})
+    db.execute(stmt)
+
+def _versoes(db: Session, tabelas: Sequence[str]) -> Dict[str, int]:
+    linhas = db.query(models.VersaoTabela.tabela, models.VersaoTabela.versao).filter(models.VersaoTabela.tabela.in_(tabelas))
+    return dict(linhas.all())
+
+def calcular_etag(request: Request, tabelas: Sequence[str], versoes: Dict[str, int]) -> str:
+    """ETag fraca derivada da URL (caminho e parâmetros) e das versões das tabelas lidas."""
+    chave = "|".join([request.url.path, request.url.query] + [f"{tabela}:{versoes.get(tabela, 0)}" for tabela in tabelas])
+    return f'W/"{hashlib.sha1(chave.encode()).hexdigest()[:20]}"'
+
+def etag_corresponde(if_none_match: str, etag: str) -> bool:
+    """Comparação fraca do If-None-Match (lista separada por vírgulas ou '*')."""
+    if not if_none_match:
+        return False
+    candidatas = {candidata.strip().removeprefix("W/") for candidata in if_none_match.split(",")}
+    return "*" in candidatas or etag.removeprefix("W/") in candidatas
+
+async def responder_com_etag(request: Request, response: Response, db: DbSession, tabelas: Sequence[str], fn, *args):
+    """
+    Executa `fn(sessao, *args)` apenas se o cliente não tiver a versão atual.
+
+    As versões são lidas antes dos dados: se uma escrita acontecer entre as duas
+    leituras, a ETag antiga acompanha dados novos e o cliente apenas refaz a busca na
+    próxima vez. A ordem inversa poderia associar a ETag nova a dados antigos.
+
+    Returns:
+        O resultado de `fn` (com ETag no cabeçalho) ou uma resposta 304 sem corpo.
+    """
+    def executar(sessao: Session):
+        versoes = _versoes(sessao, tabelas)
+        # Disponíveis para `fn`: o cache de cursos só aceita entradas destas versões.
+        sessao.info["versoes_tabelas"] = {tabela: versoes.get(tabela, 0) for tabela in tabelas}
+        etag = calcular_etag(request, tabelas, versoes)
+        if etag_corresponde(request.headers.get("if-none-match"), etag):
+            return etag, _NAO_MODIFICADO
+        return etag, fn(sessao, *args)
+
+    etag, resultado = await run_db(db, executar)
+    if resultado is _NAO_MODIFICADO:
+        return Response(status_code=304, headers={"ETag": etag, "Cache-Control": CACHE_CONTROL})
+    # Respostas prontas (caminho rápido de serialização) não recebem os cabeçalhos de `response`.
+    destino = resultado if isinstance(resultado, Response) else response
+    destino.headers["ETag"] = etag
+    destino.headers["Cache-Control"] = CACHE_CONTROL
+    return resultado
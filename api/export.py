@@ -0,0 +1,97 @@
+import csv
+import io
+import json
+from typing import AsyncIterator, Iterator, Sequence
+
+from fastapi.responses import StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from .database import DbSession
+
+# Quantidade de linhas buscadas do cursor do servidor a cada ida ao banco.
+# Também é a quantidade de linhas serializadas em cada pedaço enviado ao cliente.
+TAMANHO_LOTE_EXPORTACAO = 1000
+
+MEDIA_TYPES = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv; charset=utf-8",
+}
+
+
+class _Serializador:
+    """Converte lotes de linhas em texto NDJSON ou CSV, reaproveitando o mesmo buffer."""
+
+    def __init__(self, colunas: Sequence[str], formato: str):
+        self.colunas = colunas
+        self.formato = formato
+        self.buffer = io.StringIO()
+        self.writer = csv.writer(self.buffer)
+
+    def cabecalho(self) -> Sequence[str]:
+        """Linhas iniciais do arquivo: o cabeçalho no CSV, nenhuma no NDJSON."""
+        return [self.lote([self.colunas])] if self.formato == "csv" else []
+
+    def lote(self, linhas) -> str:
+        if self.formato == "csv":
+            self.buffer.seek(0)
+            self.buffer.truncate()
+            self.writer.writerows(linhas)
+            return self.buffer.getvalue()
+        return "".join(
+            json.dumps(dict(zip(self.colunas, linha)), ensure_ascii=False) + "\n"
+            for linha in linhas
+        )
+
+
+def _linhas_exportadas(bind, stmt, serializador: _Serializador) -> Iterator[str]:
+    """
+    Lê o resultado em lotes de um cursor no servidor e gera o conteúdo já serializado.
+
+    Usa uma sessão própria porque a sessão da requisição é fechada pelo `get_db`
+    antes de o corpo da resposta terminar de ser enviado.
+    """
+    db = Session(bind=bind)
+    try:
+        # yield_per liga stream_results: no PostgreSQL o psycopg2 usa um cursor nomeado
+        # (server-side), então só um lote fica em memória de cada vez.
+        result = db.execute(stmt.execution_options(yield_per=TAMANHO_LOTE_EXPORTACAO))
+        yield from serializador.cabecalho()
+        for lote in result.partitions():
+            yield serializador.lote(lote)
+    finally:
+        db.close()
+
+
+async def _linhas_exportadas_async(bind, stmt, serializador: _Serializador) -> AsyncIterator[str]:
+    """Equivalente de `_linhas_exportadas` para o modo assíncrono (cursor do asyncpg)."""
+    async with AsyncSession(bind=bind) as db:
+        result = await db.stream(stmt.execution_options(yield_per=TAMANHO_LOTE_EXPORTACAO))
+        for linha in serializador.cabecalho():
+            yield linha
+        async for lote in result.partitions():
+            yield serializador.lote(lote)
+
+
+def exportar(db: DbSession, stmt, colunas: Sequence[str], formato: str, nome_arquivo: str) -> StreamingResponse:
+    """
+    Monta uma StreamingResponse em NDJSON ou CSV para o resultado de `stmt`.
+
+    Args:
+        db: Sessão da requisição; apenas a conexão (bind) dela é reaproveitada.
+        stmt: SELECT cujas colunas correspondem, na ordem, a `colunas`.
+        colunas: Nomes dos campos exportados.
+        formato: "ndjson" ou "csv".
+        nome_arquivo: Nome base do arquivo sugerido ao cliente.
+    """
+    serializador = _Serializador(colunas, formato)
+    if isinstance(db, AsyncSession):
+        conteudo = _linhas_exportadas_async(db.bind, stmt, serializador)
+    else:
+        # Iteradores síncronos são consumidos pelo Starlette no threadpool.
+        conteudo = _linhas_exportadas(db.get_bind(), stmt, serializador)
+    return StreamingResponse(
+        conteudo,
+        media_type=MEDIA_TYPES[formato],
+        headers={"Content-Disposition": f'attachment; filename="{nome_arquivo}.{formato}"'},
+    )
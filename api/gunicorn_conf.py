@@ -0,0 +1,87 @@
+"""
+Configuração do gunicorn para rodar a API com vários workers:
+
+    gunicorn -c python:api.gunicorn_conf api.app:app
+
+- Cada worker é um processo uvicorn (UvicornWorker), então a API usa vários núcleos.
+- `preload_app` importa a aplicação uma única vez no processo mestre; os workers
+  herdam o código já carregado e só criam os engines (e abrem conexões) no
+  próprio lifespan, depois do fork.
+- O schema é criado, e as métricas da execução anterior apagadas, uma única vez
+  no processo mestre (`on_starting`), antes dos forks; os workers sobem com
+  STARTUP_CREATE_SCHEMA=0.
+- As métricas do Prometheus usam o modo multiprocesso: cada worker grava seus
+  valores em PROMETHEUS_MULTIPROC_DIR e o /metrics de qualquer worker soma todos.
+
+Variáveis de ambiente: WEB_CONCURRENCY (workers, padrão = núcleos da máquina),
+GUNICORN_BIND (padrão 0.0.0.0:8000), GUNICORN_TIMEOUT (padrão 60) e
+PROMETHEUS_MULTIPROC_DIR (padrão: diretório temporário do sistema).
+"""
+import multiprocessing
+import os
+import shutil
+import tempfile
+
+bind = os.getenv("GUNICORN_BIND", "0.0.0.0:8000")
+workers = int(os.getenv("WEB_CONCURRENCY", multiprocessing.cpu_count()))
+worker_class = "uvicorn.workers.UvicornWorker"
+preload_app = True
+timeout = int(os.getenv("GUNICORN_TIMEOUT", "60"))
+graceful_timeout = 30
+keepalive = 5
+
+# Precisa estar definido antes de o prometheus_client ser importado (no preload da
+# aplicação), pois é na importação que ele escolhe o armazenamento dos valores.
+# Aqui o diretório só é garantido: os arquivos de uma execução anterior são apagados
+# em `on_starting`, para que importar esta configuração (`gunicorn --check-config`,
+# por exemplo) não apague as métricas de um servidor em execução.
+diretorio_metricas = os.environ.setdefault(
+    "PROMETHEUS_MULTIPROC_DIR", os.path.join(tempfile.gettempdir(), "ellis-prometheus")
+)
+os.makedirs(diretorio_metricas, exist_ok=True)
+
+
+def on_starting(server):
+    # Só o mestre que de fato vai subir os workers limpa as métricas da execução
+    # anterior, para não somarem valores antigos. Os workers criam os próprios
+    # arquivos depois do fork.
+    shutil.rmtree(diretorio_metricas, ignore_errors=True)
+    os.makedirs(diretorio_metricas, exist_ok=True)
+
+    # Se cada worker criasse o schema no próprio lifespan, os CREATE EXTENSION e
+    # CREATE INDEX IF NOT EXISTS simultâneos de um banco novo poderiam falhar por
+    # violação de unicidade e derrubar workers na partida. O mestre cria o schema
+    # uma vez, com um engine sem pool (fora das métricas), e os workers herdam
+    # STARTUP_CREATE_SCHEMA=0 no ambiente.
+    from sqlalchemy import create_engine
+    from sqlalchemy.pool import NullPool
+
+    from api import database
+    from api.inicializacao import _habilitado
+    from api.schema import create_schema
+
+    if not _habilitado("STARTUP_CREATE_SCHEMA", "1"):
+        return
+    engine = create_engine(database.DATABASE_URL, poolclass=NullPool)
+    try:
+        create_schema(engine)
+    finally:
+        engine.dispose()
+    os.environ["STARTUP_CREATE_SCHEMA"] = "0"
+
+
+def post_fork(server, worker):
+    # Os engines normalmente só existem depois do lifespan; se algo os criou no
+    # mestre, o worker descarta as conexões herdadas sem fechá-las (elas pertencem ao mestre).
+    from api import database
+
+    for engine in (database.engine, database.async_engine, database.replica_engine):
+        if engine is not None:
+            getattr(engine, "sync_engine", engine).dispose(close=False)
+
+
+def child_exit(server, worker):
+    # Remove os gauges `live*` do worker encerrado; os contadores dele continuam somados.
+    from prometheus_client import multiprocess
+
+    multiprocess.mark_process_dead(worker.pid)
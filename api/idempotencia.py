@@ -0,0 +1,179 @@
+import asyncio
+import hashlib
+import os
+from abc import ABC, abstractmethod
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+
+from starlette.responses import JSONResponse
+
+from .cache import CacheLRU
+from .metrics import IDEMPOTENCIA_REQUISICOES
+
+# Rotas de criação que aceitam o cabeçalho Idempotency-Key (somente POST).
+ROTAS_IDEMPOTENTES = frozenset({"/alunos", "/cursos", "/matriculas"})
+CABECALHO = b"idempotency-key"
+TAMANHO_MAXIMO_CHAVE = 255
+
+# Quantidade de chaves guardadas, por quanto tempo (segundos) e quanto uma repetição
+# concorrente espera pela requisição original antes de desistir com 409.
+MAXIMO_CHAVES = int(os.getenv("IDEMPOTENCY_MAX_KEYS", "10000"))
+TTL_CHAVES = float(os.getenv("IDEMPOTENCY_TTL", "86400"))
+ESPERA_MAXIMA = float(os.getenv("IDEMPOTENCY_WAIT_TIMEOUT", "30"))
+
+@dataclass(frozen=True)
+class RespostaArmazenada:
+    """Primeira resposta dada para uma chave, e a impressão digital do corpo que a gerou."""
+    impressao: str
+    status: int
+    headers: List[Tuple[bytes, bytes]]
+    corpo: bytes
+
+class ArmazenamentoIdempotencia(ABC):
+    """
+    Interface do armazenamento das respostas por chave.
+
+    `iniciar` devolve a resposta já armazenada ou `None` quando a requisição corrente
+    passa a ser a dona da chave; nesse caso, `concluir` é sempre chamado em seguida.
+    Uma implementação compartilhada entre processos (Redis, por exemplo) troca a
+    reserva em memória por um SET NX com expiração.
+    """
+
+    @abstractmethod
+    async def iniciar(self, chave: str) -> Optional[RespostaArmazenada]:
+        ...
+
+    @abstractmethod
+    async def concluir(self, chave: str, resposta: Optional[RespostaArmazenada]) -> None:
+        ...
+
+class ArmazenamentoMemoria(ArmazenamentoIdempotencia):
+    """
+    Armazenamento no próprio processo: respostas em um CacheLRU (tamanho e TTL
+    limitados) e, para as chaves em andamento, um evento que as repetições aguardam.
+
+    Com vários workers, cada processo tem o seu: repetições que caem em outro worker
+    não são detectadas.
+    """
+
+    def __init__(self, tamanho_maximo: int = MAXIMO_CHAVES, ttl: float = TTL_CHAVES, espera_maxima: float = ESPERA_MAXIMA):
+        self.respostas = CacheLRU("idempotencia", tamanho_maximo=tamanho_maximo, ttl=ttl)
+        self.espera_maxima = espera_maxima
+        self._em_andamento: Dict[str, asyncio.Event] = {}
+
+    async def iniciar(self, chave: str) -> Optional[RespostaArmazenada]:
+        while True:
+            resposta = self.respostas.get(chave)
+            if resposta is not None:
+                return resposta
+            evento = self._em_andamento.get(chave)
+            if evento is None:
+                self._em_andamento[chave] = asyncio.Event()
+                return None
+            # Outra requisição com a mesma chave está em andamento: espera por ela.
+            # Se ela falhar sem resposta armazenável, esta assume a chave no próximo laço.
+            IDEMPOTENCIA_REQUISICOES.labels("espera").inc()
+            await asyncio.wait_for(evento.wait(), self.espera_maxima)
+
+    async def concluir(self, chave: str, resposta: Optional[RespostaArmazenada]) -> None:
+        if resposta is not None:
+            self.respostas.set(chave, resposta, self.respostas.geracao)
+        evento = self._em_andamento.pop(chave, None)
+        if evento is not None:
+            evento.set()
+
+def _erro(status: int, detail: str) -> JSONResponse:
+    return JSONResponse({"detail": detail}, status_code=status)
+
+class IdempotenciaMiddleware:
+    """
+    Middleware ASGI do cabeçalho `Idempotency-Key` nos POST de criação.
+
+    A primeira resposta (exceto 5xx, que o cliente pode tentar de novo) fica guardada
+    pela chave; repetições recebem a mesma resposta, com `Idempotent-Replayed: true`,
+    sem chegar às rotas nem ao banco. Repetições simultâneas aguardam a original. A
+    mesma chave com outro corpo é recusada com 422.
+    """
+
+    def __init__(self, app, armazenamento: Optional[ArmazenamentoIdempotencia] = None):
+        self.app = app
+        self.armazenamento = armazenamento or ArmazenamentoMemoria()
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["method"] != "POST" or scope["path"] not in ROTAS_IDEMPOTENTES:
+            await self.app(scope, receive, send)
+            return
+        valor = dict(scope["headers"]).get(CABECALHO)
+        if valor is None:
+            await self.app(scope, receive, send)
+            return
+
+        if not valor or len(valor) > TAMANHO_MAXIMO_CHAVE:
+            await _erro(400, "Idempotency-Key inválida")(scope, receive, send)
+            return
+
+        # O corpo é lido por inteiro para compor a impressão digital e depois reentregue à rota.
+        corpo = bytearray()
+        while True:
+            message = await receive()
+            if message["type"] != "http.request":
+                return
+            corpo += message.get("body", b"")
+            if not message.get("more_body", False):
+                break
+        impressao = hashlib.sha256(bytes(corpo)).hexdigest()
+
+        chave = f"{scope['path']}:{valor.decode('latin-1')}"
+        try:
+            armazenada = await self.armazenamento.iniciar(chave)
+        except asyncio.TimeoutError:
+            IDEMPOTENCIA_REQUISICOES.labels("conflito").inc()
+            await _erro(409, "Requisição com esta Idempotency-Key ainda em andamento")(scope, receive, send)
+            return
+
+        if armazenada is not None:
+            if armazenada.impressao != impressao:
+                IDEMPOTENCIA_REQUISICOES.labels("corpo_diferente").inc()
+                await _erro(422, "Idempotency-Key já usada com outro corpo de requisição")(scope, receive, send)
+                return
+            IDEMPOTENCIA_REQUISICOES.labels("repeticao").inc()
+            await send({
+                "type": "http.response.start",
+                "status": armazenada.status,
+                "headers": armazenada.headers + [(b"idempotent-replayed", b"true")],
+            })
+            await send({"type": "http.response.body", "body": armazenada.corpo})
+            return
+
+        IDEMPOTENCIA_REQUISICOES.labels("nova").inc()
+        resposta = await self._executar(scope, receive, send, bytes(corpo), impressao, chave)
+        await self.armazenamento.concluir(chave, resposta)
+
+    async def _executar(self, scope, receive, send, corpo: bytes, impressao: str, chave: str) -> Optional[RespostaArmazenada]:
+        """Executa a rota, repassando a resposta ao cliente e guardando uma cópia dela."""
+        entregue = False
+        inicio = {}
+        partes = []
+
+        async def receive_com_corpo():
+            nonlocal entregue
+            if not entregue:
+                entregue = True
+                return {"type": "http.request", "body": corpo, "more_body": False}
+            return await receive()
+
+        async def send_copiando(message):
+            if message["type"] == "http.response.start":
+                inicio.update(message)
+            elif message["type"] == "http.response.body":
+                partes.append(message.get("body", b""))
+            await send(message)
+
+        try:
+            await self.app(scope, receive_com_corpo, send_copiando)
+        except BaseException:
+            await self.armazenamento.concluir(chave, None)
+            raise
+        if not inicio or inicio["status"] >= 500:
+            return None
+        return RespostaArmazenada(impressao, inicio["status"], list(inicio.get("headers", [])), b"".join(partes))
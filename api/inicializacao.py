@@ -0,0 +1,53 @@
+"""
+Inicialização da aplicação no lifespan do FastAPI, e não na importação do módulo.
+
+Importar `api.app` não abre conexões nem inicializa o APM; cada etapa roda ao
+subir o servidor e pode ser desligada por variável de ambiente:
+
+- STARTUP_CREATE_SCHEMA (padrão 1): cria tabelas e índices que faltam. Com 0, o
+  schema fica a cargo do comando de migração `python -m api.schema`. Sob o
+  gunicorn, o schema é criado uma vez no mestre e os workers sobem com 0
+  (ver api/gunicorn_conf.py);
+- STARTUP_DB_CHECK (padrão 0): abre uma conexão ao subir, para falhar cedo se o
+  banco estiver inacessível e deixar o pool aquecido.
+
+O agente do New Relic não entra aqui: ele precisa instrumentar o servidor antes de
+ele aceitar conexões (inicializado com o servidor já rodando, derruba as conexões
+HTTP). Ele é ligado pelo comando de partida do Dockerfile,
+`newrelic-admin run-program gunicorn -c python:api.gunicorn_conf api.app:app`;
+subir o gunicorn ou o uvicorn sem o `newrelic-admin run-program` dispensa o APM.
+"""
+import logging
+import os
+import time
+from contextlib import asynccontextmanager
+
+from fastapi import FastAPI
+from sqlalchemy import text
+
+from . import database
+from .schema import create_schema
+
+logger = logging.getLogger(__name__)
+
+def _habilitado(nome: str, padrao: str) -> bool:
+    return os.getenv(nome, padrao).lower() in ("1", "true", "yes")
+
+def verificar_banco(engine) -> None:
+    with engine.connect() as conn:
+        conn.execute(text("SELECT 1"))
+
+def _etapa(nome: str, funcao, *args) -> None:
+    inicio = time.perf_counter()
+    funcao(*args)
+    logger.info("Inicialização: %s em %.1f ms", nome, (time.perf_counter() - inicio) * 1000)
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    engine = database.iniciar_engines()
+    if _habilitado("STARTUP_CREATE_SCHEMA", "1"):
+        _etapa("schema", create_schema, engine)
+    if _habilitado("STARTUP_DB_CHECK", "0"):
+        _etapa("conexão com o banco", verificar_banco, engine)
+    yield
+    await database.encerrar_engines()
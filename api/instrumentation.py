@@ -0,0 +1,98 @@
+import logging
+import os
+import time
+from collections import Counter
+from contextvars import ContextVar
+from typing import Optional
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from .metrics import SQL_N_MAIS_UM, SQL_QUERIES_POR_REQUISICAO, SQL_TEMPO_POR_REQUISICAO
+
+logger = logging.getLogger(__name__)
+
+# Detector de N+1: avisa quando uma requisição executa o mesmo comando (mesmo SQL,
+# parâmetros diferentes) mais vezes que o limite. 0 desliga o detector.
+LIMITE_N_MAIS_UM = int(os.getenv("SQL_N_PLUS_ONE_THRESHOLD", "0"))
+
+class EstatisticasSQL:
+    """Comandos SQL executados durante uma requisição."""
+
+    def __init__(self):
+        self.consultas = 0
+        self.tempo = 0.0
+        self.por_comando = Counter()
+
+    def registrar(self, comando: str, duracao: float) -> None:
+        self.consultas += 1
+        self.tempo += duracao
+        self.por_comando[comando] += 1
+
+# A requisição corrente. O objeto é compartilhado (não copiado) com o threadpool e
+# com o greenlet do modo assíncrono, que herdam o contexto de quem os chamou.
+_estatisticas: ContextVar[Optional[EstatisticasSQL]] = ContextVar("estatisticas_sql", default=None)
+
+@event.listens_for(Engine, "before_cursor_execute")
+def _antes_de_executar(conn, cursor, statement, parameters, context, executemany):
+    if _estatisticas.get() is not None:
+        conn.info.setdefault("ellis_inicio_consulta", []).append(time.perf_counter())
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _depois_de_executar(conn, cursor, statement, parameters, context, executemany):
+    estatisticas = _estatisticas.get()
+    inicios = conn.info.get("ellis_inicio_consulta")
+    if estatisticas is None or not inicios:
+        return
+    estatisticas.registrar(" ".join(statement.split()), time.perf_counter() - inicios.pop())
+
+def _nome_rota(scope) -> str:
+    rota = scope.get("route")
+    return getattr(rota, "path", None) or "desconhecida"
+
+class InstrumentacaoSQLMiddleware:
+    """
+    Middleware ASGI que conta os comandos SQL e o tempo de banco de cada requisição.
+
+    Publica os totais em histogramas por rota, informa-os ao cliente no cabeçalho
+    `Server-Timing` (visível nas ferramentas do navegador) e, se configurado, avisa
+    no log sobre padrões de N+1.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        estatisticas = EstatisticasSQL()
+        token = _estatisticas.set(estatisticas)
+
+        async def send_com_server_timing(message):
+            if message["type"] == "http.response.start":
+                valor = f'db;dur={estatisticas.tempo * 1000:.2f};desc="{estatisticas.consultas} queries"'
+                message["headers"] = list(message.get("headers", [])) + [(b"server-timing", valor.encode())]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_com_server_timing)
+        finally:
+            _estatisticas.reset(token)
+            self._registrar(scope, estatisticas)
+
+    def _registrar(self, scope, estatisticas: EstatisticasSQL) -> None:
+        metodo, rota = scope["method"], _nome_rota(scope)
+        SQL_QUERIES_POR_REQUISICAO.labels(metodo, rota).observe(estatisticas.consultas)
+        SQL_TEMPO_POR_REQUISICAO.labels(metodo, rota).observe(estatisticas.tempo)
+
+        if LIMITE_N_MAIS_UM <= 0 or not estatisticas.por_comando:
+            return
+        comando, repeticoes = estatisticas.por_comando.most_common(1)[0]
+        if repeticoes > LIMITE_N_MAIS_UM:
+            SQL_N_MAIS_UM.labels(metodo, rota).inc()
+            logger.warning(
+                "Possível N+1 em %s %s: o mesmo comando foi executado %d vezes (limite %d): %s",
+                metodo, rota, repeticoes, LIMITE_N_MAIS_UM, comando,
+            )
@@ -0,0 +1,138 @@
+from prometheus_client import Counter, Gauge, Histogram
+
+# Métricas próprias da aplicação. Ficam no registro padrão do prometheus_client,
+# o mesmo exposto pelo Instrumentator em /metrics.
+#
+# Com vários workers (gunicorn, PROMETHEUS_MULTIPROC_DIR definido), cada processo grava
+# seus valores em arquivos e o /metrics soma os de todos. Nos gauges, `livesum` soma
+# apenas os workers vivos.
+
+CACHE_HITS = Counter(
+    "ellis_cache_hits_total",
+    "Consultas atendidas pelo cache em memória",
+    ["cache"],
+)
+CACHE_MISSES = Counter(
+    "ellis_cache_misses_total",
+    "Consultas ao cache em memória que precisaram ir ao banco",
+    ["cache"],
+)
+
+# --- Pool de conexões do SQLAlchemy ---
+# O label `pool` identifica o engine (por exemplo, "primary").
+POOL_CHECKOUT_WAIT = Histogram(
+    "ellis_db_pool_checkout_wait_seconds",
+    "Tempo para obter uma conexão do pool (inclui abrir conexões novas)",
+    ["pool"],
+    buckets=(0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30),
+)
+POOL_CHECKOUT_TIMEOUTS = Counter(
+    "ellis_db_pool_checkout_timeouts_total",
+    "Requisições de conexão que estouraram o pool_timeout",
+    ["pool"],
+)
+POOL_CHECKED_OUT = Gauge(
+    "ellis_db_pool_checked_out",
+    "Conexões do pool em uso no momento",
+    ["pool"],
+    multiprocess_mode="livesum",
+)
+POOL_OVERFLOW = Gauge(
+    "ellis_db_pool_overflow",
+    "Conexões abertas além do pool_size (uso do max_overflow)",
+    ["pool"],
+    multiprocess_mode="livesum",
+)
+POOL_SIZE = Gauge(
+    "ellis_db_pool_size",
+    "Tamanho configurado do pool (pool_size), somado entre os workers",
+    ["pool"],
+    multiprocess_mode="livesum",
+)
+
+# --- Consultas SQL por requisição ---
+# O label `route` é o template da rota (ex.: /alunos/{aluno_id}), para manter a cardinalidade baixa.
+SQL_QUERIES_POR_REQUISICAO = Histogram(
+    "ellis_db_queries_per_request",
+    "Quantidade de comandos SQL executados por requisição",
+    ["method", "route"],
+    buckets=(0, 1, 2, 3, 5, 10, 20, 50, 100, 250, 1000),
+)
+SQL_TEMPO_POR_REQUISICAO = Histogram(
+    "ellis_db_time_per_request_seconds",
+    "Tempo gasto em comandos SQL por requisição",
+    ["method", "route"],
+    buckets=(0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10),
+)
+SQL_N_MAIS_UM = Counter(
+    "ellis_db_n_plus_one_total",
+    "Requisições em que o detector de N+1 encontrou um comando repetido acima do limite",
+    ["method", "route"],
+)
+
+# --- Réplica de leitura ---
+REPLICA_LEITURAS = Counter(
+    "ellis_db_replica_reads_total",
+    "Comandos de leitura encaminhados para a réplica",
+)
+REPLICA_FALLBACKS = Counter(
+    "ellis_db_replica_fallback_total",
+    "Leituras elegíveis para a réplica que foram para o primário porque ela estava indisponível",
+    ["motivo"],  # erro_conexao: a conexão falhou agora; indisponivel: falha recente, aguardando nova tentativa
+)
+
+# --- Compressão das respostas ---
+# O label `encoding` é a codificação usada (gzip ou br).
+COMPRESSAO_RAZAO = Histogram(
+    "ellis_compression_ratio",
+    "Tamanho comprimido dividido pelo tamanho original, por resposta",
+    ["encoding"],
+    buckets=(0.02, 0.05, 0.1, 0.15, 0.2, 0.3, 0.4, 0.5, 0.75, 1),
+)
+COMPRESSAO_TEMPO_CPU = Histogram(
+    "ellis_compression_cpu_seconds",
+    "Tempo de CPU gasto comprimindo cada resposta",
+    ["encoding"],
+    buckets=(0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 1),
+)
+COMPRESSAO_BYTES = Counter(
+    "ellis_compression_bytes_total",
+    "Bytes das respostas comprimidas, antes (entrada) e depois (saida) da compressão",
+    ["encoding", "direcao"],
+)
+
+# --- Idempotency-Key ---
+IDEMPOTENCIA_REQUISICOES = Counter(
+    "ellis_idempotency_requests_total",
+    "POSTs com Idempotency-Key, por resultado",
+    # nova: primeira requisição da chave; repeticao: resposta armazenada devolvida;
+    # espera: aguardou uma requisição simultânea com a mesma chave; conflito: a espera
+    # estourou o limite (409); corpo_diferente: chave reutilizada com outro corpo (422)
+    ["resultado"],
+)
+
+# --- Controle de admissão ---
+# O label `classe` separa leituras (GET/HEAD) de escritas.
+ADMISSAO_FILA = Gauge(
+    "ellis_admission_queue_depth",
+    "Requisições aguardando vaga no controle de admissão",
+    ["classe"],
+    multiprocess_mode="livesum",
+)
+ADMISSAO_EM_EXECUCAO = Gauge(
+    "ellis_admission_in_flight",
+    "Requisições admitidas e em execução",
+    ["classe"],
+    multiprocess_mode="livesum",
+)
+ADMISSAO_ESPERA = Histogram(
+    "ellis_admission_wait_seconds",
+    "Tempo na fila do controle de admissão (só das requisições que precisaram esperar)",
+    ["classe"],
+    buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10),
+)
+ADMISSAO_REJEITADAS = Counter(
+    "ellis_admission_rejected_total",
+    "Requisições recusadas com 503 pelo controle de admissão",
+    ["classe", "motivo"],  # fila_cheia: sem lugar na fila; tempo_esgotado: esperou além do limite
+)
@@ -9,7 +9,7 @@ class Aluno(Base):
     email = Column(String, unique=True, index=True)
     telefone = Column(String)
     # Relacionamento: Um aluno pode ter várias matrículas
-    matriculas = relationship("Matricula", back_populates="aluno")
+    matriculas = relationship("Matricula", back_populates="aluno", passive_deletes=True)
 
 class Curso(Base):
     __tablename__ = "cursos"
@@ -18,13 +18,27 @@ class Curso(Base):
     codigo = Column(String, unique=True, index=True)
     carga_horaria = Column(Integer)
     # Relacionamento: Um curso pode ter várias matrículas
-    matriculas = relationship("Matricula", back_populates="curso")
+    matriculas = relationship("Matricula", back_populates="curso", passive_deletes=True)
 
 class Matricula(Base):
     __tablename__ = "matriculas"
     id = Column(Integer, primary_key=True, index=True)
-    aluno_id = Column(Integer, ForeignKey("alunos.id"))
-    curso_id = Column(Integer, ForeignKey("cursos.id"))
+    aluno_id = Column(Integer, ForeignKey("alunos.id", ondelete="CASCADE"))
+    # Indexado à parte: o índice de uq_aluno_curso começa por aluno_id e não serve às
+    # buscas por curso nem ao ON DELETE CASCADE da exclusão de cursos.
+    curso_id = Column(Integer, ForeignKey("cursos.id", ondelete="CASCADE"), index=True)
     aluno = relationship("Aluno", back_populates="matriculas")
     curso = relationship("Curso", back_populates="matriculas")
-    __table_args__ = (UniqueConstraint('aluno_id', 'curso_id', name='uq_aluno_curso'),)
\ No newline at end of file
+    __table_args__ = (UniqueConstraint('aluno_id', 'curso_id', name='uq_aluno_curso'),)
+
+class VersaoTabela(Base):
+    """Versão de cada tabela, incrementada a cada escrita; base das ETags das leituras."""
+    __tablename__ = "versoes_tabelas"
+    tabela = Column(String, primary_key=True)
+    versao = Column(Integer, nullable=False, default=0)
+
+class ResumoCurso(Base):
+    """Quantidade de matrículas de cada curso, mantida pela API na mesma transação de cada escrita."""
+    __tablename__ = "resumo_cursos"
+    curso_id = Column(Integer, ForeignKey("cursos.id", ondelete="CASCADE"), primary_key=True)
+    total_matriculas = Column(Integer, nullable=False, default=0)
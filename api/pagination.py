@@ -0,0 +1,65 @@
+import base64
+import binascii
+import json
+from typing import Optional, Tuple, List
+
+from fastapi import HTTPException
+
+# Tamanho de página usado quando o cliente envia apenas o cursor 'after'.
+LIMITE_PADRAO = 100
+# Maior página aceita em uma única requisição.
+LIMITE_MAXIMO = 1000
+# Maior valor de uma chave primária INTEGER (32 bits com sinal).
+ID_MAXIMO = 2**31 - 1
+
+
+def encode_cursor(ultimo_id: int) -> str:
+    """
+    Gera um cursor opaco a partir do último ID retornado na página.
+
+    O cliente não deve interpretar o valor; ele apenas o devolve no parâmetro 'after'.
+    """
+    payload = json.dumps({"id": ultimo_id}, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(payload).rstrip(b"=").decode()
+
+
+def decode_cursor(cursor: str) -> int:
+    """
+    Recupera o ID contido em um cursor gerado por `encode_cursor`.
+
+    Raises:
+        HTTPException: 400 - Cursor malformado.
+    """
+    try:
+        padding = "=" * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(cursor + padding))
+        ultimo_id = payload["id"]
+    except (ValueError, TypeError, KeyError, binascii.Error):
+        raise HTTPException(status_code=400, detail="Cursor de paginação inválido")
+    # `type(...) is int` recusa booleanos; fora da faixa da coluna, o driver falharia com 500.
+    if type(ultimo_id) is not int or not 0 <= ultimo_id <= ID_MAXIMO:
+        raise HTTPException(status_code=400, detail="Cursor de paginação inválido")
+    return ultimo_id
+
+
+def paginar(query, coluna_id, limit: Optional[int], after: Optional[str]) -> Tuple[List, Optional[str]]:
+    """
+    Aplica paginação por chave (keyset) a uma query ordenada pela chave primária.
+
+    Em vez de OFFSET, filtra por `id > ultimo_id`, de modo que o custo de qualquer
+    página é o de uma busca no índice da chave primária, independente da profundidade.
+    Busca um registro a mais que o limite apenas para saber se existe próxima página.
+
+    Returns:
+        Uma tupla (registros, next_cursor); next_cursor é None na última página.
+    """
+    limit = limit or LIMITE_PADRAO
+    if after is not None:
+        query = query.filter(coluna_id > decode_cursor(after))
+
+    registros = query.order_by(coluna_id).limit(limit + 1).all()
+    if len(registros) <= limit:
+        return registros, None
+
+    registros = registros[:limit]
+    return registros, encode_cursor(registros[-1].id)
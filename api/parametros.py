@@ -0,0 +1,39 @@
+from typing import List, Optional
+
+from fastapi import HTTPException
+
+from .pagination import ID_MAXIMO
+
+# Maior quantidade de chaves aceita em um único parâmetro de lista (exclusão e busca em lote).
+LIMITE_CHAVES = 1000
+
+
+def separar_valores(valores: Optional[List[str]]) -> List[str]:
+    """
+    Junta os valores de um parâmetro de lista da query string, sem repetições e na ordem recebida.
+
+    Aceita tanto `?ids=1,2,3` quanto `?ids=1&ids=2&ids=3`.
+
+    Raises:
+        HTTPException: 400 - Lista vazia ou com mais de `LIMITE_CHAVES` valores.
+    """
+    separados = dict.fromkeys(
+        parte.strip() for valor in valores or [] for parte in valor.split(",") if parte.strip()
+    )
+    if not separados:
+        raise HTTPException(status_code=400, detail="Informe ao menos um valor")
+    if len(separados) > LIMITE_CHAVES:
+        raise HTTPException(status_code=400, detail=f"No máximo {LIMITE_CHAVES} valores por requisição")
+    return list(separados)
+
+
+def separar_ids(valores: Optional[List[str]]) -> List[int]:
+    """Como `separar_valores`, convertendo cada valor em um ID inteiro (400 se algum não for ou sair de 1..`ID_MAXIMO`)."""
+    try:
+        ids = [int(valor) for valor in separar_valores(valores)]
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Lista de IDs inválida")
+    # Fora da faixa da coluna INTEGER, o driver falharia com OverflowError/DataError (500).
+    if any(not 1 <= id_ <= ID_MAXIMO for id_ in ids):
+        raise HTTPException(status_code=400, detail="Lista de IDs inválida")
+    return ids
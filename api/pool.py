@@ -0,0 +1,47 @@
+import time
+
+from sqlalchemy import exc
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+
+from .metrics import POOL_CHECKED_OUT, POOL_CHECKOUT_TIMEOUTS, POOL_CHECKOUT_WAIT, POOL_OVERFLOW, POOL_SIZE
+
+class _PoolInstrumentado:
+    """
+    Mixin para os pools com fila do SQLAlchemy que publica métricas no Prometheus.
+
+    Mede o tempo de cada checkout (espera na fila ou abertura de conexão), conta
+    os checkouts que estouram o `pool_timeout` e mantém os gauges de conexões em
+    uso e de overflow atualizados a cada checkout/checkin.
+    """
+
+    nome_pool = "primary"
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        POOL_SIZE.labels(self.nome_pool).set(self.size())
+
+    def connect(self):
+        inicio = time.perf_counter()
+        try:
+            conexao = super().connect()
+        except exc.TimeoutError:
+            POOL_CHECKOUT_TIMEOUTS.labels(self.nome_pool).inc()
+            raise
+        finally:
+            POOL_CHECKOUT_WAIT.labels(self.nome_pool).observe(time.perf_counter() - inicio)
+        self._atualizar_gauges()
+        return conexao
+
+    def _do_return_conn(self, record):
+        # Chamado depois que a conexão volta para a fila (o evento "checkin" é anterior).
+        super()._do_return_conn(record)
+        self._atualizar_gauges()
+
+    def _atualizar_gauges(self) -> None:
+        POOL_CHECKED_OUT.labels(self.nome_pool).set(self.checkedout())
+        POOL_OVERFLOW.labels(self.nome_pool).set(max(self.overflow(), 0))
+
+def pool_instrumentado(nome: str, assincrono: bool = False):
+    """Classe de pool (para o `poolclass` do create_engine) que publica métricas com o label `nome`."""
+    base = AsyncAdaptedQueuePool if assincrono else QueuePool
+    return type(f"{base.__name__}Instrumentado", (_PoolInstrumentado, base), {"nome_pool": nome})
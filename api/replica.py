@@ -0,0 +1,87 @@
+"""
+Roteamento opcional de leituras para uma réplica (DATABASE_REPLICA_URL).
+
+As sessões das requisições GET/HEAD enviam os SELECTs para a réplica; as demais
+requisições usam somente o primário, para que as leituras feitas antes de uma
+escrita (validações, SELECT ... FOR UPDATE) vejam os dados mais recentes. Se uma
+sessão de leitura escrever algo, ela passa a usar o primário até o fim.
+
+Se a conexão com a réplica falhar, a leitura vai para o primário e a réplica sai
+da rotação por DATABASE_REPLICA_RETRY_SECONDS (padrão 30) segundos. Os desvios
+são contados em `ellis_db_replica_fallback_total`.
+"""
+import logging
+import os
+import time
+
+from sqlalchemy import exc
+from sqlalchemy.orm import Session
+
+from .metrics import REPLICA_FALLBACKS, REPLICA_LEITURAS
+
+logger = logging.getLogger(__name__)
+
+# Segundos que a réplica fica fora da rotação depois de uma falha de conexão.
+INTERVALO_NOVA_TENTATIVA = float(os.getenv("DATABASE_REPLICA_RETRY_SECONDS", "30"))
+
+# Métodos HTTP cujas sessões leem da réplica.
+METODOS_LEITURA = frozenset({"GET", "HEAD"})
+
+_replica = None
+_indisponivel_ate = 0.0
+
+def configurar_replica(engine) -> None:
+    """Define o engine síncrono da réplica (None desliga o roteamento)."""
+    global _replica, _indisponivel_ate
+    _replica = engine
+    _indisponivel_ate = 0.0
+
+def _marcar_indisponivel() -> None:
+    global _indisponivel_ate
+    _indisponivel_ate = time.monotonic() + INTERVALO_NOVA_TENTATIVA
+
+class SessaoRoteada(Session):
+    """
+    Session que escolhe entre primário e réplica a cada comando.
+
+    `somente_leitura` é definido pelo `get_db` a partir do método HTTP; sessões
+    criadas fora das requisições (scripts, testes) usam sempre o primário.
+    """
+
+    somente_leitura = False
+    _apos_escrita = False
+
+    def get_bind(self, mapper=None, *, clause=None, bind=None, **kw):
+        if bind is not None or _replica is None or not self._leitura_elegivel(clause):
+            return super().get_bind(mapper, clause=clause, bind=bind, **kw)
+
+        if time.monotonic() < _indisponivel_ate:
+            REPLICA_FALLBACKS.labels("indisponivel").inc()
+            return super().get_bind(mapper, clause=clause, **kw)
+
+        if clause is not None:
+            # Abre (ou reaproveita) a conexão da réplica na transação da sessão agora,
+            # para que uma falha ainda possa ser desviada para o primário.
+            try:
+                self.connection(bind_arguments={"bind": _replica})
+            except exc.DBAPIError:
+                logger.warning("Réplica indisponível; leituras vão para o primário por %.0fs", INTERVALO_NOVA_TENTATIVA, exc_info=True)
+                _marcar_indisponivel()
+                REPLICA_FALLBACKS.labels("erro_conexao").inc()
+                return super().get_bind(mapper, clause=clause, **kw)
+            REPLICA_LEITURAS.inc()
+        return _replica
+
+    def _leitura_elegivel(self, clause) -> bool:
+        if not self.somente_leitura or self._apos_escrita:
+            return False
+        if self._flushing or (clause is not None and not self._eh_leitura(clause)):
+            # A partir da primeira escrita, a sessão fica no primário (lê o que escreveu).
+            self._apos_escrita = True
+            return False
+        # Sem comando (ex.: `get_bind()` para descobrir o dialeto): vale a réplica.
+        return True
+
+    @staticmethod
+    def _eh_leitura(clause) -> bool:
+        return getattr(clause, "is_select", False) and getattr(clause, "_for_update_arg", None) is None
@@ -0,0 +1,142 @@
+"""
+Resumo de matrículas por curso (tabela `resumo_cursos`), mantido de forma incremental.
+
+Cada escrita que cria, move ou apaga matrículas aplica a diferença de contagem por
+curso na mesma transação, de modo que as leituras do resumo não dependem do tamanho
+da tabela `matriculas`. A carga horária total é derivada na leitura
+(`total_matriculas * carga_horaria`), então alterar a carga de um curso não exige
+atualizar o resumo.
+
+Para verificar ou corrigir divergências (dados carregados fora da API, por exemplo):
+
+    python -m api.resumo            # lista os cursos com contagem divergente
+    python -m api.resumo --reconstruir
+"""
+import argparse
+import sys
+from collections import Counter
+from typing import Dict, Iterable, List, Tuple
+
+from sqlalchemy import delete, func, select, true
+from sqlalchemy.orm import Session
+
+from . import models
+from .database import dialect_insert
+from .etag import incrementar_versoes
+
+def aplicar_deltas(db: Session, deltas: Dict[int, int]) -> None:
+    """
+    Soma `deltas[curso_id]` à contagem de cada curso na transação corrente.
+
+    Os cursos são atualizados em ordem de ID para que transações concorrentes
+    travem as linhas do resumo sempre na mesma ordem.
+    """
+    valores = [
+        {"curso_id": curso_id, "total_matriculas": delta}
+        for curso_id, delta in sorted(deltas.items())
+        if delta
+    ]
+    if not valores:
+        return
+    stmt = dialect_insert(db, models.ResumoCurso).values(valores)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=["curso_id"],
+        set_={"total_matriculas": models.ResumoCurso.total_matriculas + stmt.excluded.total_matriculas},
+    )
+    db.execute(stmt)
+
+def contar_por_curso(cursos_ids: Iterable[int], sinal: int = 1) -> Dict[int, int]:
+    """Deltas por curso a partir da lista de cursos das matrículas alteradas."""
+    return {curso_id: total * sinal for curso_id, total in Counter(cursos_ids).items()}
+
+def apagar_matriculas(db: Session, *condicoes) -> None:
+    """
+    Apaga as matrículas que satisfazem as condições e as desconta do resumo.
+
+    Os deltas vêm do próprio DELETE ... RETURNING: só as linhas que esta transação
+    realmente apagou são descontadas, mesmo com outra exclusão concorrente das mesmas.
+    """
+    stmt = (
+        delete(models.Matricula)
+        .where(*condicoes)
+        .returning(models.Matricula.curso_id)
+        .execution_options(synchronize_session=False)
+    )
+    aplicar_deltas(db, contar_por_curso(db.scalars(stmt), -1))
+
+def _contagens_por_curso():
+    return select(models.Matricula.curso_id, func.count()).group_by(models.Matricula.curso_id)
+
+def popular_se_vazio(db: Session) -> None:
+    """
+    Preenche o resumo a partir de `matriculas` se ele estiver vazio.
+
+    Chamada na criação do schema: em um banco já existente, o `create_all` cria
+    `resumo_cursos` sem linhas, e as leituras passariam a ver zero matrículas.
+    O ON CONFLICT cobre workers que sobem ao mesmo tempo.
+    """
+    if db.scalar(select(models.ResumoCurso.curso_id).limit(1)) is not None:
+        return
+    # O WHERE explícito evita a ambiguidade do SQLite entre INSERT ... SELECT e ON CONFLICT.
+    stmt = dialect_insert(db, models.ResumoCurso).from_select(
+        ["curso_id", "total_matriculas"], _contagens_por_curso().where(true())
+    )
+    db.execute(stmt.on_conflict_do_nothing(index_elements=["curso_id"]))
+
+def _contagens_reais(db: Session) -> Dict[int, int]:
+    return dict(db.execute(_contagens_por_curso()).all())
+
+def verificar(db: Session) -> List[Tuple[int, int, int]]:
+    """
+    Compara o resumo com a contagem feita sobre `matriculas`.
+
+    Returns:
+        Lista de (curso_id, total no resumo, total real) dos cursos divergentes.
+    """
+    resumo = dict(db.execute(select(models.ResumoCurso.curso_id, models.ResumoCurso.total_matriculas)).all())
+    reais = _contagens_reais(db)
+    return [
+        (curso_id, resumo.get(curso_id, 0), reais.get(curso_id, 0))
+        for curso_id in sorted(resumo.keys() | reais.keys())
+        if resumo.get(curso_id, 0) != reais.get(curso_id, 0)
+    ]
+
+def reconstruir(db: Session) -> None:
+    """
+    Recalcula o resumo inteiro a partir de `matriculas` e faz o commit.
+
+    Também incrementa a versão de `matriculas`, na mesma transação: as ETags das
+    leituras que usam o resumo mudam, e os clientes não ficam com contagens antigas.
+    """
+    if db.get_bind().dialect.name == "postgresql":
+        # Bloqueia escritas em matrículas durante a reconstrução (leituras continuam).
+        db.connection().exec_driver_sql("LOCK TABLE matriculas IN SHARE MODE")
+    db.execute(delete(models.ResumoCurso))
+    db.execute(models.ResumoCurso.__table__.insert().from_select(["curso_id", "total_matriculas"], _contagens_por_curso()))
+    incrementar_versoes(db, "matriculas")
+    db.commit()
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Verifica ou reconstrói o resumo de matrículas por curso.")
+    parser.add_argument("--reconstruir", action="store_true", help="Recalcula o resumo a partir da tabela de matrículas")
+    args = parser.parse_args(argv)
+
+    from .database import SessionLocal, iniciar_engines
+
+    iniciar_engines()
+    with SessionLocal() as db:
+        if args.reconstruir:
+            reconstruir(db)
+            print("Resumo de matrículas reconstruído.")
+            return 0
+        divergencias = verificar(db)
+    for curso_id, no_resumo, real in divergencias:
+        print(f"curso {curso_id}: resumo={no_resumo} real={real}")
+    if divergencias:
+        print(f"{len(divergencias)} curso(s) divergente(s); use --reconstruir para corrigir.")
+        return 1
+    print("Resumo consistente.")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
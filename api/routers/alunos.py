@@ -1,23 +1,103 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
 from sqlalchemy.orm import Session
-from typing import List
-from ..schemas import Aluno, AlunoCreate
-from ..database import get_db
+from sqlalchemy import bindparam, delete, select
+from typing import List, Optional, Union, Literal
+from ..schemas import Aluno, AlunoCreate, Pagina, AlunoLoteResultado, AlunoCriadoLote, ErroLote, ExclusaoLote, BuscaLoteAlunos
+from ..database import get_db, dialect_insert, run_db, DbSession
+from ..pagination import paginar, LIMITE_MAXIMO
+from ..parametros import separar_ids
+from ..export import exportar
+from ..search import filtro_substring, ordem_relevancia, LIMITE_BUSCA_PADRAO
+from ..etag import incrementar_versoes, responder_com_etag
+from ..resumo import apagar_matriculas
+from .. import consultas, serializacao
 from .. import models # Importa o módulo de modelos
 
 alunos_router = APIRouter()
 
-@alunos_router.get("/alunos", response_model=List[Aluno])
-def read_alunos(db: Session = Depends(get_db)):
+# Quantidade de alunos enviada em cada INSERT multi-linha do cadastro em lote.
+TAMANHO_LOTE_INSERCAO = 1000
+
+# Colunas lidas pelo caminho rápido, na ordem dos campos de `schemas.Aluno`.
+COLUNAS_ALUNO = (models.Aluno.id, models.Aluno.nome, models.Aluno.email, models.Aluno.telefone)
+
+def _read_alunos_rapido(db: Session, limit: Optional[int], after: Optional[str]):
+    query = db.query(*COLUNAS_ALUNO)
+    if limit is None and after is None:
+        return serializacao.resposta_json(serializacao.linhas_como_dicts(query.all()))
+
+    linhas, next_cursor = paginar(query, models.Aluno.id, limit, after)
+    return serializacao.resposta_pagina(serializacao.linhas_como_dicts(linhas), next_cursor)
+
+def _read_alunos(db: Session, limit: Optional[int], after: Optional[str]):
+    if serializacao.SERIALIZACAO_RAPIDA:
+        return _read_alunos_rapido(db, limit, after)
+
+    if limit is None and after is None:
+        alunos = db.query(models.Aluno).all()
+        return [Aluno.model_validate(aluno) for aluno in alunos]
+
+    alunos, next_cursor = paginar(db.query(models.Aluno), models.Aluno.id, limit, after)
+    return Pagina[Aluno](items=[Aluno.model_validate(aluno) for aluno in alunos], next_cursor=next_cursor)
+
+def _read_alunos_por_ids(db: Session, ids: List[int]):
+    linhas = db.execute(select(*COLUNAS_ALUNO).where(models.Aluno.id.in_(ids))).all()
+    encontrados = {linha.id: Aluno(**linha._mapping) for linha in linhas}
+    return BuscaLoteAlunos(encontrados=encontrados, nao_encontrados=[aluno_id for aluno_id in ids if aluno_id not in encontrados])
+
+@alunos_router.get("/alunos", response_model=Union[List[Aluno], Pagina[Aluno], BuscaLoteAlunos])
+async def read_alunos(
+    request: Request,
+    response: Response,
+    limit: Optional[int] = Query(None, ge=1, le=LIMITE_MAXIMO),
+    after: Optional[str] = None,
+    ids: Optional[List[str]] = Query(None, description="IDs separados por vírgula ou repetidos"),
+    db: DbSession = Depends(get_db),
+):
     """
     Retorna uma lista de todos os alunos cadastrados.
 
+    Sem parâmetros, mantém o formato original (lista completa). Com `limit` e/ou
+    `after`, retorna uma página ordenada por ID com o cursor da próxima página.
+
+    Args:
+        limit: Quantidade máxima de alunos na página.
+        after: Cursor opaco recebido em `next_cursor` na página anterior.
+        ids: Busca em lote (`?ids=1,2,3`): uma única consulta, com os alunos
+            indexados pelo ID e os IDs inexistentes em `nao_encontrados`, sem 404.
+            Não pode ser combinado com `limit`/`after`.
+
+    Suporta requisições condicionais: com `If-None-Match` igual à ETag atual,
+    responde 304 sem consultar a tabela.
     """
-    alunos = db.query(models.Aluno).all()
-    return [Aluno.model_validate(aluno) for aluno in alunos]
+    if ids is not None:
+        if limit is not None or after is not None:
+            raise HTTPException(status_code=400, detail="O parâmetro ids não pode ser combinado com limit/after")
+        return await responder_com_etag(request, response, db, ("alunos",), _read_alunos_por_ids, separar_ids(ids))
+    return await responder_com_etag(request, response, db, ("alunos",), _read_alunos, limit, after)
+
+@alunos_router.get("/alunos/export")
+async def export_alunos(formato: Literal["ndjson", "csv"] = "ndjson", db: DbSession = Depends(get_db)):
+    """
+    Exporta todos os alunos em NDJSON ou CSV, enviando o arquivo em partes.
+
+    A leitura usa um cursor no servidor em lotes de tamanho fixo, então a memória
+    usada não cresce com o número de alunos.
+
+    Args:
+        formato: "ndjson" (padrão) ou "csv".
+    """
+    stmt = select(models.Aluno.id, models.Aluno.nome, models.Aluno.email, models.Aluno.telefone).order_by(models.Aluno.id)
+    return exportar(db, stmt, ["id", "nome", "email", "telefone"], formato, "alunos")
+
+def _read_aluno(db: Session, aluno_id: int):
+    db_aluno = consultas.aluno_por_id(db, aluno_id)
+    if db_aluno is None:
+        raise HTTPException(status_code=404, detail="Aluno não encontrado")
+    return Aluno.model_validate(db_aluno)
 
 @alunos_router.get("/alunos/{aluno_id}", response_model=Aluno)
-def read_aluno(aluno_id: int, db: Session = Depends(get_db)):
+async def read_aluno(aluno_id: int, request: Request, response: Response, db: DbSession = Depends(get_db)):
     """
     Retorna os detalhes de um aluno específico com base no ID.
 
@@ -27,13 +107,18 @@ def read_aluno(aluno_id: int, db: Session = Depends(get_db)):
     Raises:
         HTTPException: Se o aluno não for encontrado.
     """
-    db_aluno = db.query(models.Aluno).filter(models.Aluno.id == aluno_id).first()
-    if db_aluno is None:
-        raise HTTPException(status_code=404, detail="Aluno não encontrado")
+    return await responder_com_etag(request, response, db, ("alunos",), _read_aluno, aluno_id)
+
+def _create_aluno(db: Session, aluno: AlunoCreate):
+    db_aluno = models.Aluno(**aluno.model_dump()) 
+    db.add(db_aluno)
+    incrementar_versoes(db, "alunos")
+    db.commit()
+    db.refresh(db_aluno)
     return Aluno.model_validate(db_aluno)
 
 @alunos_router.post("/alunos", response_model=Aluno)
-def create_aluno(aluno: AlunoCreate, db: Session = Depends(get_db)):
+async def create_aluno(aluno: AlunoCreate, db: DbSession = Depends(get_db)):
     """
     Cria um novo aluno com os dados fornecidos.
 
@@ -43,14 +128,75 @@ def create_aluno(aluno: AlunoCreate, db: Session = Depends(get_db)):
     Returns:
         Aluno: aluno criado.
     """ 
-    db_aluno = models.Aluno(**aluno.model_dump()) 
-    db.add(db_aluno)
+    return await run_db(db, _create_aluno, aluno)
+
+def _create_alunos_bulk(db: Session, alunos: List[AlunoCreate]):
+    criados, erros = [], []
+
+    # Primeira ocorrência de cada email; as repetições dentro do lote já são erro.
+    pendentes = {}
+    for indice, aluno in enumerate(alunos):
+        if aluno.email in pendentes:
+            erros.append(ErroLote(indice=indice, detail="Email repetido no lote"))
+        else:
+            pendentes[aluno.email] = indice
+
+    # ON CONFLICT DO NOTHING sobre o índice único de email: as linhas em conflito
+    # simplesmente não aparecem no RETURNING, sem abortar a transação.
+    stmt = (
+        dialect_insert(db, models.Aluno)
+        .on_conflict_do_nothing(index_elements=["email"])
+        .returning(models.Aluno.id, models.Aluno.email)
+    )
+    indices = list(pendentes.values())
+    for inicio in range(0, len(indices), TAMANHO_LOTE_INSERCAO):
+        lote = indices[inicio:inicio + TAMANHO_LOTE_INSERCAO]
+        inseridos = {email: id_ for id_, email in db.execute(stmt, [alunos[i].model_dump() for i in lote])}
+        for indice in lote:
+            email = alunos[indice].email
+            if email in inseridos:
+                criados.append(AlunoCriadoLote(indice=indice, id=inseridos[email], email=email))
+            else:
+                erros.append(ErroLote(indice=indice, detail="Email já cadastrado"))
+
+    if criados:
+        incrementar_versoes(db, "alunos")
+    db.commit()
+    erros.sort(key=lambda erro: erro.indice)
+    return AlunoLoteResultado(criados=criados, erros=erros)
+
+@alunos_router.post("/alunos/bulk", response_model=AlunoLoteResultado)
+async def create_alunos_bulk(alunos: List[AlunoCreate], db: DbSession = Depends(get_db)):
+    """
+    Cria vários alunos de uma vez, em uma única transação.
+
+    Os alunos são inseridos em INSERTs multi-linha com RETURNING, em lotes de
+    `TAMANHO_LOTE_INSERCAO`. Emails já cadastrados (ou repetidos na própria lista)
+    não interrompem o lote: o item é reportado em `erros` e os demais são criados.
+
+    Args:
+        alunos: Lista de alunos a serem criados.
+
+    Returns:
+        AlunoLoteResultado: IDs criados e erros, ambos indexados pela posição na lista.
+    """
+    return await run_db(db, _create_alunos_bulk, alunos)
+
+def _update_aluno(db: Session, aluno_id: int, aluno: AlunoCreate):
+    db_aluno = consultas.aluno_por_id(db, aluno_id)
+    if db_aluno is None:
+        raise HTTPException(status_code=404, detail="Aluno não encontrado")
+
+    for key, value in aluno.model_dump(exclude_unset=True).items():
+        setattr(db_aluno, key, value)
+
+    incrementar_versoes(db, "alunos")
     db.commit()
     db.refresh(db_aluno)
     return Aluno.model_validate(db_aluno)
 
 @alunos_router.put("/alunos/{aluno_id}", response_model=Aluno)
-def update_aluno(aluno_id: int, aluno: AlunoCreate, db: Session = Depends(get_db)):
+async def update_aluno(aluno_id: int, aluno: AlunoCreate, db: DbSession = Depends(get_db)):
     """
     Atualiza os dados de um aluno existente.
 
@@ -64,19 +210,47 @@ def update_aluno(aluno_id: int, aluno: AlunoCreate, db: Session = Depends(get_db
     Returns:
         Aluno: O aluno atualizado.
     """
-    db_aluno = db.query(models.Aluno).filter(models.Aluno.id == aluno_id).first()
-    if db_aluno is None:
-        raise HTTPException(status_code=404, detail="Aluno não encontrado")
+    return await run_db(db, _update_aluno, aluno_id, aluno)
 
-    for key, value in aluno.model_dump(exclude_unset=True).items():
-        setattr(db_aluno, key, value)
+# Comandos da exclusão, montados uma vez (ver api/consultas.py); `ids` é uma lista expandida no IN.
+_TRAVAR_ALUNOS = (
+    select(models.Aluno.id)
+    .where(models.Aluno.id.in_(bindparam("ids", expanding=True)))
+    .order_by(models.Aluno.id)
+    .with_for_update()
+)
+_APAGAR_ALUNOS = (
+    delete(models.Aluno)
+    .where(models.Aluno.id.in_(bindparam("ids", expanding=True)))
+    .returning(*COLUNAS_ALUNO)
+    .execution_options(synchronize_session=False)
+)
+
+def _apagar_alunos(db: Session, ids) -> list:
+    """
+    Apaga os alunos com um único DELETE ... RETURNING.
+
+    Os alunos são travados antes, e as matrículas deles são apagadas com DELETE ...
+    RETURNING, que fornece as contagens a descontar do resumo por curso: nenhuma
+    matrícula nova é criada no meio, e uma apagada por outra requisição não é
+    descontada duas vezes. O ON DELETE CASCADE não encontra mais nada a remover.
+    """
+    db.execute(_TRAVAR_ALUNOS, {"ids": list(ids)})
+    apagar_matriculas(db, models.Matricula.aluno_id.in_(ids))
+    return db.execute(_APAGAR_ALUNOS, {"ids": list(ids)}).all()
 
+def _delete_aluno(db: Session, aluno_id: int):
+    apagados = _apagar_alunos(db, [aluno_id])
+    if not apagados:
+        db.rollback()
+        raise HTTPException(status_code=404, detail="Aluno não encontrado")
+
+    incrementar_versoes(db, "alunos", "matriculas")
     db.commit()
-    db.refresh(db_aluno)
-    return Aluno.model_validate(db_aluno)
+    return Aluno(**apagados[0]._mapping)
 
 @alunos_router.delete("/alunos/{aluno_id}", response_model=Aluno)
-def delete_aluno(aluno_id: int, db: Session = Depends(get_db)):
+async def delete_aluno(aluno_id: int, db: DbSession = Depends(get_db)):
     """
     Exclui um aluno.
 
@@ -89,27 +263,57 @@ def delete_aluno(aluno_id: int, db: Session = Depends(get_db)):
     Returns:
         Aluno: O aluno excluído.
     """
-    db_aluno = db.query(models.Aluno).filter(models.Aluno.id == aluno_id).first()
-    if db_aluno is None:
-        raise HTTPException(status_code=404, detail="Aluno não encontrado")
+    return await run_db(db, _delete_aluno, aluno_id)
 
-    # Antes de apagar o aluno, apaga todas as matrículas associadas a ele
-    # para evitar erros de violação de chave estrangeira.
-    db.query(models.Matricula).filter(models.Matricula.aluno_id == aluno_id).delete(synchronize_session=False)
+def _delete_alunos(db: Session, ids: List[int]):
+    apagados = {linha.id for linha in _apagar_alunos(db, ids)}
+    if apagados:
+        incrementar_versoes(db, "alunos", "matriculas")
+    db.commit()
+    return ExclusaoLote(apagados=sorted(apagados), nao_encontrados=[aluno_id for aluno_id in ids if aluno_id not in apagados])
 
-    aluno_deletado = Aluno.model_validate(db_aluno)
+@alunos_router.delete("/alunos", response_model=ExclusaoLote)
+async def delete_alunos(ids: List[str] = Query(..., description="IDs separados por vírgula ou repetidos"), db: DbSession = Depends(get_db)):
+    """
+    Exclui vários alunos (e as matrículas deles) em uma única transação.
 
-    db.delete(db_aluno)
-    db.commit()
-    return aluno_deletado
+    Args:
+        ids: IDs dos alunos, em `?ids=1,2,3` ou `?ids=1&ids=2`; até `LIMITE_CHAVES` por requisição.
+
+    Returns:
+        Os IDs apagados e os que não foram encontrados.
+    """
+    return await run_db(db, _delete_alunos, separar_ids(ids))
+
+def _read_aluno_por_nome(db: Session, nome_aluno: str, limit: int):
+    db_alunos = (
+        db.query(models.Aluno)
+        .filter(filtro_substring(models.Aluno.nome, nome_aluno)) # ilike para case-insensitive
+        .order_by(*ordem_relevancia(db, models.Aluno.nome, nome_aluno, models.Aluno.id))
+        .limit(limit)
+        .all()
+    )
+
+    if not db_alunos:
+        raise HTTPException(status_code=404, detail="Nenhum aluno encontrado com esse nome")
+
+    return [Aluno.model_validate(aluno) for aluno in db_alunos]
 
 @alunos_router.get("/alunos/nome/{nome_aluno}", response_model=List[Aluno]) 
-def read_aluno_por_nome(nome_aluno: str, db: Session = Depends(get_db)):
+async def read_aluno_por_nome(
+    nome_aluno: str,
+    limit: int = Query(LIMITE_BUSCA_PADRAO, ge=1, le=LIMITE_MAXIMO),
+    db: DbSession = Depends(get_db),
+):
     """
     Busca alunos pelo nome (parcial ou completo).
+
+    Os resultados vêm ordenados por similaridade com o termo buscado (trigramas no
+    PostgreSQL), limitados aos `limit` mais relevantes.
     
     Args:
         nome_aluno: O nome (ou parte do nome) do aluno a ser buscado.
+        limit: Quantidade máxima de alunos retornados.
     
     Raises:
         HTTPException: 404 - Nenhum aluno encontrado com esse nome.
@@ -117,15 +321,18 @@ def read_aluno_por_nome(nome_aluno: str, db: Session = Depends(get_db)):
     Returns:
         List[Aluno]: Uma lista de alunos que correspondem ao critério de busca.
     """
-    db_alunos = db.query(models.Aluno).filter(models.Aluno.nome.ilike(f"%{nome_aluno}%")).all() # ilike para case-insensitive
+    return await run_db(db, _read_aluno_por_nome, nome_aluno, limit)
 
-    if not db_alunos:
-        raise HTTPException(status_code=404, detail="Nenhum aluno encontrado com esse nome")
+def _read_aluno_por_email(db: Session, email_aluno: str):
+    db_aluno = db.query(models.Aluno).filter(models.Aluno.email == email_aluno).first()
 
-    return [Aluno.model_validate(aluno) for aluno in db_alunos]
+    if db_aluno is None:
+        raise HTTPException(status_code=404, detail="Nenhum aluno encontrado com esse email")
+    
+    return Aluno.model_validate(db_aluno)
 
 @alunos_router.get("/alunos/email/{email_aluno}", response_model=Aluno)
-def read_aluno_por_email(email_aluno: str, db: Session = Depends(get_db)):
+async def read_aluno_por_email(email_aluno: str, db: DbSession = Depends(get_db)):
     """
     Busca um aluno pelo email.
 
@@ -138,9 +345,4 @@ def read_aluno_por_email(email_aluno: str, db: Session = Depends(get_db)):
     Returns:
         Aluno: O aluno encontrado.
     """
-    db_aluno = db.query(models.Aluno).filter(models.Aluno.email == email_aluno).first()
-
-    if db_aluno is None:
-        raise HTTPException(status_code=404, detail="Nenhum aluno encontrado com esse email")
-    
-    return Aluno.model_validate(db_aluno)
\ No newline at end of file
+    return await run_db(db, _read_aluno_por_email, email_aluno)
\ No newline at end of file
@@ -1,44 +1,109 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from sqlalchemy import bindparam, delete
 from sqlalchemy.orm import Session
-from typing import List
-from ..schemas import Curso, CursoCreate, CursoUpdate
-from ..database import get_db
-from .. import models # Importa o módulo de modelos
+from typing import List, Optional, Union
+from ..schemas import Curso, CursoCreate, CursoUpdate, Pagina, ResumoCurso, ExclusaoLote, BuscaLoteCursos
+from ..database import get_db, run_db, DbSession
+from ..pagination import paginar, LIMITE_MAXIMO
+from ..parametros import separar_ids, separar_valores
+from ..cache import listar_cursos, curso_por_codigo, cursos_por_codigos, invalidar_cursos
+from ..etag import incrementar_versoes, responder_com_etag
+from .. import consultas, models # Importa o módulo de modelos
 
 cursos_router = APIRouter()
 
-@cursos_router.get("/cursos", response_model=List[Curso])
-def read_cursos(db: Session = Depends(get_db)):
-    cursos = db.query(models.Curso).all()
-    return [Curso.model_validate(curso) for curso in cursos]
+def _read_cursos(db: Session, limit: Optional[int], after: Optional[str]):
+    if limit is None and after is None:
+        return listar_cursos(db)
 
-@cursos_router.post("/cursos", response_model=Curso)
-def create_curso(curso: CursoCreate, db: Session = Depends(get_db)):
+    cursos, next_cursor = paginar(db.query(models.Curso), models.Curso.id, limit, after)
+    return Pagina[Curso](items=[Curso.model_validate(curso) for curso in cursos], next_cursor=next_cursor)
+
+def _read_cursos_por_codigos(db: Session, codigos: List[str]):
+    encontrados = cursos_por_codigos(db, codigos)
+    return BuscaLoteCursos(encontrados=encontrados, nao_encontrados=[codigo for codigo in codigos if codigo not in encontrados])
+
+@cursos_router.get("/cursos", response_model=Union[List[Curso], Pagina[Curso], BuscaLoteCursos])
+async def read_cursos(
+    request: Request,
+    response: Response,
+    limit: Optional[int] = Query(None, ge=1, le=LIMITE_MAXIMO),
+    after: Optional[str] = None,
+    codigos: Optional[List[str]] = Query(None, description="Códigos separados por vírgula ou repetidos"),
+    db: DbSession = Depends(get_db),
+):
+    """
+    Retorna os cursos (do cache do catálogo) ou uma página deles com `limit`/`after`.
+
+    Com `codigos` (`?codigos=CS101,EE101`), faz a busca em lote: os cursos vêm
+    indexados pelo código, os inexistentes em `nao_encontrados` (sem 404), e os que
+    não estão no cache são lidos com uma única consulta.
+    """
+    if codigos is not None:
+        if limit is not None or after is not None:
+            raise HTTPException(status_code=400, detail="O parâmetro codigos não pode ser combinado com limit/after")
+        return await responder_com_etag(request, response, db, ("cursos",), _read_cursos_por_codigos, separar_valores(codigos))
+    return await responder_com_etag(request, response, db, ("cursos",), _read_cursos, limit, after)
+
+def _create_curso(db: Session, curso: CursoCreate):
     db_curso = models.Curso(**curso.model_dump())
     db.add(db_curso)
+    incrementar_versoes(db, "cursos")
     db.commit()
+    invalidar_cursos()
     db.refresh(db_curso)
     return Curso.model_validate(db_curso)
 
-@cursos_router.put("/cursos/{codigo_curso}", response_model=Curso)
-def update_curso(codigo_curso: str, curso: CursoUpdate, db: Session = Depends(get_db)):
-    db_curso = db.query(models.Curso).filter(models.Curso.codigo == codigo_curso).first()
+@cursos_router.post("/cursos", response_model=Curso)
+async def create_curso(curso: CursoCreate, db: DbSession = Depends(get_db)):
+    return await run_db(db, _create_curso, curso)
+
+def _update_curso(db: Session, codigo_curso: str, curso: CursoUpdate):
+    db_curso = consultas.curso_por_codigo(db, codigo_curso)
     if db_curso is None:
         raise HTTPException(status_code=404, detail="Curso não encontrado")
 
     for key, value in curso.model_dump(exclude_unset=True).items():
         setattr(db_curso, key, value)
 
+    incrementar_versoes(db, "cursos")
     db.commit()
+    invalidar_cursos()
     db.refresh(db_curso)
     return Curso.model_validate(db_curso)
 
+@cursos_router.put("/cursos/{codigo_curso}", response_model=Curso)
+async def update_curso(codigo_curso: str, curso: CursoUpdate, db: DbSession = Depends(get_db)):
+    return await run_db(db, _update_curso, codigo_curso, curso)
+
+def _read_curso_por_codigo(db: Session, codigo_curso: str):
+    curso = curso_por_codigo(db, codigo_curso)
+    if curso is None:
+        raise HTTPException(status_code=404, detail="Nenhum curso encontrado com esse código")
+    return curso
+
 @cursos_router.get("/cursos/{codigo_curso}", response_model=Curso)
-def read_curso_por_codigo(codigo_curso: str, db: Session = Depends(get_db)):
-    db_curso = db.query(models.Curso).filter(models.Curso.codigo == codigo_curso).first()
-    if db_curso is None:
+async def read_curso_por_codigo(codigo_curso: str, request: Request, response: Response, db: DbSession = Depends(get_db)):
+    return await responder_com_etag(request, response, db, ("cursos",), _read_curso_por_codigo, codigo_curso)
+
+def _read_resumo_curso(db: Session, codigo_curso: str):
+    curso = curso_por_codigo(db, codigo_curso)
+    if curso is None:
         raise HTTPException(status_code=404, detail="Nenhum curso encontrado com esse código")
-    return Curso.model_validate(db_curso)
+    # Leitura por chave primária no resumo incremental: não depende do tamanho de `matriculas`.
+    resumo = db.get(models.ResumoCurso, curso.id)
+    matriculas = resumo.total_matriculas if resumo else 0
+    return ResumoCurso(
+        curso_id=curso.id,
+        codigo=curso.codigo,
+        matriculas=matriculas,
+        carga_horaria_total=matriculas * (curso.carga_horaria or 0),
+    )
+
+@cursos_router.get("/cursos/{codigo_curso}/resumo", response_model=ResumoCurso)
+async def read_resumo_curso(codigo_curso: str, request: Request, response: Response, db: DbSession = Depends(get_db)):
+    """Quantidade de matrículas e carga horária total (matrículas x carga horária) do curso."""
+    return await responder_com_etag(request, response, db, ("cursos", "matriculas"), _read_resumo_curso, codigo_curso)
 
 
 # O endpoint de deleção foi reativado para permitir a exclusão de cursos pelo frontend.
@@ -51,17 +116,56 @@ def read_curso_por_codigo(codigo_curso: str, db: Session = Depends(get_db)):
 #     return Curso.model_validate(db_curso)
 
 
-@cursos_router.delete("/cursos/{curso_id}", response_model=Curso)
-def delete_curso(curso_id: int, db: Session = Depends(get_db)):
-    db_curso = db.query(models.Curso).filter(models.Curso.id == curso_id).first()
-    if db_curso is None:
+# Colunas devolvidas pelo DELETE ... RETURNING, na ordem dos campos de `schemas.Curso`.
+COLUNAS_CURSO = (models.Curso.id, models.Curso.nome, models.Curso.codigo, models.Curso.carga_horaria)
+
+# Comando da exclusão, montado uma vez (ver api/consultas.py); `ids` é uma lista expandida no IN.
+_APAGAR_CURSOS = (
+    delete(models.Curso)
+    .where(models.Curso.id.in_(bindparam("ids", expanding=True)))
+    .returning(*COLUNAS_CURSO)
+    .execution_options(synchronize_session=False)
+)
+
+def _apagar_cursos(db: Session, ids) -> list:
+    """
+    Apaga os cursos com um único DELETE ... RETURNING.
+
+    O banco remove as matrículas e o resumo dos cursos (ON DELETE CASCADE); como a
+    linha do resumo some inteira, não há contagem a descontar.
+    """
+    return db.execute(_APAGAR_CURSOS, {"ids": list(ids)}).all()
+
+def _delete_curso(db: Session, curso_id: int):
+    apagados = _apagar_cursos(db, [curso_id])
+    if not apagados:
+        db.rollback()
         raise HTTPException(status_code=404, detail="Curso não encontrado")
 
-    # Apaga as matrículas associadas antes de apagar o curso.
-    db.query(models.Matricula).filter(models.Matricula.curso_id == curso_id).delete(synchronize_session=False)
+    incrementar_versoes(db, "cursos", "matriculas")
+    db.commit()
+    invalidar_cursos()
+    return Curso(**apagados[0]._mapping)
 
-    curso_deletado = Curso.model_validate(db_curso)
+@cursos_router.delete("/cursos/{curso_id}", response_model=Curso)
+async def delete_curso(curso_id: int, db: DbSession = Depends(get_db)):
+    return await run_db(db, _delete_curso, curso_id)
 
-    db.delete(db_curso)
+def _delete_cursos(db: Session, ids: List[int]):
+    apagados = {linha.id for linha in _apagar_cursos(db, ids)}
+    if apagados:
+        incrementar_versoes(db, "cursos", "matriculas")
     db.commit()
-    return curso_deletado
\ No newline at end of file
+    if apagados:
+        invalidar_cursos()
+    return ExclusaoLote(apagados=sorted(apagados), nao_encontrados=[curso_id for curso_id in ids if curso_id not in apagados])
+
+@cursos_router.delete("/cursos", response_model=ExclusaoLote)
+async def delete_cursos(ids: List[str] = Query(..., description="IDs separados por vírgula ou repetidos"), db: DbSession = Depends(get_db)):
+    """
+    Exclui vários cursos (e as matrículas neles) em uma única transação.
+
+    Aceita `?ids=1,2,3` ou `?ids=1&ids=2`, até `LIMITE_CHAVES` IDs por requisição, e
+    devolve os IDs apagados e os que não foram encontrados.
+    """
+    return await run_db(db, _delete_cursos, separar_ids(ids))
@@ -1,86 +1,428 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from sqlalchemy import bindparam, delete, func, select, true, tuple_
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session, joinedload
-from typing import List, Dict, Union
+from typing import List, Dict, Union, Optional, Literal
 from .. import models, schemas
-from ..database import get_db
+from ..database import get_db, dialect_insert, run_db, DbSession
+from ..pagination import paginar, LIMITE_MAXIMO, LIMITE_PADRAO
+from ..export import exportar
+from ..search import filtro_substring, ordem_relevancia
+from ..etag import incrementar_versoes, responder_com_etag
+from ..resumo import aplicar_deltas, contar_por_curso
+from .. import consultas, serializacao
 
 matriculas_router = APIRouter()
 
+# Quantidade máxima de pares (aluno_id, curso_id) enviados em um único INSERT da matrícula em lote.
+TAMANHO_LOTE_MATRICULAS = 1000
+
+def _insert_matriculas(db: Session, selecao):
+    """
+    INSERT ... SELECT ... ON CONFLICT (aluno_id, curso_id) DO NOTHING RETURNING.
+
+    O SELECT só produz pares cujo aluno e curso existem, e a restrição única
+    `uq_aluno_curso` descarta as duplicatas; assim, um único comando valida e insere.
+    Os pares que não voltam no RETURNING foram recusados por um desses motivos.
+    """
+    return (
+        dialect_insert(db, models.Matricula)
+        .from_select(["aluno_id", "curso_id"], selecao)
+        .on_conflict_do_nothing(index_elements=["aluno_id", "curso_id"])
+        .returning(models.Matricula.id, models.Matricula.aluno_id, models.Matricula.curso_id)
+    )
+
+def _motivo_recusa(alunos_existentes, cursos_existentes, aluno_id: int, curso_id: int) -> HTTPException:
+    """Traduz um par recusado pelo INSERT nas mesmas respostas 404/400 da API."""
+    if aluno_id not in alunos_existentes:
+        return HTTPException(status_code=404, detail="Aluno não encontrado")
+    if curso_id not in cursos_existentes:
+        return HTTPException(status_code=404, detail="Curso não encontrado")
+    return HTTPException(status_code=400, detail="Aluno já matriculado neste curso")
+
+def _pares_aluno_curso(*condicoes):
+    """SELECT dos pares (aluno, curso) existentes que satisfazem as condições."""
+    # O produto alunos x cursos é intencional: as condições o reduzem aos pares pedidos.
+    return (
+        select(models.Aluno.id, models.Curso.id)
+        .select_from(models.Aluno)
+        .join(models.Curso, true())
+        .where(*condicoes)
+    )
+
+def _ids_existentes(db: Session, coluna, ids) -> set:
+    return set(db.scalars(select(coluna).where(coluna.in_(ids))))
+
+# Campos do aluno e do curso devolvidos pelo próprio INSERT da matrícula.
+CAMPOS_ALUNO = ("nome", "email", "telefone")
+CAMPOS_CURSO = ("nome", "codigo", "carga_horaria")
+
+def _dados_relacionados(modelo, prefixo: str, campos, chave: int) -> list:
+    """Subconsultas escalares por chave primária, para o RETURNING trazer a linha relacionada."""
+    return [
+        select(getattr(modelo, campo)).where(modelo.id == chave).scalar_subquery().label(f"{prefixo}_{campo}")
+        for campo in campos
+    ]
+
+def _create_matricula(db: Session, matricula: schemas.MatriculaCreate):
+    selecao = _pares_aluno_curso(
+        models.Aluno.id == matricula.aluno_id,
+        models.Curso.id == matricula.curso_id,
+    )
+    # O RETURNING já traz o aluno e o curso da resposta: nenhuma leitura depois do INSERT.
+    stmt = _insert_matriculas(db, selecao).returning(
+        *_dados_relacionados(models.Aluno, "aluno", CAMPOS_ALUNO, matricula.aluno_id),
+        *_dados_relacionados(models.Curso, "curso", CAMPOS_CURSO, matricula.curso_id),
+    )
+    try:
+        inserida = db.execute(stmt).first()
+    except IntegrityError:
+        # Aluno ou curso removido por outra transação entre o SELECT e o INSERT (violação de FK).
+        db.rollback()
+        inserida = None
+
+    if inserida is None:
+        db.rollback()
+        raise _motivo_recusa(
+            {matricula.aluno_id} if consultas.aluno_existe(db, matricula.aluno_id) else set(),
+            {matricula.curso_id} if consultas.curso_existe(db, matricula.curso_id) else set(),
+            matricula.aluno_id,
+            matricula.curso_id,
+        )
+
+    linha = inserida._mapping
+    resposta = schemas.Matricula(
+        id=inserida.id,
+        aluno_id=inserida.aluno_id,
+        curso_id=inserida.curso_id,
+        aluno=schemas.Aluno(id=inserida.aluno_id, **{campo: linha[f"aluno_{campo}"] for campo in CAMPOS_ALUNO}),
+        curso=schemas.Curso(id=inserida.curso_id, **{campo: linha[f"curso_{campo}"] for campo in CAMPOS_CURSO}),
+    )
+    aplicar_deltas(db, {inserida.curso_id: 1})
+    incrementar_versoes(db, "matriculas")
+    db.commit()
+    return resposta
+
 @matriculas_router.post("/matriculas", response_model=schemas.Matricula, status_code=201)
-def create_matricula(matricula: schemas.MatriculaCreate, db: Session = Depends(get_db)):
+async def create_matricula(matricula: schemas.MatriculaCreate, db: DbSession = Depends(get_db)):
     """
     Cria uma nova matrícula associando um aluno a um curso.
+
+    A existência do aluno e do curso e a unicidade da matrícula são verificadas pelo
+    próprio INSERT, que também devolve os dados do aluno e do curso da resposta; as
+    consultas de diagnóstico só rodam quando ele é recusado.
     """
-    # Verifica se o aluno e o curso existem
-    db_aluno = db.query(models.Aluno).filter(models.Aluno.id == matricula.aluno_id).first()
-    if not db_aluno:
-        raise HTTPException(status_code=404, detail="Aluno não encontrado")
-    
-    db_curso = db.query(models.Curso).filter(models.Curso.id == matricula.curso_id).first()
-    if not db_curso:
-        raise HTTPException(status_code=404, detail="Curso não encontrado")
+    return await run_db(db, _create_matricula, matricula)
+
+def _create_matriculas_bulk(db: Session, matriculas: List[schemas.MatriculaCreate]):
+    criadas, erros = [], []
 
-    # Verifica se a matrícula já existe para evitar duplicatas
-    db_matricula_existente = db.query(models.Matricula).filter(
-        models.Matricula.aluno_id == matricula.aluno_id,
-        models.Matricula.curso_id == matricula.curso_id
-    ).first()
-    if db_matricula_existente:
-        raise HTTPException(status_code=400, detail="Aluno já matriculado neste curso")
+    pendentes = {}
+    for indice, matricula in enumerate(matriculas):
+        par = (matricula.aluno_id, matricula.curso_id)
+        if par in pendentes:
+            erros.append(schemas.ErroLote(indice=indice, detail="Matrícula repetida no lote"))
+        else:
+            pendentes[par] = indice
 
-    db_matricula = models.Matricula(**matricula.model_dump())
-    db.add(db_matricula)
+    pares = list(pendentes)
+    recusados = []
+    for inicio in range(0, len(pares), TAMANHO_LOTE_MATRICULAS):
+        lote = pares[inicio:inicio + TAMANHO_LOTE_MATRICULAS]
+        # Os IN simples por coluna permitem usar os índices das chaves primárias;
+        # o IN de tuplas restringe o produto aos pares realmente pedidos.
+        selecao = _pares_aluno_curso(
+            models.Aluno.id.in_({aluno_id for aluno_id, _ in lote}),
+            models.Curso.id.in_({curso_id for _, curso_id in lote}),
+            tuple_(models.Aluno.id, models.Curso.id).in_(lote),
+        )
+        inseridas = {(linha.aluno_id, linha.curso_id): linha.id for linha in db.execute(_insert_matriculas(db, selecao))}
+        for par in lote:
+            if par in inseridas:
+                criadas.append(schemas.MatriculaCriadaLote(indice=pendentes[par], id=inseridas[par], aluno_id=par[0], curso_id=par[1]))
+            else:
+                recusados.append(par)
+
+    if recusados:
+        alunos_existentes = _ids_existentes(db, models.Aluno.id, {aluno_id for aluno_id, _ in recusados})
+        cursos_existentes = _ids_existentes(db, models.Curso.id, {curso_id for _, curso_id in recusados})
+        for aluno_id, curso_id in recusados:
+            motivo = _motivo_recusa(alunos_existentes, cursos_existentes, aluno_id, curso_id)
+            erros.append(schemas.ErroLote(indice=pendentes[(aluno_id, curso_id)], detail=motivo.detail))
+
+    if criadas:
+        aplicar_deltas(db, contar_por_curso(criada.curso_id for criada in criadas))
+        incrementar_versoes(db, "matriculas")
     db.commit()
-    db.refresh(db_matricula)
-    return db_matricula
+    erros.sort(key=lambda erro: erro.indice)
+    return schemas.MatriculaLoteResultado(criadas=criadas, erros=erros)
 
-@matriculas_router.put("/matriculas/{matricula_id}", response_model=schemas.Matricula)
-def update_matricula(matricula_id: int, matricula: schemas.MatriculaCreate, db: Session = Depends(get_db)):
+@matriculas_router.post("/matriculas/bulk", response_model=schemas.MatriculaLoteResultado, status_code=201)
+async def create_matriculas_bulk(matriculas: List[schemas.MatriculaCreate], db: DbSession = Depends(get_db)):
     """
-    Atualiza uma matrícula existente.
+    Matricula vários pares (aluno_id, curso_id) de uma vez, em uma única transação.
+
+    Cada lote de até `TAMANHO_LOTE_MATRICULAS` pares é inserido com um único comando.
+    Pares recusados (aluno ou curso inexistente, matrícula já existente ou repetida
+    na lista) são reportados em `erros` sem abortar os demais.
     """
-    db_matricula = db.query(models.Matricula).filter(models.Matricula.id == matricula_id).first()
+    return await run_db(db, _create_matriculas_bulk, matriculas)
+
+def _update_matricula(db: Session, matricula_id: int, matricula: schemas.MatriculaCreate):
+    # Lida com FOR UPDATE: o curso_id antigo não muda nem é apagado antes do commit.
+    db_matricula = consultas.matricula_por_id_travada(db, matricula_id)
     if not db_matricula:
         raise HTTPException(status_code=404, detail="Matrícula não encontrada")
 
     # Verifica se o novo aluno e curso existem
-    db_aluno = db.query(models.Aluno).filter(models.Aluno.id == matricula.aluno_id).first()
-    if not db_aluno:
+    if not consultas.aluno_existe(db, matricula.aluno_id):
         raise HTTPException(status_code=404, detail="Aluno não encontrado")
     
-    db_curso = db.query(models.Curso).filter(models.Curso.id == matricula.curso_id).first()
-    if not db_curso:
+    # Direto no banco, não no cache do catálogo: um curso apagado por outro worker
+    # continuaria no cache até o TTL, e o commit falharia na chave estrangeira.
+    if not consultas.curso_existe(db, matricula.curso_id):
         raise HTTPException(status_code=404, detail="Curso não encontrado")
 
     # Verifica se a nova combinação de matrícula já existe para outro registro
-    db_matricula_existente = db.query(models.Matricula).filter(
-        models.Matricula.aluno_id == matricula.aluno_id,
-        models.Matricula.curso_id == matricula.curso_id,
-        models.Matricula.id != matricula_id
-    ).first()
-    if db_matricula_existente:
+    if consultas.matricula_duplicada(db, matricula_id, matricula.aluno_id, matricula.curso_id):
         raise HTTPException(status_code=400, detail="Este aluno já está matriculado neste curso")
 
+    if db_matricula.curso_id != matricula.curso_id:
+        aplicar_deltas(db, {db_matricula.curso_id: -1, matricula.curso_id: 1})
+
     db_matricula.aluno_id = matricula.aluno_id
     db_matricula.curso_id = matricula.curso_id
     
+    incrementar_versoes(db, "matriculas")
     db.commit()
     db.refresh(db_matricula)
-    return db_matricula
+    return schemas.Matricula.model_validate(db_matricula)
 
-@matriculas_router.get("/matriculas", response_model=List[schemas.Matricula])
-def read_matriculas(db: Session = Depends(get_db)):
+@matriculas_router.put("/matriculas/{matricula_id}", response_model=schemas.Matricula)
+async def update_matricula(matricula_id: int, matricula: schemas.MatriculaCreate, db: DbSession = Depends(get_db)):
     """
-    Retorna uma lista de todas as matrículas com os dados do aluno e do curso.
+    Atualiza uma matrícula existente.
     """
+    return await run_db(db, _update_matricula, matricula_id, matricula)
+
+def _matriculas_como_dicts(linhas) -> list:
+    """Monta o formato aninhado de `schemas.Matricula` a partir das linhas planas do JOIN."""
+    return [
+        {
+            "id": id_,
+            "aluno_id": aluno_id,
+            "curso_id": curso_id,
+            "aluno": {"id": aluno_id, "nome": aluno_nome, "email": aluno_email, "telefone": aluno_telefone},
+            "curso": {"id": curso_id, "nome": curso_nome, "codigo": curso_codigo, "carga_horaria": carga_horaria},
+        }
+        for id_, aluno_id, curso_id, aluno_nome, aluno_email, aluno_telefone, curso_nome, curso_codigo, carga_horaria in linhas
+    ]
+
+def _read_matriculas_rapido(db: Session, limit: Optional[int], after: Optional[str]):
+    query = (
+        db.query(
+            models.Matricula.id,
+            models.Matricula.aluno_id,
+            models.Matricula.curso_id,
+            models.Aluno.nome,
+            models.Aluno.email,
+            models.Aluno.telefone,
+            models.Curso.nome,
+            models.Curso.codigo,
+            models.Curso.carga_horaria,
+        )
+        .join(models.Aluno, models.Matricula.aluno_id == models.Aluno.id)
+        .join(models.Curso, models.Matricula.curso_id == models.Curso.id)
+    )
+    if limit is None and after is None:
+        return serializacao.resposta_json(_matriculas_como_dicts(query.all()))
+
+    linhas, next_cursor = paginar(query, models.Matricula.id, limit, after)
+    return serializacao.resposta_pagina(_matriculas_como_dicts(linhas), next_cursor)
+
+def _read_matriculas(db: Session, limit: Optional[int], after: Optional[str]):
+    if serializacao.SERIALIZACAO_RAPIDA:
+        return _read_matriculas_rapido(db, limit, after)
+
     # Usa joinedload para carregar os dados relacionados de forma eficiente (evita N+1 queries)
-    matriculas = db.query(models.Matricula).options(joinedload(models.Matricula.aluno), joinedload(models.Matricula.curso)).all()
-    return matriculas
+    query = db.query(models.Matricula).options(joinedload(models.Matricula.aluno), joinedload(models.Matricula.curso))
+    if limit is None and after is None:
+        return [schemas.Matricula.model_validate(matricula) for matricula in query.all()]
 
-@matriculas_router.get("/matriculas/aluno/{nome_aluno}", response_model=Dict[str, Union[str, List[str]]])
-def read_matriculas_por_nome_aluno(nome_aluno: str, db: Session = Depends(get_db)):
-    """Retorna os cursos em que um aluno está matriculado."""
-    db_aluno = db.query(models.Aluno).filter(models.Aluno.nome.ilike(f"%{nome_aluno}%")).first()
+    matriculas, next_cursor = paginar(query, models.Matricula.id, limit, after)
+    return schemas.Pagina[schemas.Matricula](
+        items=[schemas.Matricula.model_validate(matricula) for matricula in matriculas],
+        next_cursor=next_cursor,
+    )
+
+def _linhas_por_ids(db: Session, colunas, coluna_id, ids) -> dict:
+    """`{id: {coluna: valor}}` das linhas com os IDs pedidos, em consultas IN de até `TAMANHO_LOTE_MATRICULAS` IDs."""
+    ids = sorted(ids)
+    por_id = {}
+    for inicio in range(0, len(ids), TAMANHO_LOTE_MATRICULAS):
+        for linha in serializacao.linhas_como_dicts(db.execute(select(*colunas).where(coluna_id.in_(ids[inicio:inicio + TAMANHO_LOTE_MATRICULAS]))).all()):
+            por_id[str(linha["id"])] = linha
+    return por_id
+
+def _read_matriculas_normalizadas(db: Session, limit: Optional[int], after: Optional[str]):
+    query = db.query(models.Matricula.id, models.Matricula.aluno_id, models.Matricula.curso_id)
+    if limit is None and after is None:
+        triplas, next_cursor = query.order_by(models.Matricula.id).all(), None
+    else:
+        triplas, next_cursor = paginar(query, models.Matricula.id, limit, after)
+
+    # Sem JOIN: cada aluno e curso é lido e serializado uma vez, não uma vez por matrícula.
+    alunos = _linhas_por_ids(
+        db,
+        (models.Aluno.id, models.Aluno.nome, models.Aluno.email, models.Aluno.telefone),
+        models.Aluno.id,
+        {aluno_id for _, aluno_id, _ in triplas},
+    )
+    cursos = _linhas_por_ids(
+        db,
+        (models.Curso.id, models.Curso.nome, models.Curso.codigo, models.Curso.carga_horaria),
+        models.Curso.id,
+        {curso_id for _, _, curso_id in triplas},
+    )
+    conteudo = {"matriculas": [tuple(tripla) for tripla in triplas], "alunos": alunos, "cursos": cursos}
+    if limit is not None or after is not None:
+        conteudo["next_cursor"] = next_cursor
+    return serializacao.resposta_json(conteudo)
+
+@matriculas_router.get(
+    "/matriculas",
+    response_model=Union[List[schemas.Matricula], schemas.Pagina[schemas.Matricula], schemas.MatriculasNormalizadas],
+)
+async def read_matriculas(
+    request: Request,
+    response: Response,
+    limit: Optional[int] = Query(None, ge=1, le=LIMITE_MAXIMO),
+    after: Optional[str] = None,
+    formato: Literal["aninhado", "normalizado"] = "aninhado",
+    db: DbSession = Depends(get_db),
+):
+    """
+    Retorna uma lista de todas as matrículas com os dados do aluno e do curso.
+
+    Com `limit` e/ou `after`, retorna uma página ordenada por ID com o cursor da próxima página.
+    A ETag considera também alunos e cursos, que aparecem aninhados na resposta.
+
+    Com `formato=normalizado`, as matrículas vêm como triplas `(id, aluno_id, curso_id)`
+    e os alunos e cursos referenciados uma única vez em `alunos` e `cursos`, pelo ID,
+    lidos com consultas IN separadas em vez do JOIN que repete cada curso por aluno.
+    """
+    fn = _read_matriculas_normalizadas if formato == "normalizado" else _read_matriculas
+    return await responder_com_etag(request, response, db, ("matriculas", "alunos", "cursos"), fn, limit, after)
+
+def _read_estatisticas_matriculas(db: Session, limit: int, after: Optional[str]):
+    # As contagens por curso vêm do resumo mantido a cada escrita, sem varrer `matriculas`.
+    por_curso = db.execute(
+        select(
+            models.Curso.id,
+            models.Curso.codigo,
+            models.Curso.nome,
+            models.Curso.carga_horaria,
+            func.coalesce(models.ResumoCurso.total_matriculas, 0),
+        )
+        .outerjoin(models.ResumoCurso, models.ResumoCurso.curso_id == models.Curso.id)
+        .order_by(models.Curso.id)
+    ).all()
+
+    # Os agregados por aluno são paginados por chave: o keyset em Aluno.id limita o GROUP BY à página.
+    por_aluno, next_cursor = paginar(
+        db.query(
+            models.Aluno.id,
+            models.Aluno.nome,
+            func.count(models.Matricula.id),
+            func.coalesce(func.sum(models.Curso.carga_horaria), 0),
+        )
+        .join(models.Matricula, models.Matricula.aluno_id == models.Aluno.id)
+        .join(models.Curso, models.Matricula.curso_id == models.Curso.id)
+        .group_by(models.Aluno.id, models.Aluno.nome),
+        models.Aluno.id,
+        limit,
+        after,
+    )
+
+    return schemas.EstatisticasMatriculas(
+        total_matriculas=sum(linha[4] for linha in por_curso),
+        total_alunos=db.scalar(select(func.count(models.Aluno.id))),
+        total_cursos=len(por_curso),
+        alunos_matriculados=db.scalar(select(func.count(func.distinct(models.Matricula.aluno_id)))),
+        por_curso=[
+            schemas.EstatisticaCurso(
+                curso_id=id_,
+                codigo=codigo,
+                nome=nome,
+                carga_horaria=carga_horaria,
+                matriculas=matriculas,
+                carga_horaria_total=matriculas * (carga_horaria or 0),
+            )
+            for id_, codigo, nome, carga_horaria, matriculas in por_curso
+        ],
+        por_aluno=[
+            schemas.EstatisticaAluno(aluno_id=id_, nome=nome, cursos=cursos, carga_horaria_total=carga_horaria_total)
+            for id_, nome, cursos, carga_horaria_total in por_aluno
+        ],
+        next_cursor=next_cursor,
+    )
+
+@matriculas_router.get("/matriculas/stats", response_model=schemas.EstatisticasMatriculas)
+async def read_estatisticas_matriculas(
+    request: Request,
+    response: Response,
+    limit: int = Query(LIMITE_PADRAO, ge=1, le=LIMITE_MAXIMO),
+    after: Optional[str] = None,
+    db: DbSession = Depends(get_db),
+):
+    """
+    Retorna estatísticas de matrículas calculadas no banco.
+
+    As contagens por curso são lidas do resumo incremental (`resumo_cursos`); as
+    por aluno são agregadas com GROUP BY. Inclui a quantidade de matrículas por curso, a quantidade de cursos e a carga
+    horária total por aluno e os totais gerais, sem trafegar os registros individuais.
+
+    `por_aluno` é paginado por cursor (`limit`/`after`, ordenado por aluno_id), para a
+    resposta continuar com tamanho limitado com qualquer quantidade de alunos; as
+    demais partes vêm iguais em todas as páginas.
+    """
+    return await responder_com_etag(
+        request, response, db, ("matriculas", "alunos", "cursos"), _read_estatisticas_matriculas, limit, after
+    )
+
+@matriculas_router.get("/matriculas/export")
+async def export_matriculas(formato: Literal["ndjson", "csv"] = "ndjson", db: DbSession = Depends(get_db)):
+    """
+    Exporta todas as matrículas, com os dados do aluno e do curso, em NDJSON ou CSV.
+
+    Em vez de carregar objetos ORM aninhados, lê linhas planas do JOIN por um cursor
+    no servidor, em lotes de tamanho fixo, e as envia conforme são lidas.
+    """
+    stmt = (
+        select(
+            models.Matricula.id,
+            models.Aluno.id,
+            models.Aluno.nome,
+            models.Aluno.email,
+            models.Curso.id,
+            models.Curso.codigo,
+            models.Curso.nome,
+        )
+        .join(models.Aluno, models.Matricula.aluno_id == models.Aluno.id)
+        .join(models.Curso, models.Matricula.curso_id == models.Curso.id)
+        .order_by(models.Matricula.id)
+    )
+    colunas = ["id", "aluno_id", "aluno_nome", "aluno_email", "curso_id", "curso_codigo", "curso_nome"]
+    return exportar(db, stmt, colunas, formato, "matriculas")
+
+def _read_matriculas_por_nome_aluno(db: Session, nome_aluno: str):
+    # Entre os alunos cujo nome contém o termo, usa o mais parecido com ele.
+    db_aluno = (
+        db.query(models.Aluno)
+        .filter(filtro_substring(models.Aluno.nome, nome_aluno))
+        .order_by(*ordem_relevancia(db, models.Aluno.nome, nome_aluno, models.Aluno.id))
+        .first()
+    )
 
     if not db_aluno:
         raise HTTPException(status_code=404, detail="Aluno não encontrado")
@@ -89,9 +431,12 @@ def read_matriculas_por_nome_aluno(nome_aluno: str, db: Session = Depends(get_db
 
     return {"aluno": db_aluno.nome, "cursos": cursos_matriculados}
 
-@matriculas_router.get("/matriculas/curso/{codigo_curso}", response_model=Dict[str, Union[str, List[str]]])
-def read_alunos_matriculados_por_codigo_curso(codigo_curso: str, db: Session = Depends(get_db)):
-    """Retorna o nome do curso e uma lista com os nomes dos alunos matriculados."""
+@matriculas_router.get("/matriculas/aluno/{nome_aluno}", response_model=Dict[str, Union[str, List[str]]])
+async def read_matriculas_por_nome_aluno(nome_aluno: str, db: DbSession = Depends(get_db)):
+    """Retorna os cursos em que um aluno está matriculado."""
+    return await run_db(db, _read_matriculas_por_nome_aluno, nome_aluno)
+
+def _read_alunos_matriculados_por_codigo_curso(db: Session, codigo_curso: str):
     db_curso = db.query(models.Curso).filter(models.Curso.codigo == codigo_curso).first()
 
     if not db_curso:
@@ -101,17 +446,36 @@ def read_alunos_matriculados_por_codigo_curso(codigo_curso: str, db: Session = D
 
     return {"curso": db_curso.nome, "alunos": alunos_matriculados}
 
+@matriculas_router.get("/matriculas/curso/{codigo_curso}", response_model=Dict[str, Union[str, List[str]]])
+async def read_alunos_matriculados_por_codigo_curso(codigo_curso: str, db: DbSession = Depends(get_db)):
+    """Retorna o nome do curso e uma lista com os nomes dos alunos matriculados."""
+    return await run_db(db, _read_alunos_matriculados_por_codigo_curso, codigo_curso)
+
+_APAGAR_MATRICULA = (
+    delete(models.Matricula)
+    .where(models.Matricula.id == bindparam("matricula_id"))
+    .returning(models.Matricula.curso_id)
+    .execution_options(synchronize_session=False)
+)
+
+def _delete_matricula(db: Session, matricula_id: int):
+    # O curso a descontar vem da linha que este DELETE apagou: com duas exclusões
+    # simultâneas da mesma matrícula, só uma recebe a linha e desconta o resumo.
+    curso_id = db.scalar(_APAGAR_MATRICULA, {"matricula_id": matricula_id})
+    if curso_id is None:
+        db.rollback()
+        raise HTTPException(status_code=404, detail="Matrícula não encontrada")
+
+    aplicar_deltas(db, {curso_id: -1})
+    incrementar_versoes(db, "matriculas")
+    db.commit()
+    # Nenhum corpo de resposta é enviado para um status 204
+    return None
+
 @matriculas_router.delete("/matriculas/{matricula_id}", status_code=204)
-def delete_matricula(matricula_id: int, db: Session = Depends(get_db)):
+async def delete_matricula(matricula_id: int, db: DbSession = Depends(get_db)):
     """
     Apaga uma matrícula existente com base no seu ID.
     Retorna 204 No Content em caso de sucesso.
     """
-    db_matricula = db.query(models.Matricula).filter(models.Matricula.id == matricula_id).first()
-    if not db_matricula:
-        raise HTTPException(status_code=404, detail="Matrícula não encontrada")
-
-    db.delete(db_matricula)
-    db.commit()
-    # Nenhum corpo de resposta é enviado para um status 204
-    return None
\ No newline at end of file
+    return await run_db(db, _delete_matricula, matricula_id)
\ No newline at end of file
@@ -0,0 +1,49 @@
+import sys
+
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+from .database import Base
+from . import models  # noqa: F401  (registra as tabelas no metadata)
+from .resumo import popular_se_vazio
+
+# O create_all só cria índices junto com tabelas novas; no banco do docker-compose as
+# tabelas já vêm do init.sql. Por isso os objetos específicos do PostgreSQL são criados
+# aqui com comandos idempotentes, que também valem para bancos já existentes.
+DDL_POSTGRESQL = [
+    # Trigramas permitem que `nome ILIKE '%termo%'` use índice e que os resultados
+    # sejam ordenados por similaridade.
+    "CREATE EXTENSION IF NOT EXISTS pg_trgm",
+    "CREATE INDEX IF NOT EXISTS ix_alunos_nome_trgm ON alunos USING gin (nome gin_trgm_ops)",
+    # Matrículas por curso (estatísticas e cascade da exclusão de cursos) em tabelas anteriores ao índice.
+    "CREATE INDEX IF NOT EXISTS ix_matriculas_curso_id ON matriculas (curso_id)",
+]
+
+def create_schema(bind) -> None:
+    """Cria as tabelas que faltam e os índices auxiliares do banco, e preenche o resumo por curso recém-criado."""
+    Base.metadata.create_all(bind=bind)
+    if bind.dialect.name == "postgresql":
+        with bind.begin() as conn:
+            for ddl in DDL_POSTGRESQL:
+                conn.execute(text(ddl))
+    with Session(bind) as db:
+        popular_se_vazio(db)
+        db.commit()
+
+def main() -> int:
+    """
+    Comando de migração: `python -m api.schema`.
+
+    Permite desligar a criação do schema na inicialização da API
+    (STARTUP_CREATE_SCHEMA=0) e executá-la uma única vez por implantação.
+    """
+    from .database import iniciar_engines
+
+    engine = iniciar_engines()
+    create_schema(engine)
+    engine.dispose()
+    print("Schema atualizado.")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
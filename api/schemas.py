@@ -1,5 +1,7 @@
 from pydantic import BaseModel, ConfigDict
-from typing import Optional
+from typing import Optional, List, Dict, Generic, Tuple, TypeVar
+
+T = TypeVar("T")
 
 # --- Aluno Schemas ---
 class AlunoBase(BaseModel):
@@ -14,6 +16,27 @@ class Aluno(AlunoBase):
     id: int
     model_config = ConfigDict(from_attributes=True)
 
+class AlunoCriadoLote(BaseModel):
+    indice: int  # Posição do aluno na lista enviada
+    id: int
+    email: str
+
+class ErroLote(BaseModel):
+    indice: int  # Posição do item com erro na lista enviada
+    detail: str
+
+class AlunoLoteResultado(BaseModel):
+    criados: List[AlunoCriadoLote]
+    erros: List[ErroLote]
+
+class BuscaLoteAlunos(BaseModel):
+    encontrados: Dict[int, Aluno]  # Alunos encontrados, pelo ID
+    nao_encontrados: List[int]  # IDs pedidos que não existem
+
+class ExclusaoLote(BaseModel):
+    apagados: List[int]  # IDs excluídos
+    nao_encontrados: List[int]  # IDs pedidos que não existiam
+
 # --- Curso Schemas ---
 class CursoBase(BaseModel):
     nome: str
@@ -32,6 +55,10 @@ class Curso(CursoBase):
     id: int
     model_config = ConfigDict(from_attributes=True)
 
+class BuscaLoteCursos(BaseModel):
+    encontrados: Dict[str, Curso]  # Cursos encontrados, pelo código
+    nao_encontrados: List[str]  # Códigos pedidos que não existem
+
 # --- Matricula Schemas ---
 class MatriculaBase(BaseModel):
     aluno_id: int
@@ -44,4 +71,55 @@ class Matricula(MatriculaBase):
     id: int
     aluno: Aluno  # Schema aninhado para a resposta da API
     curso: Curso  # Schema aninhado para a resposta da API
-    model_config = ConfigDict(from_attributes=True)
\ No newline at end of file
+    model_config = ConfigDict(from_attributes=True)
+
+class MatriculasNormalizadas(BaseModel):
+    """Formato compacto de GET /matriculas: cada aluno e curso aparece uma única vez."""
+    matriculas: List[Tuple[int, int, int]]  # (id, aluno_id, curso_id)
+    alunos: Dict[int, Aluno]  # Alunos referenciados, pelo ID
+    cursos: Dict[int, Curso]  # Cursos referenciados, pelo ID
+    next_cursor: Optional[str] = None  # Só nas requisições paginadas
+
+class MatriculaCriadaLote(MatriculaBase):
+    indice: int  # Posição do par (aluno_id, curso_id) na lista enviada
+    id: int
+
+class MatriculaLoteResultado(BaseModel):
+    criadas: List[MatriculaCriadaLote]
+    erros: List[ErroLote]
+
+# --- Estatísticas de Matrículas ---
+class EstatisticaCurso(BaseModel):
+    curso_id: int
+    codigo: str
+    nome: str
+    carga_horaria: int
+    matriculas: int  # Quantidade de alunos matriculados no curso
+    carga_horaria_total: int  # matriculas * carga_horaria
+
+class ResumoCurso(BaseModel):
+    curso_id: int
+    codigo: str
+    matriculas: int
+    carga_horaria_total: int
+
+class EstatisticaAluno(BaseModel):
+    aluno_id: int
+    nome: str
+    cursos: int  # Quantidade de cursos em que o aluno está matriculado
+    carga_horaria_total: int  # Soma da carga horária desses cursos
+
+class EstatisticasMatriculas(BaseModel):
+    total_matriculas: int
+    total_alunos: int
+    total_cursos: int
+    alunos_matriculados: int  # Alunos com ao menos uma matrícula
+    por_curso: List[EstatisticaCurso]
+    por_aluno: List[EstatisticaAluno]  # Uma página, ordenada por aluno_id
+    next_cursor: Optional[str] = None  # Cursor da próxima página de `por_aluno`
+
+# --- Paginação ---
+class Pagina(BaseModel, Generic[T]):
+    """Página de resultados da paginação por cursor (keyset)."""
+    items: List[T]
+    next_cursor: Optional[str] = None  # None indica que esta é a última página
@@ -0,0 +1,23 @@
+from sqlalchemy import func
+
+# Quantidade de resultados devolvida pelas buscas por nome quando o cliente não informa `limit`.
+LIMITE_BUSCA_PADRAO = 50
+
+def _escapar_like(termo: str) -> str:
+    """Escapa os curingas do LIKE para que o termo seja buscado literalmente."""
+    return termo.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+def filtro_substring(coluna, termo: str):
+    """`coluna ILIKE '%termo%'`; no PostgreSQL é atendido pelo índice GIN de trigramas."""
+    return coluna.ilike(f"%{_escapar_like(termo)}%", escape="\\")
+
+def ordem_relevancia(db, coluna, termo: str, coluna_id):
+    """
+    Critérios de ORDER BY que colocam os nomes mais parecidos com o termo primeiro.
+
+    No PostgreSQL usa `similarity()` do pg_trgm. O SQLite (usado nos testes) não tem
+    trigramas, então aproxima a relevância pela posição do termo e pelo tamanho do nome.
+    """
+    if db.get_bind().dialect.name == "postgresql":
+        return [func.similarity(coluna, termo).desc(), coluna_id]
+    return [func.instr(func.lower(coluna), termo.lower()), func.length(coluna), coluna_id]
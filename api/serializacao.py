@@ -0,0 +1,32 @@
+"""
+Caminho rápido de serialização das listas grandes.
+
+No caminho original cada linha vira um objeto ORM, depois um modelo Pydantic
+(`model_validate`), e o FastAPI ainda valida e converte de novo o retorno contra o
+`response_model` antes de gerar o JSON. Com `FAST_SERIALIZATION=1` (padrão), as
+rotas de listagem leem apenas as colunas necessárias, montam os dicionários
+direto das tuplas e devolvem uma `ORJSONResponse`, que o FastAPI envia sem
+nova validação. Os dados vêm do banco já com os tipos do schema, e o
+`response_model` continua documentando o formato no OpenAPI.
+"""
+import os
+from typing import Any, Optional, Sequence
+
+from fastapi.responses import ORJSONResponse
+
+# Lida pelas rotas a cada requisição (os testes e o benchmark alternam o valor).
+SERIALIZACAO_RAPIDA = os.getenv("FAST_SERIALIZATION", "1").lower() in ("1", "true", "yes")
+
+def linhas_como_dicts(linhas: Sequence) -> list:
+    """Converte linhas de um SELECT de colunas em dicionários `{coluna: valor}`."""
+    if not linhas:
+        return []
+    campos = linhas[0]._fields
+    return [dict(zip(campos, linha)) for linha in linhas]
+
+def resposta_json(conteudo: Any) -> ORJSONResponse:
+    return ORJSONResponse(conteudo)
+
+def resposta_pagina(items: list, next_cursor: Optional[str]) -> ORJSONResponse:
+    """Mesmo formato de `schemas.Pagina`."""
+    return ORJSONResponse({"items": items, "next_cursor": next_cursor})
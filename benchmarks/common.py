@@ -0,0 +1,142 @@
+"""
+Utilitários compartilhados pelos benchmarks: sobem a API em um subprocesso
+(uvicorn) e geram carga HTTP concorrente medindo a latência de cada requisição.
+"""
+import asyncio
+import contextlib
+import os
+import socket
+import subprocess
+import sys
+import time
+from pathlib import Path
+from typing import Callable, Dict, Iterator, Optional, Sequence, Tuple
+
+import httpx
+
+RAIZ_PROJETO = Path(__file__).resolve().parent.parent
+
+# Uma requisição gerada para o teste de carga: (método, caminho, corpo JSON opcional).
+Requisicao = Tuple[str, str, Optional[dict]]
+
+
+def porta_livre() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+@contextlib.contextmanager
+def servidor_api(
+    env_extra: Dict[str, str],
+    porta: Optional[int] = None,
+    timeout: float = 30.0,
+    intervalo: float = 0.1,
+    prefixo: Sequence[str] = (),
+) -> Iterator[str]:
+    """
+    Sobe `uvicorn api.app:app` com as variáveis de ambiente adicionais e devolve a URL base.
+
+    O processo é encerrado ao sair do bloco `with`. `intervalo` é o tempo entre as
+    verificações de prontidão (GET /docs); `prefixo` antecede o comando (ex.: newrelic-admin run-program).
+    """
+    porta = porta or porta_livre()
+    env = {**os.environ, **env_extra}
+    processo = subprocess.Popen(
+        [*prefixo, sys.executable, "-m", "uvicorn", "api.app:app", "--host", "127.0.0.1", "--port", str(porta), "--log-level", "warning"],
+        cwd=RAIZ_PROJETO,
+        env=env,
+    )
+    base_url = f"http://127.0.0.1:{porta}"
+    try:
+        limite = time.monotonic() + timeout
+        while True:
+            if processo.poll() is not None:
+                raise RuntimeError(f"A API encerrou durante a inicialização (código {processo.returncode})")
+            try:
+                if httpx.get(f"{base_url}/docs", timeout=1.0).status_code == 200:
+                    break
+            except httpx.TransportError:
+                pass
+            if time.monotonic() > limite:
+                raise RuntimeError("A API não respondeu dentro do tempo limite")
+            time.sleep(intervalo)
+        yield base_url
+    finally:
+        processo.terminate()
+        try:
+            processo.wait(timeout=10)
+        except subprocess.TimeoutExpired:
+            processo.kill()
+
+
+def percentil(valores_ordenados, p: float) -> float:
+    """Percentil por interpolação linear; `valores_ordenados` precisa estar ordenado."""
+    if not valores_ordenados:
+        return 0.0
+    posicao = (len(valores_ordenados) - 1) * p / 100
+    inferior = int(posicao)
+    superior = min(inferior + 1, len(valores_ordenados) - 1)
+    fracao = posicao - inferior
+    return valores_ordenados[inferior] * (1 - fracao) + valores_ordenados[superior] * fracao
+
+
+def resumir(latencias, erros: int, duracao: float) -> dict:
+    """Resumo de uma medição: vazão e percentis de latência em milissegundos."""
+    ordenadas = sorted(latencias)
+    total = len(ordenadas)
+    return {
+        "requisicoes": total,
+        "erros": erros,
+        "duracao_s": round(duracao, 3),
+        "rps": round(total / duracao, 1) if duracao else 0.0,
+        "p50_ms": round(percentil(ordenadas, 50) * 1000, 2),
+        "p95_ms": round(percentil(ordenadas, 95) * 1000, 2),
+        "p99_ms": round(percentil(ordenadas, 99) * 1000, 2),
+        "max_ms": round(ordenadas[-1] * 1000, 2) if ordenadas else 0.0,
+    }
+
+
+async def gerar_carga(
+    base_url: str,
+    proxima_requisicao: Callable[[int], Requisicao],
+    concorrencia: int,
+    total: int,
+    status_esperados=(200, 201, 204),
+    ao_responder: Optional[Callable[[int, httpx.Response], None]] = None,
+) -> dict:
+    """
+    Dispara `total` requisições mantendo `concorrencia` delas em andamento.
+
+    Args:
+        proxima_requisicao: Recebe o número sequencial da requisição e devolve (método, caminho, json).
+        status_esperados: Status que contam como sucesso; os demais entram em `erros`.
+        ao_responder: Chamado com (número, resposta) após cada requisição bem-sucedida.
+    """
+    latencias = []
+    erros = 0
+    contador = iter(range(total))
+    limites = httpx.Limits(max_connections=concorrencia, max_keepalive_connections=concorrencia)
+
+    async with httpx.AsyncClient(base_url=base_url, limits=limites, timeout=60.0) as cliente:
+        async def trabalhador():
+            nonlocal erros
+            for numero in contador:
+                metodo, caminho, corpo = proxima_requisicao(numero)
+                inicio = time.perf_counter()
+                try:
+                    resposta = await cliente.request(metodo, caminho, json=corpo)
+                    sucesso = resposta.status_code in status_esperados
+                except httpx.HTTPError:
+                    sucesso = False
+                latencias.append(time.perf_counter() - inicio)
+                if sucesso and ao_responder is not None:
+                    ao_responder(numero, resposta)
+                if not sucesso:
+                    erros += 1
+
+        inicio = time.perf_counter()
+        await asyncio.gather(*(trabalhador() for _ in range(concorrencia)))
+        duracao = time.perf_counter() - inicio
+
+    return resumir(latencias, erros, duracao)
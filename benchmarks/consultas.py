@@ -0,0 +1,92 @@
+"""
+Microbenchmark das buscas de uma linha: `db.query(...).filter(...).first()` montado
+a cada chamada contra os comandos prontos de `api/consultas.py`.
+
+Roda no próprio processo sobre um SQLite temporário, então a diferença medida é o
+custo de montar e compilar a consulta no ORM, não o do banco. Uso:
+
+    python -m benchmarks.consultas --chamadas 20000
+"""
+import argparse
+import json
+import os
+import tempfile
+import time
+from pathlib import Path
+
+
+def preparar_banco(caminho_banco: Path):
+    """Importa a API apontando para um SQLite novo com alguns alunos, cursos e matrículas."""
+    os.environ["DATABASE_URL"] = f"sqlite:///{caminho_banco}"
+    from api import models
+    from api.database import SessionLocal, iniciar_engines
+    from api.schema import create_schema
+
+    create_schema(iniciar_engines())
+    with SessionLocal() as db:
+        db.add_all([models.Curso(id=i, nome=f"Curso {i}", codigo=f"BENCH-{i}", carga_horaria=60) for i in range(1, 11)])
+        db.add_all([models.Aluno(id=i, nome=f"Aluno {i}", email=f"aluno.{i}@example.com") for i in range(1, 101)])
+        db.add_all([models.Matricula(id=i, aluno_id=i, curso_id=i % 10 + 1) for i in range(1, 101)])
+        db.commit()
+    return SessionLocal
+
+
+def buscas():
+    """Pares (original, pronta) de cada busca medida; recebem a sessão e o número da chamada."""
+    from api import consultas, models
+
+    return {
+        "aluno_por_id": (
+            lambda db, n: db.query(models.Aluno).filter(models.Aluno.id == n % 100 + 1).first(),
+            lambda db, n: consultas.aluno_por_id(db, n % 100 + 1),
+        ),
+        "curso_por_codigo": (
+            lambda db, n: db.query(models.Curso).filter(models.Curso.codigo == f"BENCH-{n % 10 + 1}").first(),
+            lambda db, n: consultas.curso_por_codigo(db, f"BENCH-{n % 10 + 1}"),
+        ),
+        "matricula_duplicada": (
+            lambda db, n: db.query(models.Matricula).filter(
+                models.Matricula.aluno_id == n % 100 + 1,
+                models.Matricula.curso_id == n % 10 + 1,
+                models.Matricula.id != n % 100 + 1,
+            ).first() is not None,
+            lambda db, n: consultas.matricula_duplicada(db, n % 100 + 1, n % 100 + 1, n % 10 + 1),
+        ),
+    }
+
+
+def medir(SessionLocal, busca, chamadas: int) -> float:
+    """Microssegundos por chamada, em uma sessão só (como dentro de uma requisição)."""
+    with SessionLocal() as db:
+        for n in range(100):  # aquecimento: preenche o cache de compilação
+            busca(db, n)
+        inicio = time.perf_counter()
+        for n in range(chamadas):
+            busca(db, n)
+        return (time.perf_counter() - inicio) / chamadas * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--chamadas", type=int, default=20000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as diretorio:
+        SessionLocal = preparar_banco(Path(diretorio) / "bench.db")
+        resultado = {"chamadas": args.chamadas}
+        for nome, (original, pronta) in buscas().items():
+            us_original = medir(SessionLocal, original, args.chamadas)
+            us_pronta = medir(SessionLocal, pronta, args.chamadas)
+            resultado[nome] = {
+                "original_us": round(us_original, 1),
+                "pronta_us": round(us_pronta, 1),
+                "economia_us": round(us_original - us_pronta, 1),
+                "ganho": round(us_original / us_pronta, 2),
+            }
+        from api.database import engine
+        engine.dispose()
+    print(json.dumps(resultado, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+"""
+Mede o tempo de inicialização da API: a importação de `api.app` em um
+interpretador novo e o tempo até a primeira resposta HTTP de um processo uvicorn
+(partida a frio, equivalente à troca de um worker).
+
+A partida é medida com as etapas do lifespan ligadas e desligadas
+(STARTUP_CREATE_SCHEMA, STARTUP_DB_CHECK) e com o agente do New Relic
+(newrelic-admin run-program), como no Dockerfile. Uso:
+
+    python -m benchmarks.inicializacao --database-url "$DATABASE_URL" --repeticoes 5
+
+Sem `--database-url`, usa um SQLite temporário.
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from .common import RAIZ_PROJETO, servidor_api
+
+# Nome do cenário: (variáveis de ambiente, prefixo do comando).
+CENARIOS = {
+    "padrao": ({}, ()),
+    "sem_schema": ({"STARTUP_CREATE_SCHEMA": "0"}, ()),
+    "verificando_banco": ({"STARTUP_DB_CHECK": "1"}, ()),
+    "com_newrelic": ({}, ("newrelic-admin", "run-program")),
+}
+
+CODIGO_IMPORTACAO = "import time; inicio = time.perf_counter(); import api.app; print(time.perf_counter() - inicio)"
+
+
+def resumo_ms(tempos) -> dict:
+    return {
+        "mediana_ms": round(statistics.median(tempos) * 1000, 1),
+        "min_ms": round(min(tempos) * 1000, 1),
+        "max_ms": round(max(tempos) * 1000, 1),
+    }
+
+
+def medir_importacao(env: dict, repeticoes: int) -> dict:
+    tempos = []
+    for _ in range(repeticoes):
+        saida = subprocess.run(
+            [sys.executable, "-c", CODIGO_IMPORTACAO],
+            cwd=RAIZ_PROJETO, env={**os.environ, **env}, capture_output=True, text=True, check=True,
+        )
+        tempos.append(float(saida.stdout.strip().splitlines()[-1]))
+    return resumo_ms(tempos)
+
+
+def medir_partida(env: dict, prefixo, repeticoes: int) -> dict:
+    tempos = []
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        with servidor_api(env, intervalo=0.005, prefixo=prefixo):
+            tempos.append(time.perf_counter() - inicio)
+    return resumo_ms(tempos)
+
+
+def executar(database_url: str, repeticoes: int) -> dict:
+    env = {"DATABASE_URL": database_url}
+    resultado = {"importacao": medir_importacao(env, repeticoes), "partida": {}}
+    for nome, (extra, prefixo) in CENARIOS.items():
+        resultado["partida"][nome] = medir_partida({**env, **extra}, prefixo, repeticoes)
+    return resultado
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--database-url", default=os.getenv("DATABASE_URL"))
+    parser.add_argument("--repeticoes", type=int, default=5)
+    args = parser.parse_args()
+
+    if args.database_url:
+        resultado = executar(args.database_url, args.repeticoes)
+    else:
+        with tempfile.TemporaryDirectory() as diretorio:
+            resultado = executar(f"sqlite:///{Path(diretorio) / 'inicializacao.db'}", args.repeticoes)
+    print(json.dumps(resultado, indent=2))
+
+
+if __name__ == "__main__":
+    main()
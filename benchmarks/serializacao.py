@@ -0,0 +1,90 @@
+"""
+Microbenchmark da serialização de listas grandes: caminho original (ORM +
+`model_validate` + validação do `response_model`) contra o caminho rápido
+(tuplas -> dicionários -> orjson), em respostas de `/alunos` e `/matriculas`.
+
+A API roda no próprio processo (TestClient) sobre um SQLite temporário, então o
+tempo medido é o do servidor, sem rede. Uso:
+
+    python -m benchmarks.serializacao --linhas 10000 --repeticoes 20
+"""
+import argparse
+import json
+import os
+import statistics
+import tempfile
+import time
+from pathlib import Path
+
+ROTAS = ["/alunos", "/matriculas"]
+
+
+def preparar_app(caminho_banco: Path, linhas: int):
+    """Importa a API apontando para um SQLite novo e insere `linhas` alunos e matrículas."""
+    os.environ["DATABASE_URL"] = f"sqlite:///{caminho_banco}"
+    from api import models
+    from api.app import app
+    from api.database import SessionLocal, iniciar_engines
+    from api.schema import create_schema
+
+    create_schema(iniciar_engines())
+    with SessionLocal() as db:
+        cursos = [models.Curso(id=i, nome=f"Curso {i}", codigo=f"BENCH-{i}", carga_horaria=60 + i) for i in range(1, 11)]
+        db.add_all(cursos)
+        # bulk_insert_mappings não descarrega os objetos pendentes, e as chaves estrangeiras estão ativas.
+        db.flush()
+        db.bulk_insert_mappings(models.Aluno, [
+            {"id": i, "nome": f"Aluno {i}", "email": f"aluno.{i}@example.com", "telefone": "11999999999"}
+            for i in range(1, linhas + 1)
+        ])
+        db.bulk_insert_mappings(models.Matricula, [
+            {"aluno_id": i, "curso_id": i % 10 + 1} for i in range(1, linhas + 1)
+        ])
+        db.commit()
+    return app
+
+
+def medir(cliente, rota: str, repeticoes: int) -> dict:
+    cliente.get(rota)  # aquecimento
+    tempos = []
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        resposta = cliente.get(rota)
+        tempos.append(time.perf_counter() - inicio)
+        assert resposta.status_code == 200
+    return {
+        "media_ms": round(statistics.mean(tempos) * 1000, 2),
+        "p50_ms": round(statistics.median(tempos) * 1000, 2),
+        "min_ms": round(min(tempos) * 1000, 2),
+        "bytes": len(resposta.content),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--linhas", type=int, default=10000)
+    parser.add_argument("--repeticoes", type=int, default=20)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as diretorio:
+        app = preparar_app(Path(diretorio) / "bench.db", args.linhas)
+        from fastapi.testclient import TestClient
+        from api import serializacao
+
+        resultado = {"linhas": args.linhas, "repeticoes": args.repeticoes}
+        with TestClient(app) as cliente:
+            for rota in ROTAS:
+                serializacao.SERIALIZACAO_RAPIDA = False
+                original = medir(cliente, rota, args.repeticoes)
+                serializacao.SERIALIZACAO_RAPIDA = True
+                rapida = medir(cliente, rota, args.repeticoes)
+                resultado[rota] = {
+                    "original": original,
+                    "rapida": rapida,
+                    "ganho": round(original["media_ms"] / rapida["media_ms"], 2),
+                }
+    print(json.dumps(resultado, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -24,4 +24,24 @@ CREATE TABLE IF NOT EXISTS matriculas (
     FOREIGN KEY (aluno_id) REFERENCES alunos(id) ON DELETE CASCADE,
     FOREIGN KEY (curso_id) REFERENCES cursos(id) ON DELETE CASCADE,
     UNIQUE (aluno_id, curso_id) -- Garante que um aluno não pode se matricular no mesmo curso duas vezes
-);
\ No newline at end of file
+);
+
+-- O índice único começa por aluno_id; as buscas e o cascade por curso precisam do seu próprio
+CREATE INDEX IF NOT EXISTS ix_matriculas_curso_id ON matriculas (curso_id);
+
+-- Versão de cada tabela, incrementada pela API a cada escrita (base das ETags)
+CREATE TABLE IF NOT EXISTS versoes_tabelas (
+    tabela VARCHAR PRIMARY KEY,
+    versao INTEGER NOT NULL DEFAULT 0
+);
+
+-- Quantidade de matrículas por curso, mantida pela API a cada escrita
+-- (verificação/reconstrução: python -m api.resumo [--reconstruir])
+CREATE TABLE IF NOT EXISTS resumo_cursos (
+    curso_id INTEGER PRIMARY KEY REFERENCES cursos(id) ON DELETE CASCADE,
+    total_matriculas INTEGER NOT NULL DEFAULT 0
+);
+
+-- Índice de trigramas para a busca de alunos por parte do nome (ILIKE '%termo%')
+CREATE EXTENSION IF NOT EXISTS pg_trgm;
+CREATE INDEX IF NOT EXISTS ix_alunos_nome_trgm ON alunos USING gin (nome gin_trgm_ops);
\ No newline at end of file
@@ -25,4 +25,9 @@ ON CONFLICT (email) DO NOTHING; -- Evita erro se o aluno já existir
 INSERT INTO matriculas (aluno_id, curso_id) VALUES
 (1, 1), (1, 2), -- Ana Silva em Engenharia de Software e Ciência de Dados
 (2, 3)        -- Bruno Costa em Desenvolvimento Web Full Stack
-ON CONFLICT (aluno_id, curso_id) DO NOTHING; -- Evita erro se a matrícula já existir
\ No newline at end of file
+ON CONFLICT (aluno_id, curso_id) DO NOTHING; -- Evita erro se a matrícula já existir
+
+-- As matrículas acima não passam pela API: recalcula o resumo por curso
+DELETE FROM resumo_cursos;
+INSERT INTO resumo_cursos (curso_id, total_matriculas)
+SELECT curso_id, COUNT(*) FROM matriculas GROUP BY curso_id;
\ No newline at end of file
@@ -5,7 +5,9 @@ from sqlalchemy.orm import sessionmaker, Session
 from sqlalchemy.pool import StaticPool
 
 from api.app import app
-from api.database import Base, get_db
+from api.database import Base, get_db, habilitar_chaves_estrangeiras_sqlite
+from api.cache import curso_cache
+from api.resumo import reconstruir as reconstruir_resumo
 from api.models import Aluno as ModelAluno, Curso as ModelCurso, Matricula as ModelMatricula
 
 SQLALCHEMY_DATABASE_URL = "sqlite:///:memory:"
@@ -15,6 +17,8 @@ engine = create_engine(
     connect_args={"check_same_thread": False},
     poolclass=StaticPool,  
 )
+# Como no PostgreSQL, as exclusões dependem do ON DELETE CASCADE.
+habilitar_chaves_estrangeiras_sqlite(engine)
 TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
 def override_get_db():
@@ -28,6 +32,8 @@ app.dependency_overrides[get_db] = override_get_db
 
 @pytest.fixture(scope="function")
 def db_session() -> Session:
+    # O banco é recriado a cada teste; o cache do catálogo não pode sobreviver a ele.
+    curso_cache.clear()
     Base.metadata.drop_all(bind=engine)
     Base.metadata.create_all(bind=engine)
     db = TestingSessionLocal()
@@ -55,4 +61,6 @@ def populated_db_session(db_session: Session):
 
     db_session.add_all([aluno1, aluno2, aluno3, curso1, curso2, matricula1, matricula2])
     db_session.commit()
+    # Matrículas inseridas direto no banco: o resumo por curso precisa ser recalculado.
+    reconstruir_resumo(db_session)
     return db_session
\ No newline at end of file
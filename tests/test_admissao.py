@@ -0,0 +1,86 @@
+import asyncio
+
+import httpx
+from prometheus_client import REGISTRY
+from starlette.applications import Starlette
+from starlette.responses import JSONResponse
+from starlette.routing import Route
+import pytest
+
+from api.admissao import AdmissaoMiddleware, configuracao_admissao
+
+
+def app_lento(leitura=(1, 1), escrita=(1, 0), espera_maxima=5.0):
+    """App mínimo com rotas de leitura e escrita que demoram 50 ms."""
+    async def rota(request):
+        await asyncio.sleep(0.05)
+        return JSONResponse({"ok": True})
+
+    rotas = [Route("/alunos", rota, methods=["GET", "POST"]), Route("/metrics", rota)]
+    configuracao = {"leitura": leitura, "escrita": escrita, "espera_maxima": espera_maxima, "retry_after": 2}
+    return AdmissaoMiddleware(Starlette(routes=rotas), configuracao)
+
+async def disparar(app, requisicoes):
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://teste") as cliente:
+        return await asyncio.gather(*(cliente.request(metodo, caminho) for metodo, caminho in requisicoes))
+
+def amostra(nome: str, labels: dict) -> float:
+    return REGISTRY.get_sample_value(nome, labels) or 0
+
+@pytest.mark.unit
+def test_fila_absorve_ate_o_limite():
+    # 1 em execução + 1 na fila: as duas leituras são atendidas.
+    respostas = asyncio.run(disparar(app_lento(), [("GET", "/alunos")] * 2))
+    assert [response.status_code for response in respostas] == [200, 200]
+
+@pytest.mark.unit
+def test_fila_cheia_responde_503_com_retry_after():
+    labels = {"classe": "leitura", "motivo": "fila_cheia"}
+    antes = amostra("ellis_admission_rejected_total", labels)
+    respostas = asyncio.run(disparar(app_lento(), [("GET", "/alunos")] * 3))
+    assert sorted(response.status_code for response in respostas) == [200, 200, 503]
+    recusada = next(response for response in respostas if response.status_code == 503)
+    assert recusada.headers["retry-after"] == "2"
+    assert amostra("ellis_admission_rejected_total", labels) == antes + 1
+
+@pytest.mark.unit
+def test_espera_maxima_responde_503():
+    labels = {"classe": "leitura", "motivo": "tempo_esgotado"}
+    antes = amostra("ellis_admission_rejected_total", labels)
+    antes_espera = amostra("ellis_admission_wait_seconds_count", {"classe": "leitura"})
+    respostas = asyncio.run(disparar(app_lento(espera_maxima=0.01), [("GET", "/alunos")] * 2))
+    assert sorted(response.status_code for response in respostas) == [200, 503]
+    assert amostra("ellis_admission_rejected_total", labels) == antes + 1
+    assert amostra("ellis_admission_wait_seconds_count", {"classe": "leitura"}) == antes_espera + 1
+
+@pytest.mark.unit
+def test_leituras_e_escritas_tem_limites_separados():
+    # Sem fila para escritas: a segunda escrita é recusada, mas a leitura segue.
+    respostas = asyncio.run(disparar(app_lento(), [("POST", "/alunos"), ("POST", "/alunos"), ("GET", "/alunos")]))
+    assert [response.status_code for response in respostas] == [200, 503, 200]
+
+@pytest.mark.unit
+def test_metricas_nao_passam_pela_fila():
+    respostas = asyncio.run(disparar(app_lento(leitura=(1, 0)), [("GET", "/alunos")] + [("GET", "/metrics")] * 3))
+    assert [response.status_code for response in respostas] == [200] * 4
+
+@pytest.mark.unit
+def test_vagas_liberadas_ao_final():
+    app = app_lento()
+
+    async def duas_rodadas():
+        await disparar(app, [("GET", "/alunos")] * 3)
+        assert amostra("ellis_admission_queue_depth", {"classe": "leitura"}) == 0
+        # Sem vazamento de vagas: a próxima rodada é atendida do mesmo jeito.
+        return await disparar(app, [("GET", "/alunos")] * 2)
+
+    respostas = asyncio.run(duas_rodadas())
+    assert [response.status_code for response in respostas] == [200, 200]
+
+@pytest.mark.unit
+def test_configuracao_segue_o_pool(monkeypatch):
+    monkeypatch.setenv("DB_POOL_SIZE", "4")
+    monkeypatch.setenv("DB_MAX_OVERFLOW", "2")
+    configuracao = configuracao_admissao()
+    assert configuracao["leitura"] == (6, 12)
+    assert configuracao["escrita"] == (3, 6)
@@ -1,3 +1,6 @@
+import csv
+import io
+import json
 from fastapi.testclient import TestClient
 import pytest
 
@@ -115,4 +118,142 @@ def test_read_aluno_por_email_existente(client: TestClient, populated_db_session
 def test_read_aluno_por_email_inexistente(client: TestClient, populated_db_session):
     response = client.get("/alunos/email/inexistente@example.com")
     assert response.status_code == 404
-    assert response.json() == {"detail": "Nenhum aluno encontrado com esse email"}
\ No newline at end of file
+    assert response.json() == {"detail": "Nenhum aluno encontrado com esse email"}
+
+@pytest.mark.unit
+def test_read_alunos_paginado(client: TestClient, populated_db_session):
+    response = client.get("/alunos", params={"limit": 2})
+    assert response.status_code == 200
+    data = response.json()
+    assert [aluno["id"] for aluno in data["items"]] == [1, 2]
+    assert data["next_cursor"] is not None
+
+    response = client.get("/alunos", params={"limit": 2, "after": data["next_cursor"]})
+    assert response.status_code == 200
+    data = response.json()
+    assert [aluno["id"] for aluno in data["items"]] == [3]
+    assert data["next_cursor"] is None
+
+@pytest.mark.unit
+def test_read_alunos_cursor_invalido(client: TestClient, populated_db_session):
+    response = client.get("/alunos", params={"limit": 2, "after": "nao-e-um-cursor"})
+    assert response.status_code == 400
+    assert response.json() == {"detail": "Cursor de paginação inválido"}
+
+@pytest.mark.unit
+@pytest.mark.parametrize("conteudo", ['{"id":true}', '{"id":-1}', '{"id":12345678901234567890123}', '{"id":"1"}', '[1]'])
+def test_read_alunos_cursor_fora_da_faixa(client: TestClient, populated_db_session, conteudo):
+    import base64
+
+    cursor = base64.urlsafe_b64encode(conteudo.encode()).rstrip(b"=").decode()
+    response = client.get("/alunos", params={"after": cursor})
+    assert response.status_code == 400
+    assert response.json() == {"detail": "Cursor de paginação inválido"}
+
+@pytest.mark.unit
+def test_export_alunos_ndjson(client: TestClient, populated_db_session):
+    response = client.get("/alunos/export")
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    linhas = [json.loads(linha) for linha in response.text.splitlines()]
+    assert len(linhas) == 3
+    assert linhas[0] == {"id": 1, "nome": "João Silva", "email": "joao.silva@example.com", "telefone": "111111111"}
+
+@pytest.mark.unit
+def test_export_alunos_csv(client: TestClient, populated_db_session):
+    response = client.get("/alunos/export", params={"formato": "csv"})
+    assert response.status_code == 200
+    linhas = list(csv.reader(io.StringIO(response.text)))
+    assert linhas[0] == ["id", "nome", "email", "telefone"]
+    assert linhas[3] == ["3", "Pedro Santos", "pedro.santos@example.com", "333333333"]
+
+@pytest.mark.unit
+def test_create_alunos_bulk(client: TestClient, populated_db_session):
+    alunos_data = [
+        {"nome": "Ana Lima", "email": "ana.lima@example.com", "telefone": "555555555"},
+        {"nome": "João Repetido", "email": "joao.silva@example.com"},
+        {"nome": "Bruno Reis", "email": "bruno.reis@example.com"},
+        {"nome": "Ana Duplicada", "email": "ana.lima@example.com"},
+    ]
+    response = client.post("/alunos/bulk", json=alunos_data)
+    assert response.status_code == 200
+    data = response.json()
+    assert [item["indice"] for item in data["criados"]] == [0, 2]
+    assert data["erros"] == [
+        {"indice": 1, "detail": "Email já cadastrado"},
+        {"indice": 3, "detail": "Email repetido no lote"},
+    ]
+
+    get_response = client.get(f"/alunos/{data['criados'][1]['id']}")
+    assert get_response.json()["nome"] == "Bruno Reis"
+    assert len(client.get("/alunos").json()) == 5
+
+@pytest.mark.unit
+def test_read_aluno_por_nome_ordenado_por_relevancia(client: TestClient, populated_db_session):
+    client.post("/alunos", json={"nome": "Silvana Souza", "email": "silvana@example.com"})
+    response = client.get("/alunos/nome/silva")
+    assert response.status_code == 200
+    assert [aluno["nome"] for aluno in response.json()] == ["Silvana Souza", "João Silva", "Maria Silva"]
+
+    response = client.get("/alunos/nome/silva", params={"limit": 1})
+    assert [aluno["nome"] for aluno in response.json()] == ["Silvana Souza"]
+
+@pytest.mark.unit
+def test_read_aluno_por_nome_curinga_literal(client: TestClient, populated_db_session):
+    response = client.get("/alunos/nome/%25")
+    assert response.status_code == 404
+
+@pytest.mark.unit
+@pytest.mark.parametrize("params", ["", "?limit=2", "?limit=2&after=eyJpZCI6Mn0"])
+def test_read_alunos_serializacao_rapida_igual_a_original(client: TestClient, populated_db_session, monkeypatch, params):
+    from api import serializacao
+
+    monkeypatch.setattr(serializacao, "SERIALIZACAO_RAPIDA", False)
+    original = client.get(f"/alunos{params}")
+    monkeypatch.setattr(serializacao, "SERIALIZACAO_RAPIDA", True)
+    rapida = client.get(f"/alunos{params}")
+
+    assert rapida.status_code == original.status_code == 200
+    assert rapida.json() == original.json()
+    assert rapida.headers["etag"] == original.headers["etag"]
+
+@pytest.mark.unit
+def test_delete_alunos_em_lote(client: TestClient, populated_db_session):
+    response = client.delete("/alunos?ids=1,3,99&ids=1")
+    assert response.status_code == 200
+    assert response.json() == {"apagados": [1, 3], "nao_encontrados": [99]}
+
+    assert [aluno["id"] for aluno in client.get("/alunos").json()] == [2]
+    # As matrículas do aluno 1 saem por ON DELETE CASCADE e o resumo do curso acompanha.
+    assert [matricula["aluno_id"] for matricula in client.get("/matriculas").json()] == [2]
+    assert client.get("/cursos/CS101/resumo").json()["matriculas"] == 1
+
+@pytest.mark.unit
+@pytest.mark.parametrize("query", ["", "?ids=", "?ids=1,abc", "?ids=0", "?ids=1,99999999999999999999"])
+def test_delete_alunos_em_lote_ids_invalidos(client: TestClient, query):
+    assert client.delete(f"/alunos{query}").status_code in (400, 422)
+
+@pytest.mark.unit
+def test_read_alunos_por_ids(client: TestClient, populated_db_session):
+    response = client.get("/alunos?ids=3,1,42")
+    assert response.status_code == 200
+    assert response.json() == {
+        "encontrados": {
+            "1": {"id": 1, "nome": "João Silva", "email": "joao.silva@example.com", "telefone": "111111111"},
+            "3": {"id": 3, "nome": "Pedro Santos", "email": "pedro.santos@example.com", "telefone": "333333333"},
+        },
+        "nao_encontrados": [42],
+    }
+    # Uma única consulta de dados (a outra é a das versões da ETag).
+    assert 'desc="2 queries"' in response.headers["server-timing"]
+
+@pytest.mark.unit
+@pytest.mark.parametrize("ids", ["99999999999999999999", "-1", "1,abc"])
+def test_read_alunos_por_ids_invalidos(client: TestClient, populated_db_session, ids):
+    response = client.get("/alunos", params={"ids": ids})
+    assert response.status_code == 400
+    assert response.json() == {"detail": "Lista de IDs inválida"}
+
+@pytest.mark.unit
+def test_read_alunos_por_ids_com_paginacao(client: TestClient, populated_db_session):
+    assert client.get("/alunos?ids=1&limit=10").status_code == 400
\ No newline at end of file
@@ -0,0 +1,85 @@
+import json
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import NullPool
+
+from api.app import app
+from api.cache import curso_cache
+from api.database import Base, get_db, async_database_url, habilitar_chaves_estrangeiras_sqlite
+from api.models import Aluno as ModelAluno, Curso as ModelCurso, Matricula as ModelMatricula
+
+# O modo assíncrono usa um arquivo SQLite (aiosqlite) em vez do banco em memória:
+# cada requisição do TestClient roda em um event loop novo, e com NullPool cada
+# conexão é aberta no loop que a utiliza.
+
+@pytest.fixture(scope="function")
+def async_client(tmp_path):
+    curso_cache.clear()
+    url = f"sqlite:///{tmp_path / 'async.db'}"
+    sync_engine = create_engine(url)
+    Base.metadata.create_all(bind=sync_engine)
+
+    db = sessionmaker(bind=sync_engine)()
+    db.add_all([
+        ModelAluno(id=1, nome="João Silva", email="joao.silva@example.com", telefone="111111111"),
+        ModelAluno(id=2, nome="Maria Silva", email="maria.silva@example.com", telefone="222222222"),
+        ModelCurso(id=1, codigo="CS101", nome="Ciência da Computação", carga_horaria=3600),
+        ModelMatricula(aluno_id=1, curso_id=1),
+    ])
+    db.commit()
+    db.close()
+
+    async_engine = create_async_engine(async_database_url(url), poolclass=NullPool)
+    habilitar_chaves_estrangeiras_sqlite(async_engine.sync_engine)
+    AsyncTestingSessionLocal = async_sessionmaker(async_engine, autocommit=False, autoflush=False)
+
+    async def override_get_async_db():
+        async with AsyncTestingSessionLocal() as session:
+            yield session
+
+    override_anterior = app.dependency_overrides[get_db]
+    app.dependency_overrides[get_db] = override_get_async_db
+    try:
+        yield TestClient(app)
+    finally:
+        app.dependency_overrides[get_db] = override_anterior
+        sync_engine.dispose()
+
+@pytest.mark.unit
+def test_async_database_url():
+    assert async_database_url("postgresql+psycopg2://u:p@db:5432/ellis") == "postgresql+asyncpg://u:p@db:5432/ellis"
+    assert async_database_url("sqlite:///teste.db") == "sqlite+aiosqlite:///teste.db"
+
+@pytest.mark.unit
+def test_async_read_e_create_aluno(async_client: TestClient):
+    response = async_client.get("/alunos")
+    assert response.status_code == 200
+    assert [aluno["nome"] for aluno in response.json()] == ["João Silva", "Maria Silva"]
+
+    response = async_client.post("/alunos", json={"nome": "Ana Lima", "email": "ana.lima@example.com"})
+    assert response.status_code == 200
+    aluno_id = response.json()["id"]
+    assert async_client.get(f"/alunos/{aluno_id}").json()["nome"] == "Ana Lima"
+
+@pytest.mark.unit
+def test_async_create_matricula(async_client: TestClient):
+    response = async_client.post("/matriculas", json={"aluno_id": 2, "curso_id": 1})
+    assert response.status_code == 201
+    assert response.json()["aluno"]["nome"] == "Maria Silva"
+
+    response = async_client.post("/matriculas", json={"aluno_id": 2, "curso_id": 1})
+    assert response.status_code == 400
+    assert response.json() == {"detail": "Aluno já matriculado neste curso"}
+
+@pytest.mark.unit
+def test_async_export_matriculas(async_client: TestClient):
+    response = async_client.get("/matriculas/export")
+    assert response.status_code == 200
+    linhas = [json.loads(linha) for linha in response.text.splitlines()]
+    assert linhas == [{
+        "id": 1, "aluno_id": 1, "aluno_nome": "João Silva", "aluno_email": "joao.silva@example.com",
+        "curso_id": 1, "curso_codigo": "CS101", "curso_nome": "Ciência da Computação",
+    }]
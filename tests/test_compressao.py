@@ -0,0 +1,110 @@
+import asyncio
+import gzip
+import json
+
+import brotli
+from fastapi.testclient import TestClient
+from prometheus_client import REGISTRY
+from starlette.applications import Starlette
+from starlette.responses import StreamingResponse
+from starlette.routing import Route
+import pytest
+
+from api.compressao import CompressaoMiddleware, escolher_codificacao
+
+
+@pytest.fixture
+def muitos_alunos(client: TestClient):
+    lote = [{"nome": f"Aluno {i}", "email": f"aluno.{i}@example.com"} for i in range(100)]
+    assert client.post("/alunos/bulk", json=lote).status_code == 200
+
+@pytest.mark.unit
+@pytest.mark.parametrize("accept_encoding, esperada", [
+    ("gzip, deflate, br", "br"),
+    ("gzip", "gzip"),
+    ("br;q=0, gzip;q=0.5", "gzip"),
+    ("*", "br"),
+    ("gzip;q=0, *;q=0", None),
+    ("identity", None),
+    ("", None),
+])
+def test_escolher_codificacao(accept_encoding, esperada):
+    assert escolher_codificacao(accept_encoding) == esperada
+
+@pytest.mark.unit
+@pytest.mark.parametrize("codificacao, descomprimir", [("gzip", gzip.decompress), ("br", brotli.decompress)])
+def test_listagem_comprimida(client: TestClient, muitos_alunos, codificacao, descomprimir):
+    labels = {"encoding": codificacao}
+    antes_razao = REGISTRY.get_sample_value("ellis_compression_ratio_count", labels) or 0
+    antes_cpu = REGISTRY.get_sample_value("ellis_compression_cpu_seconds_count", labels) or 0
+    with client.stream("GET", "/alunos", headers={"Accept-Encoding": codificacao}) as response:
+        corpo_comprimido = b"".join(response.iter_raw())
+    assert response.status_code == 200
+    assert response.headers["content-encoding"] == codificacao
+    assert response.headers["vary"] == "Accept-Encoding"
+    corpo = descomprimir(corpo_comprimido)
+    assert len(json.loads(corpo)) == 100
+    # O Content-Length é o do corpo comprimido, menor que o JSON original.
+    assert int(response.headers["content-length"]) == len(corpo_comprimido) < len(corpo)
+    assert REGISTRY.get_sample_value("ellis_compression_ratio_count", labels) == antes_razao + 1
+    assert REGISTRY.get_sample_value("ellis_compression_cpu_seconds_count", labels) == antes_cpu + 1
+
+@pytest.mark.unit
+def test_resposta_pequena_nao_comprimida(client: TestClient, populated_db_session):
+    response = client.get("/alunos/1", headers={"Accept-Encoding": "gzip"})
+    assert response.status_code == 200
+    assert "content-encoding" not in response.headers
+
+@pytest.mark.unit
+def test_sem_accept_encoding(client: TestClient, muitos_alunos):
+    response = client.get("/alunos", headers={"Accept-Encoding": "identity"})
+    assert "content-encoding" not in response.headers
+    assert len(response.json()) == 100
+
+@pytest.mark.unit
+def test_exportacao_comprimida(client: TestClient, muitos_alunos):
+    response = client.get("/alunos/export", headers={"Accept-Encoding": "gzip"})
+    assert response.status_code == 200
+    assert response.headers["content-encoding"] == "gzip"
+    assert "content-length" not in response.headers
+    assert len(response.text.splitlines()) == 100
+
+@pytest.mark.unit
+def test_streaming_comprimido_pedaco_a_pedaco():
+    pedacos_enviados = []
+
+    async def pedacos():
+        for i in range(3):
+            yield f"linha {i}\n" * 200
+
+    async def rota(request):
+        return StreamingResponse(pedacos(), media_type="text/plain")
+
+    app = CompressaoMiddleware(Starlette(routes=[Route("/", rota)]))
+
+    async def enviar(message):
+        pedacos_enviados.append(message)
+
+    mensagens = iter([{"type": "http.request", "body": b""}])
+
+    async def receber():
+        # Depois do corpo da requisição, o cliente desconecta (encerra o listen_for_disconnect do Starlette).
+        return next(mensagens, {"type": "http.disconnect"})
+
+    scope = {"type": "http", "method": "GET", "path": "/", "headers": [(b"accept-encoding", b"gzip")], "query_string": b""}
+    asyncio.run(app(scope, receber, enviar))
+
+    corpos = [message for message in pedacos_enviados if message["type"] == "http.response.body"]
+    # Cada pedaço gerado sai comprimido logo em seguida, mais o fechamento do stream.
+    assert len(corpos) == 4
+    assert all(message["body"] for message in corpos[:3])
+    conteudo = gzip.decompress(b"".join(message["body"] for message in corpos)).decode()
+    assert conteudo == "".join(f"linha {i}\n" * 200 for i in range(3))
+
+@pytest.mark.unit
+@pytest.mark.parametrize("accept_encoding", ["gzip", "identity"])
+def test_resposta_sem_compressao_tem_vary(client: TestClient, populated_db_session, accept_encoding):
+    # Pequena ou sem codificação aceita, a resposta ainda depende do Accept-Encoding para caches compartilhados.
+    response = client.get("/alunos/1", headers={"Accept-Encoding": accept_encoding})
+    assert "content-encoding" not in response.headers
+    assert response.headers["vary"] == "Accept-Encoding"
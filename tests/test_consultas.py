@@ -0,0 +1,31 @@
+from sqlalchemy.orm import Session
+import pytest
+
+from api import consultas
+
+
+@pytest.mark.unit
+def test_buscas_por_chave(populated_db_session: Session):
+    assert consultas.aluno_por_id(populated_db_session, 1).email == "joao.silva@example.com"
+    assert consultas.aluno_por_id(populated_db_session, 999) is None
+    assert consultas.aluno_existe(populated_db_session, 2)
+    assert not consultas.aluno_existe(populated_db_session, 999)
+    assert consultas.curso_por_codigo(populated_db_session, "CS101").id == 1
+    assert consultas.curso_por_codigo(populated_db_session, "XX999") is None
+    assert consultas.curso_existe(populated_db_session, 1)
+    assert not consultas.curso_existe(populated_db_session, 999)
+    assert consultas.matricula_por_id_travada(populated_db_session, 1).aluno_id == 1
+
+@pytest.mark.unit
+def test_matricula_duplicada(populated_db_session: Session):
+    # A matrícula 2 é (aluno 2, curso 1): o mesmo par em outra matrícula é duplicata.
+    assert consultas.matricula_duplicada(populated_db_session, 1, 2, 1)
+    assert not consultas.matricula_duplicada(populated_db_session, 2, 2, 1)
+
+@pytest.mark.unit
+def test_comando_reaproveita_compilacao(populated_db_session: Session):
+    # Mesmo objeto de comando com outros parâmetros: a chave do cache é a mesma.
+    conexao = populated_db_session.connection()
+    conexao.execute(consultas.ALUNO_EXISTE, {"aluno_id": 1})
+    resultado = conexao.execute(consultas.ALUNO_EXISTE, {"aluno_id": 2})
+    assert "cached since" in resultado.context._get_cache_stats()
@@ -1,6 +1,10 @@
 from fastapi.testclient import TestClient
+from prometheus_client import REGISTRY
 import pytest
 
+def curso_cache_hits() -> float:
+    return REGISTRY.get_sample_value("ellis_cache_hits_total", {"cache": "cursos"}) or 0.0
+
 @pytest.mark.unit
 def test_read_cursos_com_banco_vazio(client: TestClient):
     response = client.get("/cursos")
@@ -88,4 +92,84 @@ def test_delete_curso_com_matriculas_associadas(client: TestClient, populated_db
 def test_delete_curso_inexistente(client: TestClient):
     response = client.delete("/cursos/999")
     assert response.status_code == 404
-    assert response.json() == {"detail": "Curso não encontrado"}
\ No newline at end of file
+    assert response.json() == {"detail": "Curso não encontrado"}
+
+@pytest.mark.unit
+def test_read_cursos_paginado(client: TestClient, populated_db_session):
+    response = client.get("/cursos", params={"limit": 1})
+    assert response.status_code == 200
+    data = response.json()
+    assert [curso["codigo"] for curso in data["items"]] == ["CS101"]
+
+    response = client.get("/cursos", params={"limit": 1, "after": data["next_cursor"]})
+    data = response.json()
+    assert [curso["codigo"] for curso in data["items"]] == ["EE101"]
+    assert data["next_cursor"] is None
+
+@pytest.mark.unit
+def test_cache_de_cursos_invalidado_na_escrita(client: TestClient, populated_db_session):
+    hits_antes = curso_cache_hits()
+    assert client.get("/cursos/CS101").json()["carga_horaria"] == 3600
+    assert client.get("/cursos/CS101").json()["carga_horaria"] == 3600
+    assert curso_cache_hits() == hits_antes + 1
+
+    response = client.put("/cursos/CS101", json={"carga_horaria": 3200})
+    assert response.status_code == 200
+    assert client.get("/cursos/CS101").json()["carga_horaria"] == 3200
+    assert [curso["carga_horaria"] for curso in client.get("/cursos").json()] == [3200, 4000]
+
+    client.post("/cursos", json={"codigo": "MAT01", "nome": "Matemática", "carga_horaria": 300})
+    assert len(client.get("/cursos").json()) == 3
+
+@pytest.mark.unit
+def test_metricas_do_cache_expostas(client: TestClient, populated_db_session):
+    client.get("/cursos")
+    response = client.get("/metrics")
+    assert 'ellis_cache_hits_total{cache="cursos"}' in response.text
+    assert 'ellis_cache_misses_total{cache="cursos"}' in response.text
+
+@pytest.mark.unit
+def test_delete_cursos_em_lote(client: TestClient, populated_db_session):
+    from api.resumo import verificar
+
+    assert client.get("/cursos").status_code == 200  # popula o cache do catálogo
+
+    response = client.delete("/cursos", params={"ids": "1,2,7"})
+    assert response.status_code == 200
+    assert response.json() == {"apagados": [1, 2], "nao_encontrados": [7]}
+
+    assert client.get("/cursos").json() == []
+    assert client.get("/matriculas").json() == []
+    assert verificar(populated_db_session) == []
+
+@pytest.mark.unit
+def test_read_cursos_por_codigos(client: TestClient, populated_db_session):
+    assert client.get("/cursos/CS101").status_code == 200  # CS101 passa a estar no cache
+
+    hits = curso_cache_hits()
+    response = client.get("/cursos", params={"codigos": "CS101,EE101,XX999"})
+    assert response.status_code == 200
+    data = response.json()
+    assert set(data["encontrados"]) == {"CS101", "EE101"}
+    assert data["encontrados"]["EE101"]["carga_horaria"] == 4000
+    assert data["nao_encontrados"] == ["XX999"]
+    assert curso_cache_hits() == hits + 1
+
+@pytest.mark.unit
+def test_cache_de_cursos_segue_a_versao_da_etag(client: TestClient, populated_db_session):
+    from api import models
+    from api.etag import incrementar_versoes
+
+    antiga = client.get("/cursos/CS101")
+    assert antiga.json()["carga_horaria"] == 3600
+
+    # Escrita feita por outro worker: a versão muda no banco, mas este cache não é invalidado.
+    populated_db_session.query(models.Curso).filter(models.Curso.codigo == "CS101").update({"carga_horaria": 3200})
+    incrementar_versoes(populated_db_session, "cursos")
+    populated_db_session.commit()
+
+    response = client.get("/cursos/CS101", headers={"If-None-Match": antiga.headers["etag"]})
+    assert response.status_code == 200
+    assert response.headers["etag"] != antiga.headers["etag"]
+    assert response.json()["carga_horaria"] == 3200
+    assert [curso["carga_horaria"] for curso in client.get("/cursos").json()] == [3200, 4000]
\ No newline at end of file
@@ -20,4 +20,83 @@ def test_database_url_is_mandatory(monkeypatch):
         importlib.reload(database)
 
     # Verifica se a mensagem de erro é a esperada
-    assert "A variável de ambiente DATABASE_URL é obrigatória" in str(excinfo.value)
\ No newline at end of file
+    assert "A variável de ambiente DATABASE_URL é obrigatória" in str(excinfo.value)
+
+@pytest.mark.unit
+def test_configuracao_pool_lida_do_ambiente(monkeypatch):
+    from api.database import configuracao_pool
+
+    monkeypatch.setenv("DB_POOL_SIZE", "20")
+    monkeypatch.setenv("DB_MAX_OVERFLOW", "5")
+    monkeypatch.setenv("DB_POOL_TIMEOUT", "2.5")
+    monkeypatch.setenv("DB_POOL_RECYCLE", "1800")
+    monkeypatch.setenv("DB_POOL_PRE_PING", "true")
+    assert configuracao_pool() == {
+        "pool_size": 20,
+        "max_overflow": 5,
+        "pool_timeout": 2.5,
+        "pool_recycle": 1800,
+        "pool_pre_ping": True,
+    }
+
+@pytest.mark.unit
+def test_metricas_do_pool(tmp_path):
+    """
+    Com pool_size=1 e sem overflow, o segundo checkout espera o pool_timeout e falha,
+    o que deve aparecer no contador de timeouts e nos gauges do pool.
+    """
+    from prometheus_client import REGISTRY
+    from sqlalchemy import create_engine, exc
+    from api.pool import pool_instrumentado
+
+    engine = create_engine(
+        f"sqlite:///{tmp_path / 'pool.db'}",
+        poolclass=pool_instrumentado("teste"),
+        pool_size=1,
+        max_overflow=0,
+        pool_timeout=0.05,
+    )
+
+    def amostra(nome):
+        return REGISTRY.get_sample_value(nome, {"pool": "teste"})
+
+    conexao = engine.connect()
+    assert amostra("ellis_db_pool_checked_out") == 1
+    assert amostra("ellis_db_pool_size") == 1
+
+    with pytest.raises(exc.TimeoutError):
+        engine.connect()
+    assert amostra("ellis_db_pool_checkout_timeouts_total") == 1
+    assert amostra("ellis_db_pool_checkout_wait_seconds_count") == 2
+
+    conexao.close()
+    assert amostra("ellis_db_pool_checked_out") == 0
+    engine.dispose()
+
+@pytest.mark.unit
+def test_inicializacao_no_lifespan(monkeypatch):
+    from fastapi.testclient import TestClient
+    from sqlalchemy import inspect
+
+    from api import database, inicializacao
+    from api.app import app
+
+    # Importar a aplicação não cria engines nem conecta ao banco.
+    assert database.engine is None
+
+    # O teste da DATABASE_URL obrigatória recarrega o módulo sem a variável.
+    monkeypatch.setattr(database, "DATABASE_URL", "sqlite://")
+    monkeypatch.setenv("STARTUP_DB_CHECK", "1")
+    etapas = []
+    monkeypatch.setattr(inicializacao, "create_schema", lambda engine: etapas.append("schema"))
+
+    with TestClient(app):
+        assert database.engine is not None
+        assert etapas == ["schema"]
+        assert "alunos" not in inspect(database.engine).get_table_names()
+    assert database.engine is None
+
+    monkeypatch.setenv("STARTUP_CREATE_SCHEMA", "0")
+    etapas.clear()
+    with TestClient(app):
+        assert etapas == []
\ No newline at end of file
@@ -0,0 +1,57 @@
+from fastapi.testclient import TestClient
+import pytest
+
+from api.etag import etag_corresponde
+
+
+@pytest.mark.unit
+def test_etag_corresponde():
+    assert etag_corresponde('W/"abc"', 'W/"abc"')
+    assert etag_corresponde('"xyz", W/"abc"', 'W/"abc"')
+    assert etag_corresponde("*", 'W/"abc"')
+    assert not etag_corresponde('W/"xyz"', 'W/"abc"')
+    assert not etag_corresponde(None, 'W/"abc"')
+
+@pytest.mark.unit
+def test_read_alunos_responde_304_sem_alteracoes(client: TestClient, populated_db_session):
+    response = client.get("/alunos")
+    assert response.status_code == 200
+    etag = response.headers["etag"]
+    assert response.headers["cache-control"] == "no-cache"
+
+    response = client.get("/alunos", headers={"If-None-Match": etag})
+    assert response.status_code == 304
+    assert response.content == b""
+    assert response.headers["etag"] == etag
+
+@pytest.mark.unit
+def test_escrita_invalida_etag(client: TestClient, populated_db_session):
+    etag = client.get("/alunos/1").headers["etag"]
+
+    client.put("/alunos/1", json={"nome": "João Silva Atualizado", "email": "joao.silva@example.com"})
+
+    response = client.get("/alunos/1", headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.json()["nome"] == "João Silva Atualizado"
+    assert response.headers["etag"] != etag
+
+@pytest.mark.unit
+def test_etag_depende_dos_parametros(client: TestClient, populated_db_session):
+    etag_lista = client.get("/alunos").headers["etag"]
+    etag_pagina = client.get("/alunos", params={"limit": 1}).headers["etag"]
+    assert etag_lista != etag_pagina
+
+@pytest.mark.unit
+def test_etag_de_matriculas_considera_alunos_e_cursos(client: TestClient, populated_db_session):
+    etag = client.get("/matriculas").headers["etag"]
+    assert client.get("/matriculas", headers={"If-None-Match": etag}).status_code == 304
+
+    # O nome do curso aparece aninhado nas matrículas.
+    client.put("/cursos/CS101", json={"nome": "Computação"})
+    response = client.get("/matriculas", headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.json()[0]["curso"]["nome"] == "Computação"
+
+    etag = response.headers["etag"]
+    client.delete("/alunos/3")
+    assert client.get("/matriculas", headers={"If-None-Match": etag}).status_code == 200
@@ -0,0 +1,95 @@
+import asyncio
+import uuid
+
+import httpx
+from fastapi.testclient import TestClient
+from starlette.applications import Starlette
+from starlette.responses import JSONResponse
+from starlette.routing import Route
+import pytest
+
+from api.idempotencia import ArmazenamentoMemoria, IdempotenciaMiddleware
+
+
+def nova_chave() -> dict:
+    # O armazenamento é do app e sobrevive entre os testes: cada teste usa chaves próprias.
+    return {"Idempotency-Key": str(uuid.uuid4())}
+
+@pytest.mark.unit
+def test_repeticao_devolve_primeira_resposta(client: TestClient, db_session):
+    cabecalhos = nova_chave()
+    aluno = {"nome": "Ana Souza", "email": "ana.souza@example.com"}
+    primeira = client.post("/alunos", json=aluno, headers=cabecalhos)
+    assert primeira.status_code == 200
+    assert "idempotent-replayed" not in primeira.headers
+
+    repetida = client.post("/alunos", json=aluno, headers=cabecalhos)
+    assert repetida.status_code == 200
+    assert repetida.json() == primeira.json()
+    assert repetida.headers["idempotent-replayed"] == "true"
+    # A repetição não chega ao banco.
+    assert repetida.headers["server-timing"].endswith('desc="0 queries"')
+    assert len(client.get("/alunos").json()) == 1
+
+@pytest.mark.unit
+def test_repeticao_de_matricula_nao_vira_erro(client: TestClient, populated_db_session):
+    cabecalhos = nova_chave()
+    primeira = client.post("/matriculas", json={"aluno_id": 3, "curso_id": 2}, headers=cabecalhos)
+    assert primeira.status_code == 201
+    repetida = client.post("/matriculas", json={"aluno_id": 3, "curso_id": 2}, headers=cabecalhos)
+    assert repetida.status_code == 201
+    assert repetida.json() == primeira.json()
+
+@pytest.mark.unit
+def test_chave_com_outro_corpo(client: TestClient, db_session):
+    cabecalhos = nova_chave()
+    assert client.post("/cursos", json={"nome": "Física", "codigo": "FIS1", "carga_horaria": 60}, headers=cabecalhos).status_code == 200
+    response = client.post("/cursos", json={"nome": "Química", "codigo": "QUI1", "carga_horaria": 60}, headers=cabecalhos)
+    assert response.status_code == 422
+    assert response.json() == {"detail": "Idempotency-Key já usada com outro corpo de requisição"}
+
+@pytest.mark.unit
+def test_chaves_sao_separadas_por_rota(client: TestClient, db_session):
+    cabecalhos = nova_chave()
+    assert client.post("/cursos", json={"nome": "Física", "codigo": "FIS1", "carga_horaria": 60}, headers=cabecalhos).status_code == 200
+    response = client.post("/alunos", json={"nome": "Ana Souza", "email": "ana.souza@example.com"}, headers=cabecalhos)
+    assert response.status_code == 200
+    assert "idempotent-replayed" not in response.headers
+
+@pytest.mark.unit
+def test_chave_invalida(client: TestClient, db_session):
+    response = client.post("/alunos", json={"nome": "Ana", "email": "ana@example.com"}, headers={"Idempotency-Key": "x" * 256})
+    assert response.status_code == 400
+
+def app_contador(status_por_chamada):
+    """App mínimo com um POST /alunos lento que conta as execuções."""
+    chamadas = []
+
+    async def criar(request):
+        chamadas.append(await request.json())
+        await asyncio.sleep(0.05)
+        return JSONResponse({"chamada": len(chamadas)}, status_code=status_por_chamada[len(chamadas) - 1])
+
+    app = IdempotenciaMiddleware(Starlette(routes=[Route("/alunos", criar, methods=["POST"])]), ArmazenamentoMemoria(espera_maxima=5))
+    return app, chamadas
+
+async def enviar(app, quantidade: int, cabecalhos: dict):
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://teste") as cliente:
+        return await asyncio.gather(*(cliente.post("/alunos", json={"nome": "Ana"}, headers=cabecalhos) for _ in range(quantidade)))
+
+@pytest.mark.unit
+def test_repeticoes_simultaneas_esperam_a_primeira():
+    app, chamadas = app_contador([200])
+    respostas = asyncio.run(enviar(app, 5, nova_chave()))
+    assert len(chamadas) == 1
+    assert [response.json() for response in respostas] == [{"chamada": 1}] * 5
+    assert sum(response.headers.get("idempotent-replayed") == "true" for response in respostas) == 4
+
+@pytest.mark.unit
+def test_erro_5xx_nao_e_armazenado():
+    app, chamadas = app_contador([503, 200])
+    cabecalhos = nova_chave()
+    assert asyncio.run(enviar(app, 1, cabecalhos))[0].status_code == 503
+    # A nova tentativa executa a rota de novo.
+    assert asyncio.run(enviar(app, 1, cabecalhos))[0].json() == {"chamada": 2}
+    assert len(chamadas) == 2
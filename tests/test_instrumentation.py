@@ -0,0 +1,37 @@
+import logging
+from fastapi.testclient import TestClient
+from prometheus_client import REGISTRY
+import pytest
+
+from api import instrumentation
+
+
+@pytest.mark.unit
+def test_server_timing_informa_consultas(client: TestClient, populated_db_session):
+    response = client.get("/alunos/1")
+    assert response.status_code == 200
+    server_timing = response.headers["server-timing"]
+    assert server_timing.startswith("db;dur=")
+    assert 'queries"' in server_timing
+
+@pytest.mark.unit
+def test_metricas_sql_por_rota(client: TestClient, populated_db_session):
+    labels = {"method": "GET", "route": "/alunos/{aluno_id}"}
+    antes = REGISTRY.get_sample_value("ellis_db_queries_per_request_count", labels) or 0
+    client.get("/alunos/1")
+    assert REGISTRY.get_sample_value("ellis_db_queries_per_request_count", labels) == antes + 1
+    assert REGISTRY.get_sample_value("ellis_db_time_per_request_seconds_count", labels) == antes + 1
+
+@pytest.mark.unit
+def test_detector_n_mais_um(client: TestClient, populated_db_session, monkeypatch, caplog):
+    monkeypatch.setattr(instrumentation, "LIMITE_N_MAIS_UM", 1)
+    with caplog.at_level(logging.WARNING, logger="api.instrumentation"):
+        # Cada matrícula do curso carrega o aluno com uma consulta própria.
+        client.get("/matriculas/curso/CS101")
+    assert any("Possível N+1 em GET /matriculas/curso/{codigo_curso}" in registro.getMessage() for registro in caplog.records)
+
+@pytest.mark.unit
+def test_detector_n_mais_um_desligado(client: TestClient, populated_db_session, caplog):
+    with caplog.at_level(logging.WARNING, logger="api.instrumentation"):
+        client.get("/matriculas/curso/CS101")
+    assert not caplog.records
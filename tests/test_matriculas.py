@@ -1,3 +1,4 @@
+import json
 from fastapi.testclient import TestClient
 import pytest
 
@@ -80,6 +81,19 @@ def test_update_matricula_curso_invalido(client: TestClient, populated_db_sessio
     assert response.status_code == 404
     assert response.json() == {"detail": "Curso não encontrado"}
 
+@pytest.mark.unit
+def test_update_matricula_curso_apagado_por_outro_worker(client: TestClient, populated_db_session):
+    from api.models import Curso
+
+    # O curso foi visto por este processo, mas outro worker o apagou (sem invalidar o cache daqui).
+    assert client.put("/matriculas/2", json={"aluno_id": 2, "curso_id": 2}).status_code == 200
+    populated_db_session.query(Curso).filter(Curso.id == 2).delete()
+    populated_db_session.commit()
+
+    response = client.put("/matriculas/1", json={"aluno_id": 1, "curso_id": 2})
+    assert response.status_code == 404
+    assert response.json() == {"detail": "Curso não encontrado"}
+
 @pytest.mark.unit
 def test_update_matricula_para_combinacao_duplicada(client: TestClient, populated_db_session):
     # A matrícula (aluno_id=1, curso_id=1) já existe (matrícula ID 1).
@@ -147,4 +161,189 @@ def test_read_alunos_por_codigo_curso_sem_alunos(client: TestClient, populated_d
 def test_read_alunos_por_codigo_curso_inexistente(client: TestClient):
     response = client.get("/matriculas/curso/XX999")
     assert response.status_code == 404
-    assert response.json() == {"detail": "Curso não encontrado"}
\ No newline at end of file
+    assert response.json() == {"detail": "Curso não encontrado"}
+
+@pytest.mark.unit
+def test_read_matriculas_paginado(client: TestClient, populated_db_session):
+    response = client.get("/matriculas", params={"limit": 1})
+    assert response.status_code == 200
+    data = response.json()
+    assert len(data["items"]) == 1
+    assert data["items"][0]["aluno"]["nome"] == "João Silva"
+
+    response = client.get("/matriculas", params={"after": data["next_cursor"]})
+    data = response.json()
+    assert len(data["items"]) == 1
+    assert data["items"][0]["aluno"]["nome"] == "Maria Silva"
+    assert data["next_cursor"] is None
+
+@pytest.mark.unit
+def test_export_matriculas_ndjson(client: TestClient, populated_db_session):
+    response = client.get("/matriculas/export")
+    assert response.status_code == 200
+    linhas = [json.loads(linha) for linha in response.text.splitlines()]
+    assert len(linhas) == 2
+    assert linhas[1]["aluno_nome"] == "Maria Silva"
+    assert linhas[1]["curso_codigo"] == "CS101"
+
+@pytest.mark.unit
+def test_create_matriculas_bulk(client: TestClient, populated_db_session):
+    matriculas_data = [
+        {"aluno_id": 3, "curso_id": 1},
+        {"aluno_id": 1, "curso_id": 1},
+        {"aluno_id": 999, "curso_id": 2},
+        {"aluno_id": 3, "curso_id": 999},
+        {"aluno_id": 3, "curso_id": 2},
+        {"aluno_id": 3, "curso_id": 1},
+    ]
+    response = client.post("/matriculas/bulk", json=matriculas_data)
+    assert response.status_code == 201
+    data = response.json()
+    assert [(m["indice"], m["aluno_id"], m["curso_id"]) for m in data["criadas"]] == [(0, 3, 1), (4, 3, 2)]
+    assert data["erros"] == [
+        {"indice": 1, "detail": "Aluno já matriculado neste curso"},
+        {"indice": 2, "detail": "Aluno não encontrado"},
+        {"indice": 3, "detail": "Curso não encontrado"},
+        {"indice": 5, "detail": "Matrícula repetida no lote"},
+    ]
+    assert len(client.get("/matriculas").json()) == 4
+
+@pytest.mark.unit
+def test_read_estatisticas_matriculas(client: TestClient, populated_db_session):
+    response = client.get("/matriculas/stats")
+    assert response.status_code == 200
+    data = response.json()
+    assert data["total_matriculas"] == 2
+    assert data["total_alunos"] == 3
+    assert data["total_cursos"] == 2
+    assert data["alunos_matriculados"] == 2
+    assert data["por_curso"] == [
+        {"curso_id": 1, "codigo": "CS101", "nome": "Ciência da Computação", "carga_horaria": 3600, "matriculas": 2, "carga_horaria_total": 7200},
+        {"curso_id": 2, "codigo": "EE101", "nome": "Engenharia Elétrica", "carga_horaria": 4000, "matriculas": 0, "carga_horaria_total": 0},
+    ]
+    assert data["por_aluno"][0] == {"aluno_id": 1, "nome": "João Silva", "cursos": 1, "carga_horaria_total": 3600}
+
+    client.post("/matriculas", json={"aluno_id": 1, "curso_id": 2})
+    data = client.get("/matriculas/stats").json()
+    assert data["por_aluno"][0] == {"aluno_id": 1, "nome": "João Silva", "cursos": 2, "carga_horaria_total": 7600}
+
+def _resumo(client: TestClient, codigo: str) -> dict:
+    response = client.get(f"/cursos/{codigo}/resumo")
+    assert response.status_code == 200
+    return response.json()
+
+@pytest.mark.unit
+def test_resumo_curso_mantido_a_cada_escrita(client: TestClient, populated_db_session):
+    from api.resumo import verificar
+
+    assert _resumo(client, "CS101") == {"curso_id": 1, "codigo": "CS101", "matriculas": 2, "carga_horaria_total": 7200}
+
+    criada = client.post("/matriculas", json={"aluno_id": 3, "curso_id": 2}).json()
+    client.post("/matriculas/bulk", json=[{"aluno_id": 1, "curso_id": 2}, {"aluno_id": 1, "curso_id": 2}])
+    assert _resumo(client, "EE101")["matriculas"] == 2
+
+    client.put(f"/matriculas/{criada['id']}", json={"aluno_id": 3, "curso_id": 1})
+    assert _resumo(client, "CS101")["matriculas"] == 3
+    assert _resumo(client, "EE101")["matriculas"] == 1
+
+    client.delete(f"/matriculas/{criada['id']}")
+    client.delete("/alunos/1")
+    assert _resumo(client, "CS101") == {"curso_id": 1, "codigo": "CS101", "matriculas": 1, "carga_horaria_total": 3600}
+    assert _resumo(client, "EE101")["matriculas"] == 0
+
+    client.delete("/cursos/1")
+    assert client.get("/cursos/CS101/resumo").status_code == 404
+    assert verificar(populated_db_session) == []
+
+@pytest.mark.unit
+def test_delete_matricula_repetido_desconta_uma_vez(client: TestClient, populated_db_session):
+    from api.resumo import verificar
+
+    # Um retry do cliente apaga a mesma matrícula de novo: só o primeiro DELETE desconta.
+    assert client.delete("/matriculas/1").status_code == 204
+    assert client.delete("/matriculas/1").status_code == 404
+    assert _resumo(client, "CS101")["matriculas"] == 1
+
+    client.delete("/alunos/2")
+    assert verificar(populated_db_session) == []
+
+@pytest.mark.unit
+def test_resumo_curso_verificar_e_reconstruir(client: TestClient, populated_db_session):
+    from api.models import Matricula
+    from api.resumo import reconstruir, verificar
+
+    # Matrícula gravada sem passar pela API: o resumo fica defasado.
+    populated_db_session.add(Matricula(aluno_id=3, curso_id=1))
+    populated_db_session.commit()
+    assert verificar(populated_db_session) == [(1, 2, 3)]
+    antiga = client.get("/cursos/CS101/resumo")
+
+    reconstruir(populated_db_session)
+    assert verificar(populated_db_session) == []
+    # A versão de matrículas muda junto: o cliente com a ETag antiga recebe as contagens novas.
+    response = client.get("/cursos/CS101/resumo", headers={"If-None-Match": antiga.headers["etag"]})
+    assert response.status_code == 200
+    assert response.json()["matriculas"] == 3
+
+@pytest.mark.unit
+def test_create_schema_preenche_resumo_criado(client: TestClient, populated_db_session):
+    from api.models import ResumoCurso
+    from api.schema import create_schema
+
+    # Banco anterior ao resumo: a tabela é criada vazia por cima de matrículas existentes.
+    ResumoCurso.__table__.drop(populated_db_session.get_bind())
+    populated_db_session.commit()
+    create_schema(populated_db_session.get_bind())
+    assert _resumo(client, "CS101")["matriculas"] == 2
+    assert client.get("/matriculas/stats").json()["por_curso"][0]["matriculas"] == 2
+
+@pytest.mark.unit
+@pytest.mark.parametrize("params", ["", "?limit=1"])
+def test_read_matriculas_serializacao_rapida_igual_a_original(client: TestClient, populated_db_session, monkeypatch, params):
+    from api import serializacao
+
+    monkeypatch.setattr(serializacao, "SERIALIZACAO_RAPIDA", False)
+    original = client.get(f"/matriculas{params}").json()
+    monkeypatch.setattr(serializacao, "SERIALIZACAO_RAPIDA", True)
+    assert client.get(f"/matriculas{params}").json() == original
+
+@pytest.mark.unit
+def test_read_matriculas_normalizadas(client: TestClient, populated_db_session):
+    response = client.get("/matriculas?formato=normalizado")
+    assert response.status_code == 200
+    data = response.json()
+    assert [tuple(tripla) for tripla in data["matriculas"]] == [(1, 1, 1), (2, 2, 1)]
+    assert set(data["alunos"]) == {"1", "2"}
+    assert data["alunos"]["2"]["email"] == "maria.silva@example.com"
+    # O curso 1 aparece uma única vez, embora tenha duas matrículas.
+    assert data["cursos"] == {"1": {"id": 1, "nome": "Ciência da Computação", "codigo": "CS101", "carga_horaria": 3600}}
+    assert "next_cursor" not in data
+
+    pagina = client.get("/matriculas?formato=normalizado&limit=1").json()
+    assert [tuple(tripla) for tripla in pagina["matriculas"]] == [(1, 1, 1)]
+    assert set(pagina["alunos"]) == {"1"}
+    proxima = client.get(f"/matriculas?formato=normalizado&limit=1&after={pagina['next_cursor']}").json()
+    assert [tuple(tripla) for tripla in proxima["matriculas"]] == [(2, 2, 1)]
+    assert proxima["next_cursor"] is None
+
+@pytest.mark.unit
+def test_create_matricula_sem_releitura(client: TestClient, populated_db_session):
+    response = client.post("/matriculas", json={"aluno_id": 3, "curso_id": 2})
+    assert response.status_code == 201
+    data = response.json()
+    assert data["aluno"] == {"id": 3, "nome": "Pedro Santos", "email": "pedro.santos@example.com", "telefone": "333333333"}
+    assert data["curso"]["id"] == 2
+    # INSERT (com aluno e curso no RETURNING), resumo por curso e versões: sem SELECT depois do INSERT.
+    assert response.headers["server-timing"].endswith('desc="3 queries"')
+
+@pytest.mark.unit
+def test_estatisticas_por_aluno_paginadas(client: TestClient, populated_db_session):
+    primeira = client.get("/matriculas/stats", params={"limit": 1}).json()
+    assert [aluno["aluno_id"] for aluno in primeira["por_aluno"]] == [1]
+    assert primeira["alunos_matriculados"] == 2
+    assert len(primeira["por_curso"]) == 2
+
+    segunda = client.get("/matriculas/stats", params={"limit": 1, "after": primeira["next_cursor"]}).json()
+    assert [aluno["aluno_id"] for aluno in segunda["por_aluno"]] == [2]
+    assert segunda["next_cursor"] is None
+    assert segunda["total_matriculas"] == primeira["total_matriculas"] == 2
\ No newline at end of file
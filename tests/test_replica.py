@@ -0,0 +1,79 @@
+import pytest
+from prometheus_client import REGISTRY
+from sqlalchemy import create_engine, select
+
+from api import replica
+from api.database import Base
+from api.models import Aluno
+from api.replica import SessaoRoteada
+
+# Primário e réplica são bancos SQLite distintos, com dados diferentes, para que
+# cada leitura revele de qual deles veio.
+
+@pytest.fixture
+def bancos(tmp_path):
+    primario = create_engine(f"sqlite:///{tmp_path / 'primario.db'}")
+    engine_replica = create_engine(f"sqlite:///{tmp_path / 'replica.db'}")
+    for engine, nome in ((primario, "Aluno do Primário"), (engine_replica, "Aluno da Réplica")):
+        Base.metadata.create_all(bind=engine)
+        with engine.begin() as conn:
+            conn.execute(Aluno.__table__.insert(), {"id": 1, "nome": nome, "email": "aluno@example.com"})
+    replica.configurar_replica(engine_replica)
+    yield primario, engine_replica
+    replica.configurar_replica(None)
+    primario.dispose()
+    engine_replica.dispose()
+
+def _nome(sessao) -> str:
+    return sessao.scalar(select(Aluno.nome).where(Aluno.id == 1))
+
+def _fallbacks(motivo: str) -> float:
+    return REGISTRY.get_sample_value("ellis_db_replica_fallback_total", {"motivo": motivo}) or 0.0
+
+@pytest.mark.unit
+def test_leitura_vai_para_a_replica(bancos):
+    primario, _ = bancos
+    with SessaoRoteada(bind=primario) as sessao:
+        sessao.somente_leitura = True
+        assert _nome(sessao) == "Aluno da Réplica"
+
+@pytest.mark.unit
+def test_sessao_de_escrita_usa_o_primario(bancos):
+    primario, _ = bancos
+    with SessaoRoteada(bind=primario) as sessao:
+        assert _nome(sessao) == "Aluno do Primário"
+
+@pytest.mark.unit
+def test_leituras_ficam_no_primario_depois_de_uma_escrita(bancos):
+    primario, _ = bancos
+    with SessaoRoteada(bind=primario) as sessao:
+        sessao.somente_leitura = True
+        assert _nome(sessao) == "Aluno da Réplica"
+        sessao.add(Aluno(id=2, nome="Novo", email="novo@example.com"))
+        sessao.flush()
+        assert _nome(sessao) == "Aluno do Primário"
+        assert sessao.scalar(select(Aluno.nome).where(Aluno.id == 2)) == "Novo"
+
+@pytest.mark.unit
+def test_select_for_update_usa_o_primario(bancos):
+    primario, _ = bancos
+    with SessaoRoteada(bind=primario) as sessao:
+        sessao.somente_leitura = True
+        assert sessao.scalar(select(Aluno.nome).where(Aluno.id == 1).with_for_update()) == "Aluno do Primário"
+
+@pytest.mark.unit
+def test_replica_indisponivel_usa_o_primario(bancos, tmp_path):
+    primario, _ = bancos
+    # Diretório inexistente: o SQLite não consegue abrir o arquivo.
+    inacessivel = create_engine(f"sqlite:///{tmp_path / 'inexistente' / 'replica.db'}")
+    replica.configurar_replica(inacessivel)
+    erros, indisponiveis = _fallbacks("erro_conexao"), _fallbacks("indisponivel")
+
+    with SessaoRoteada(bind=primario) as sessao:
+        sessao.somente_leitura = True
+        assert _nome(sessao) == "Aluno do Primário"
+        # Enquanto a réplica está fora da rotação, nem tenta conectar.
+        assert _nome(sessao) == "Aluno do Primário"
+
+    assert _fallbacks("erro_conexao") == erros + 1
+    assert _fallbacks("indisponivel") == indisponiveis + 1